@@ -0,0 +1,360 @@
+"""Local stand-ins for a Proxmox VE cluster: an HTTPS API and an SSH host.
+
+Both serve a synthetic cluster of a given size and can add a fixed latency
+to every request or command. They only implement what the integration
+uses.
+"""
+from __future__ import annotations
+
+import asyncio
+import datetime
+import json
+import math
+import os
+import re
+import ssl
+import tempfile
+
+import asyncssh
+from aiohttp import web
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+
+from custom_components.proxmoxve.disks import SMART_MARKER
+
+GUESTS_PER_NODE = 100
+MAX_NODES = 32
+
+
+class SyntheticCluster:
+    """cluster/resources of `guests` guests spread over nodes.
+
+    Counters grow on every read so rate computation has work to do.
+    """
+
+    def __init__(self, guests: int, disks: int = 4) -> None:
+        self.node_names = [
+            f"pve{i}" for i in range(min(MAX_NODES, max(1, math.ceil(guests / GUESTS_PER_NODE))))
+        ]
+        self.disks = disks
+        self.reads = 0
+        self.guests = []
+        for i in range(guests):
+            kind = "qemu" if i % 3 else "lxc"
+            vmid = 100 + i
+            self.guests.append(
+                {
+                    "id": f"{kind}/{vmid}",
+                    "type": kind,
+                    "vmid": vmid,
+                    "name": f"guest{vmid}",
+                    "node": self.node_names[i % len(self.node_names)],
+                    "status": "running" if i % 5 else "stopped",
+                    "tags": "bench;even" if i % 2 == 0 else "bench",
+                    "pool": f"pool{i % 4}",
+                    "template": 0,
+                    "maxcpu": 2,
+                    "maxmem": 4 * 1024**3,
+                    "maxdisk": 32 * 1024**3,
+                }
+            )
+
+    def resources(self) -> list[dict]:
+        self.reads += 1
+        tick = self.reads
+        resources = []
+        for node in self.node_names:
+            resources.append(
+                {
+                    "id": f"node/{node}",
+                    "type": "node",
+                    "node": node,
+                    "status": "online",
+                    "cpu": 0.12,
+                    "maxcpu": 32,
+                    "mem": 48 * 1024**3,
+                    "maxmem": 128 * 1024**3,
+                    "disk": 20 * 1024**3,
+                    "maxdisk": 100 * 1024**3,
+                    "uptime": 86400 + tick,
+                }
+            )
+            resources.append(
+                {
+                    "id": f"storage/{node}/local",
+                    "type": "storage",
+                    "storage": "local",
+                    "node": node,
+                    "status": "available",
+                    "plugintype": "dir",
+                    "shared": 0,
+                    "disk": 10 * 1024**3,
+                    "maxdisk": 100 * 1024**3,
+                }
+            )
+            resources.append(
+                {
+                    "id": f"storage/{node}/ceph",
+                    "type": "storage",
+                    "storage": "ceph",
+                    "node": node,
+                    "status": "available",
+                    "plugintype": "rbd",
+                    "shared": 1,
+                    "disk": 2 * 1024**4,
+                    "maxdisk": 8 * 1024**4,
+                }
+            )
+        for guest in self.guests:
+            running = guest["status"] == "running"
+            resources.append(
+                {
+                    **guest,
+                    "cpu": 0.05 if running else 0,
+                    "mem": 1024**3 if running else 0,
+                    "disk": 0,
+                    "uptime": 3600 + tick if running else 0,
+                    "netin": tick * 125000 * running,
+                    "netout": tick * 64000 * running,
+                    "diskread": tick * 4096 * running,
+                    "diskwrite": tick * 8192 * running,
+                }
+            )
+        return resources
+
+    def cluster_status(self) -> list[dict]:
+        status = [{"type": "cluster", "name": "bench", "nodes": len(self.node_names)}]
+        for i, node in enumerate(self.node_names):
+            status.append(
+                {"type": "node", "name": node, "ip": "127.0.0.1", "local": int(i == 0), "online": 1}
+            )
+        return status
+
+    def find_guest(self, vmid: int) -> dict | None:
+        for guest in self.guests:
+            if guest["vmid"] == vmid:
+                return guest
+        return None
+
+    def sensors(self) -> dict:
+        return {
+            "coretemp-isa-0000": {
+                "Adapter": "ISA adapter",
+                "Package id 0": {"temp1_input": 48.0, "temp1_max": 100.0},
+                **{f"Core {i}": {f"temp{i + 2}_input": 44.0 + i % 5} for i in range(16)},
+            },
+            "acpitz-acpi-0": {"Adapter": "ACPI interface", "temp1": {"temp1_input": 27.8}},
+            "nvme-pci-0100": {
+                "Adapter": "PCI adapter",
+                "Composite": {"temp1_input": 38.9},
+                "Sensor 1": {"temp2_input": 38.9},
+            },
+            "nct6798-isa-0290": {
+                "Adapter": "ISA adapter",
+                "fan1": {"fan1_input": 812.0},
+                "in0": {"in0_input": 1.02},
+            },
+        }
+
+    def lsblk(self) -> dict:
+        return {
+            "blockdevices": [
+                {
+                    "name": f"sd{chr(97 + i)}",
+                    "path": f"/dev/sd{chr(97 + i)}",
+                    "model": "BENCH HDD 8TB",
+                    "vendor": "ATA",
+                    "serial": f"BENCH{i:04d}",
+                    "wwn": f"0x5000c500{i:08x}",
+                    "type": "disk",
+                    "rota": True,
+                }
+                for i in range(self.disks)
+            ]
+        }
+
+    def smartctl(self, path: str) -> dict:
+        index = ord(path[-1]) - 97
+        return {
+            "smartctl": {"version": [7, 3], "exit_status": 0},
+            "device": {"name": path, "type": "sat"},
+            "model_name": "BENCH HDD 8TB",
+            "serial_number": f"BENCH{index:04d}",
+            "smart_status": {"passed": True},
+            "power_on_time": {"hours": 12000 + index},
+            "temperature": {"current": 33 + index % 4},
+            "ata_smart_attributes": {
+                "table": [
+                    {"id": 5, "name": "Reallocated_Sector_Ct", "value": 100, "raw": {"value": 0}},
+                    {"id": 194, "name": "Temperature_Celsius", "value": 67, "raw": {"value": 33}},
+                ]
+            },
+        }
+
+
+class FakePVEApi:
+    """aiohttp application answering the PVE API paths used by the integration."""
+
+    def __init__(self, cluster: SyntheticCluster, latency: float = 0.0) -> None:
+        self.cluster = cluster
+        self.latency = latency
+        self.requests = 0
+        self.app = web.Application()
+        self.app.router.add_route("*", "/api2/json/{path:.*}", self._handle)
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        path = request.match_info["path"]
+        data = self._route(request.method, path)
+        if data is _NOT_FOUND:
+            return web.json_response({"data": None}, status=501)
+        return web.json_response({"data": data})
+
+    def _route(self, method, path):
+        cluster = self.cluster
+        if path == "access/ticket":
+            return {"ticket": "PVE:root@pam:BENCH", "CSRFPreventionToken": "BENCH"}
+        if path == "version":
+            return {"version": "8.2.4", "release": "8.2"}
+        if path == "cluster/resources":
+            return cluster.resources()
+        if path == "cluster/status":
+            return cluster.cluster_status()
+        if match := re.fullmatch(r"nodes/([^/]+)/tasks/([^/]+)/status", path):
+            return {"status": "stopped", "exitstatus": "OK", "upid": match.group(2)}
+        if match := re.fullmatch(r"nodes/([^/]+)/(startall|stopall)", path):
+            return f"UPID:{match.group(1)}:BENCH:{match.group(2)}:root@pam:"
+        if match := re.fullmatch(r"nodes/([^/]+)/status", path):
+            return None if method == "POST" else {"uptime": 86400, "cpu": 0.12}
+        if match := re.fullmatch(r"nodes/([^/]+)/(qemu|lxc)/(\d+)/(status/current|config)", path):
+            guest = cluster.find_guest(int(match.group(3)))
+            if guest is None:
+                return _NOT_FOUND
+            if match.group(4) == "config":
+                return {"name": guest["name"], "startup": f"order={guest['vmid'] % 3 + 1}"}
+            return {"status": guest["status"], "vmid": guest["vmid"]}
+        if match := re.fullmatch(r"nodes/([^/]+)/(qemu|lxc)/(\d+)/status/(\w+)", path):
+            guest = cluster.find_guest(int(match.group(3)))
+            if guest is None:
+                return _NOT_FOUND
+            command = match.group(4)
+            guest["status"] = "running" if command in ("start", "resume") else "stopped"
+            return f"UPID:{match.group(1)}:BENCH:{command}:{match.group(3)}:root@pam:"
+        return _NOT_FOUND
+
+
+_NOT_FOUND = object()
+
+
+class FakeSSHServer(asyncssh.SSHServer):
+    def begin_auth(self, username: str) -> bool:
+        return True
+
+    def password_auth_supported(self) -> bool:
+        return True
+
+    def validate_password(self, username: str, password: str) -> bool:
+        return True
+
+
+class FakeSSHHost:
+    """Answers `sensors -j`, `lsblk -J` and batched `smartctl` commands."""
+
+    def __init__(self, cluster: SyntheticCluster, latency: float = 0.0) -> None:
+        self.cluster = cluster
+        self.latency = latency
+        self.commands = 0
+
+    def output(self, command: str) -> tuple[str, int]:
+        cluster = self.cluster
+        if command == "sensors -j":
+            return json.dumps(cluster.sensors()), 0
+        if command.startswith("lsblk -J"):
+            return json.dumps(cluster.lsblk()), 0
+        if "smartctl" in command:
+            heads = re.findall(r"for d in ([^;]*); do", command)
+            paths = [path for head in heads for path in re.findall(r"/dev/\w+", head)]
+            chunks = [
+                f"\n{SMART_MARKER} {path}\n{json.dumps(cluster.smartctl(path))}" for path in paths
+            ]
+            return "".join(chunks), 0
+        return f"{command.split()[0]}: command not found\n", 127
+
+    async def handle(self, process: asyncssh.SSHServerProcess) -> None:
+        self.commands += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        output, status = self.output(process.command or "")
+        if status:
+            process.stderr.write(output)
+        else:
+            process.stdout.write(output)
+        process.exit(status)
+
+
+def self_signed_context(directory: str) -> ssl.SSLContext:
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(days=1))
+        .not_valid_after(now + datetime.timedelta(days=30))
+        .sign(key, hashes.SHA256())
+    )
+    cert_path = os.path.join(directory, "cert.pem")
+    key_path = os.path.join(directory, "key.pem")
+    with open(cert_path, "wb") as f:
+        f.write(cert.public_bytes(serialization.Encoding.PEM))
+    with open(key_path, "wb") as f:
+        f.write(
+            key.private_bytes(
+                serialization.Encoding.PEM,
+                serialization.PrivateFormat.PKCS8,
+                serialization.NoEncryption(),
+            )
+        )
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert_path, key_path)
+    return context
+
+
+async def async_start_fake_cluster(
+    guests: int, disks: int = 4, api_latency: float = 0.0, ssh_latency: float = 0.0
+):
+    """Start both stand-ins on 127.0.0.1 and return (api_port, ssh_port, close)."""
+    cluster = SyntheticCluster(guests, disks)
+    api = FakePVEApi(cluster, api_latency)
+    ssh_host = FakeSSHHost(cluster, ssh_latency)
+
+    tmpdir = tempfile.TemporaryDirectory()
+    runner = web.AppRunner(api.app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0, ssl_context=self_signed_context(tmpdir.name))
+    await site.start()
+    api_port = site._server.sockets[0].getsockname()[1]
+
+    ssh_server = await asyncssh.create_server(
+        FakeSSHServer,
+        "127.0.0.1",
+        0,
+        server_host_keys=[asyncssh.generate_private_key("ssh-ed25519")],
+        process_factory=ssh_host.handle,
+    )
+    ssh_port = ssh_server.sockets[0].getsockname()[1]
+
+    async def async_close():
+        ssh_server.close()
+        await ssh_server.wait_closed()
+        await runner.cleanup()
+        tmpdir.cleanup()
+
+    return api_port, ssh_port, async_close
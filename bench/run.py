@@ -0,0 +1,336 @@
+"""Benchmark the collection pipeline against a synthetic cluster.
+
+    python -m bench.run
+    python -m bench.run --sizes 500 2000 --polls 50 --api-latency 0.02 --json out.json
+    python -m bench.run --fixture proxmoxve_fixture_20261018-101500.json
+
+Run from the repository root. Needs the integration's requirements; the
+package __init__ imports Home Assistant, so it must be installed even
+though no Home Assistant instance is started. The fake API and SSH host
+run in a child process so CPU time and memory are those of the client.
+With --fixture a recorded bundle is replayed at full speed instead, which
+measures the parsers on real hardware output.
+
+Against the fake cluster the integration is then also set up in a bare
+Home Assistant instance (registries and config entries, no other
+integrations): PVEDataUpdateCoordinator polls the same stand-ins and the
+sensor, switch and button platforms are forwarded as on a real start.
+
+For every cluster size it reports:
+  cold       first poll, including login, SSH connect and every tier
+  poll       p50/p95 of the following polls
+  cpu/poll   process CPU time per poll (parsing, rates, diffing)
+  diff       change set computation against the previous snapshot
+  membership snapshot_members() and the added/removed sets
+  action     a power action POSTed while a poll is in flight
+  mem        tracemalloc current/peak after the collector run
+  entities   entities registered by the three platforms
+  setup      Home Assistant start until every platform is set up: the
+             coordinator's first poll plus platform forwarding
+  platforms  platform forwarding and entity creation alone
+  refresh    p50/p95 of coordinator refreshes with every entity attached,
+             including the state writes of the dispatch
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import tempfile
+import time
+import tracemalloc
+
+import aiohttp
+from homeassistant import config_entries, loader
+from homeassistant.config_entries import ConfigEntries, ConfigEntry
+from homeassistant.const import CONF_HOST, CONF_PASSWORD, CONF_PORT, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import area_registry as ar
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers import entity
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers import restore_state
+
+from custom_components.proxmoxve.api import PVEApiClient
+from custom_components.proxmoxve.collector import (
+    PVECollector,
+    diff_snapshots,
+    snapshot_members,
+)
+from custom_components.proxmoxve.const import (
+    CONF_API_INTERVAL,
+    CONF_MAX_CONNECTIONS,
+    CONF_SENSORS_INTERVAL,
+    CONF_SMART_INTERVAL,
+    CONF_SMART_TTL,
+    CONF_SSH_PORT,
+    DOMAIN,
+)
+from custom_components.proxmoxve.fixtures import load_bundle, replay_transports
+from custom_components.proxmoxve.ssh import PVESSHPool
+from custom_components.proxmoxve.timing import PhaseTimer
+
+from .fake_pve import async_start_fake_cluster
+
+DEFAULT_SIZES = (1, 50, 500, 2000)
+
+
+def _serve(guests, disks, api_latency, ssh_latency, ports):
+    async def main():
+        api_port, ssh_port, _ = await async_start_fake_cluster(
+            guests, disks, api_latency, ssh_latency
+        )
+        ports.put((api_port, ssh_port))
+        await asyncio.Event().wait()
+
+    asyncio.run(main())
+
+
+async def async_bench_size(guests: int, args) -> dict:
+    ctx = multiprocessing.get_context("spawn")
+    ports = ctx.Queue()
+    server = ctx.Process(
+        target=_serve,
+        args=(guests, args.disks, args.api_latency, args.ssh_latency, ports),
+        daemon=True,
+    )
+    server.start()
+    try:
+        api_port, ssh_port = await asyncio.get_running_loop().run_in_executor(
+            None, ports.get, True, 30
+        )
+        result = await _async_run(guests, api_port, ssh_port, args)
+        result.update(await async_bench_entities(api_port, ssh_port, args))
+        return result
+    finally:
+        server.terminate()
+        server.join()
+
+
+async def _async_run(guests: int, api_port: int, ssh_port: int, args) -> dict:
+    tracemalloc.start()
+    async with aiohttp.ClientSession() as session:
+        api = PVEApiClient(
+            session,
+            "127.0.0.1",
+            port=api_port,
+            username="root@pam",
+            password="bench",
+            max_connections=args.max_connections,
+        )
+        ssh = PVESSHPool("root", "bench", port=ssh_port)
+        collector = PVECollector(
+            api,
+            ssh,
+            "127.0.0.1",
+            sensors_interval=args.sensors_interval,
+            smart_interval=args.smart_interval,
+            smart_ttl=args.smart_ttl,
+        )
+        return await _async_measure(guests, collector, args.actions, args)
+
+
+async def async_bench_fixture(path: str, args) -> dict:
+    bundle = load_bundle(path)
+    api, ssh, clock = replay_transports(bundle)
+    settings = bundle.get("settings", {})
+    tracemalloc.start()
+    collector = PVECollector(
+        api,
+        ssh,
+        bundle["host"],
+        sensors_interval=settings.get("sensors_interval", args.sensors_interval),
+        smart_interval=settings.get("smart_interval", args.smart_interval),
+        smart_ttl=settings.get("smart_ttl", args.smart_ttl),
+        rate_smoothing=settings.get("rate_smoothing", 0.0),
+        clock=clock,
+    )
+    # 录制的数据里没有电源操作
+    return await _async_measure(None, collector, 0, args)
+
+
+async def _async_measure(guests, collector: PVECollector, actions: int, args) -> dict:
+    """Poll `args.polls + 1` times, then time power actions; stops tracemalloc."""
+    timer = PhaseTimer(samples=args.polls + 1)
+    previous = None
+    members = set()
+    cpu = 0.0
+    try:
+        for poll in range(args.polls + 1):
+            cpu_start = time.process_time()
+            start = time.monotonic()
+            data = await collector.async_collect()
+            timer.record("cold" if poll == 0 else "poll", time.monotonic() - start)
+            with timer.measure("diff"):
+                data.changes = diff_snapshots(previous, data)
+            with timer.measure("membership"):
+                current = snapshot_members(data)
+                data.added = current - members
+                data.removed = members - current
+            if poll:
+                cpu += time.process_time() - cpu_start
+            previous, members = data, current
+
+        vmid, record = next(iter(data.qemus.items()), (None, None))
+        if vmid is not None:
+            for _ in range(actions):
+                poll_task = asyncio.create_task(collector.async_collect())
+                await asyncio.sleep(0)
+                with timer.measure("action"):
+                    await collector.api.async_action(
+                        f"nodes/{record['node']}/qemu/{vmid}/status/start"
+                    )
+                await poll_task
+    finally:
+        await collector.async_close()
+    current_mem, peak_mem = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    summary = timer.summary()
+    return {
+        "guests": guests if guests is not None else len(data.qemus) + len(data.lxcs),
+        "nodes": len(data.nodes),
+        "member_count": len(members),
+        "cold_ms": summary["cold"]["last"],
+        "poll": summary.get("poll"),
+        "cpu_per_poll_ms": round(cpu / max(1, args.polls) * 1000, 2),
+        "diff": summary["diff"],
+        "membership": summary["membership"],
+        "action": summary.get("action"),
+        "collector_phases": collector.timings.summary(),
+        "mem_current_kb": current_mem // 1024,
+        "mem_peak_kb": peak_mem // 1024,
+    }
+
+
+async def _async_bare_hass(config_dir: str) -> HomeAssistant:
+    """Home Assistant with registries and config entries, not started yet."""
+    hass = HomeAssistant(config_dir)
+    hass.config.skip_pip = True
+    loader.async_setup(hass)
+    entity.async_setup(hass)
+    await ar.async_load(hass)
+    await dr.async_load(hass)
+    await er.async_load(hass)
+    await restore_state.async_load(hass)
+    hass.config_entries = ConfigEntries(hass, {})
+    await hass.config_entries.async_initialize()
+    return hass
+
+
+async def async_bench_entities(api_port: int, ssh_port: int, args) -> dict:
+    """Set the integration up against the stand-ins and time it."""
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = await _async_bare_hass(config_dir)
+        entry = ConfigEntry(
+            version=1,
+            minor_version=1,
+            domain=DOMAIN,
+            title="bench",
+            data={
+                CONF_HOST: "127.0.0.1",
+                CONF_PORT: api_port,
+                CONF_SSH_PORT: ssh_port,
+                CONF_USERNAME: "root@pam",
+                CONF_PASSWORD: "bench",
+                CONF_MAX_CONNECTIONS: args.max_connections,
+                # 只测量这里主动触发的刷新
+                CONF_API_INTERVAL: 3600,
+                CONF_SENSORS_INTERVAL: args.sensors_interval,
+                CONF_SMART_INTERVAL: args.smart_interval,
+                CONF_SMART_TTL: args.smart_ttl,
+            },
+            source=config_entries.SOURCE_USER,
+        )
+        timer = PhaseTimer(samples=args.polls + 1)
+        forward = hass.config_entries.async_forward_entry_setups
+
+        async def _async_timed_forward(entry, platforms):
+            with timer.measure("platforms"):
+                return await forward(entry, platforms)
+
+        hass.config_entries.async_forward_entry_setups = _async_timed_forward
+        try:
+            # 与真实启动一样，第一次轮询和平台转发在 Home Assistant 启动完成后执行
+            await hass.config_entries.async_add(entry)
+            with timer.measure("setup"):
+                await hass.async_start()
+                await hass.async_block_till_done()
+            coordinator = hass.data[DOMAIN][entry.entry_id]
+            for _ in range(args.polls):
+                with timer.measure("refresh"):
+                    await coordinator.async_refresh()
+            entities = len(er.async_entries_for_config_entry(er.async_get(hass), entry.entry_id))
+        finally:
+            await hass.config_entries.async_unload(entry.entry_id)
+            await hass.async_stop(force=True)
+
+    summary = timer.summary()
+    return {
+        "entities": entities,
+        "platforms_ms": summary["platforms"]["last"],
+        "setup_ms": summary["setup"]["last"],
+        "refresh": summary.get("refresh"),
+        "coordinator_phases": coordinator.timings.summary(),
+    }
+
+
+def _fmt(stats, key="p50"):
+    return "-" if not stats else f"{stats[key]:.1f}"
+
+
+def _fmt_ms(value):
+    return "-" if value is None else f"{value:.1f}"
+
+
+def print_table(results):
+    header = (
+        f"{'guests':>6} {'nodes':>5} {'cold':>8} {'poll p50':>9} {'poll p95':>9} "
+        f"{'cpu/poll':>9} {'diff p95':>9} {'mshp p95':>9} {'action p95':>11} "
+        f"{'mem KiB':>8} {'peak KiB':>9} {'entities':>8} {'setup':>8} {'platforms':>9} "
+        f"{'refresh p95':>11}"
+    )
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r['guests']:>6} {r['nodes']:>5} {r['cold_ms']:>8.1f} "
+            f"{_fmt(r['poll']):>9} {_fmt(r['poll'], 'p95'):>9} {r['cpu_per_poll_ms']:>9.2f} "
+            f"{_fmt(r['diff'], 'p95'):>9} {_fmt(r['membership'], 'p95'):>9} "
+            f"{_fmt(r['action'], 'p95'):>11} {r['mem_current_kb']:>8} {r['mem_peak_kb']:>9} "
+            f"{r.get('entities', '-'):>8} {_fmt_ms(r.get('setup_ms')):>8} "
+            f"{_fmt_ms(r.get('platforms_ms')):>9} {_fmt(r.get('refresh'), 'p95'):>11}"
+        )
+    print("times in ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--polls", type=int, default=20)
+    parser.add_argument("--actions", type=int, default=5)
+    parser.add_argument("--disks", type=int, default=4, help="disks per node")
+    parser.add_argument("--api-latency", type=float, default=0.0, help="seconds per API request")
+    parser.add_argument("--ssh-latency", type=float, default=0.0, help="seconds per SSH command")
+    parser.add_argument("--max-connections", type=int, default=4)
+    # 默认每个周期都采集所有层级，测量最坏情况
+    parser.add_argument("--sensors-interval", type=float, default=0)
+    parser.add_argument("--smart-interval", type=float, default=0)
+    parser.add_argument("--smart-ttl", type=float, default=0)
+    parser.add_argument("--fixture", help="replay this recorded bundle instead of a fake cluster")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    if args.fixture:
+        results = [asyncio.run(async_bench_fixture(args.fixture, args))]
+    else:
+        results = [asyncio.run(async_bench_size(guests, args)) for guests in args.sizes]
+    print_table(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
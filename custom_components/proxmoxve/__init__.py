@@ -1,12 +1,22 @@
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
+import homeassistant.helpers.config_validation as cv
 from homeassistant.helpers.start import async_at_started
-from .pve import PVEDataUpdateCoordinator
+from .pve import PVEDataUpdateCoordinator, snapshot_store
 from .const import DOMAIN
+from .services import async_setup_services
 
 PLATFORMS = [Platform.SENSOR, Platform.BUTTON, Platform.SWITCH]
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+async def async_setup(hass: HomeAssistant, config) -> bool:
+    async_setup_services(hass)
+    return True
+
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     config = entry.data
     pve = PVEDataUpdateCoordinator(hass, dict(config))
@@ -19,6 +29,11 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         await pve.async_refresh()
         await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
+    if await pve.async_restore_snapshot():
+        # 用重启前保存的快照立即创建实体；第一个实体加入后协调器按轮询周期在后台刷新
+        await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+        return True
+
     # Don't fetch data during startup, this will slow down the overall startup dramatically
     async_at_started(hass, _async_finish_startup)
 
@@ -32,8 +47,14 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     )
     
     if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id)
+        pve = hass.data[DOMAIN].pop(entry.entry_id)
+        await pve.async_close()
         if len(hass.config_entries.async_entries(DOMAIN)) == 0:
             hass.data.pop(DOMAIN)
     
     return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Delete the saved snapshot of a removed entry."""
+    await snapshot_store(hass, entry.entry_id).async_remove()
@@ -0,0 +1,189 @@
+"""Asyncio client for the Proxmox VE REST API."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+
+import aiohttp
+
+from .breaker import CircuitBreaker
+from .slots import PRIORITY_ACTION, PRIORITY_POLL, PrioritySlots
+
+_LOGGER = logging.getLogger(__name__)
+
+# PVE 票据有效期为2小时，提前续期
+TICKET_RENEW_SEC = 90 * 60
+DEFAULT_TIMEOUT = 5
+DEFAULT_MAX_CONNECTIONS = 4
+
+
+class PVEApiError(Exception):
+    """Error returned by the Proxmox VE API."""
+
+
+class PVEAuthError(PVEApiError):
+    """Authentication against the Proxmox VE API failed."""
+
+
+class PVEUnavailableError(PVEApiError):
+    """The API host is unreachable and calls to it are suspended."""
+
+
+def is_token_user(username: str | None) -> bool:
+    """API token ids look like user@realm!tokenid."""
+    return "!" in (username or "")
+
+
+class PVEApiClient:
+    """Minimal Proxmox VE API client running on the event loop.
+
+    The aiohttp session is owned by the caller, so a shared keep-alive
+    session can be reused across config entries.
+
+    With an API token (`user@realm!tokenid` plus its secret) every request
+    carries the token; otherwise a ticket is obtained with the password,
+    renewed before it expires, and re-issued once if the server rejects it.
+    """
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        host: str,
+        port: int = 8006,
+        username: str = "root@pam",
+        password: str = "",
+        verify_ssl: bool = False,
+        timeout: float = DEFAULT_TIMEOUT,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        token_secret: str | None = None,
+    ) -> None:
+        self._session = session
+        self._host = host
+        self._base_url = f"https://{host}:{port}/api2/json"
+        self._username = username
+        self._password = password
+        self._token = (
+            f"PVEAPIToken={username}={token_secret}"
+            if token_secret and is_token_user(username)
+            else None
+        )
+        self._ssl = None if verify_ssl else False
+        self._timeout = aiohttp.ClientTimeout(total=timeout)
+        # 电源操作优先于轮询请求获得连接
+        self.slots = PrioritySlots(max_connections)
+        self._auth_lock = asyncio.Lock()
+        self._ticket = None
+        self._csrf_token = None
+        self._ticket_time = None
+        self._breaker = CircuitBreaker(host)
+
+    @property
+    def available(self) -> bool:
+        return self._breaker.available
+
+    def _ticket_valid(self) -> bool:
+        return (
+            self._ticket is not None
+            and time.monotonic() - self._ticket_time < TICKET_RENEW_SEC
+        )
+
+    async def async_login(self) -> None:
+        """Request a new authentication ticket."""
+        async with self._session.post(
+            f"{self._base_url}/access/ticket",
+            data={"username": self._username, "password": self._password},
+            ssl=self._ssl,
+            timeout=self._timeout,
+        ) as resp:
+            if resp.status == 401:
+                raise PVEAuthError("Invalid username or password")
+            if resp.status >= 400:
+                raise PVEApiError(f"Login failed: {resp.status} {resp.reason}")
+            data = (await resp.json()).get("data") or {}
+
+        if "ticket" not in data:
+            raise PVEAuthError("No ticket returned")
+        self._ticket = data["ticket"]
+        self._csrf_token = data.get("CSRFPreventionToken")
+        self._ticket_time = time.monotonic()
+        _LOGGER.debug("Obtained new PVE ticket")
+
+    async def _async_ensure_ticket(self) -> None:
+        if self._ticket_valid():
+            return
+        async with self._auth_lock:
+            if not self._ticket_valid():
+                await self.async_login()
+
+    async def _async_headers(self, method: str) -> dict:
+        if self._token is not None:
+            # API Token 不需要票据和 CSRF 令牌
+            return {"Authorization": self._token}
+        await self._async_ensure_ticket()
+        headers = {"Cookie": f"PVEAuthCookie={self._ticket}"}
+        if method != "GET" and self._csrf_token:
+            headers["CSRFPreventionToken"] = self._csrf_token
+        return headers
+
+    async def _async_request(
+        self, method: str, path: str, params=None, data=None, priority=PRIORITY_POLL
+    ):
+        # 主机不可达时直接失败，不再每个周期等待连接超时
+        if not self._breaker.allow():
+            raise PVEUnavailableError(
+                f"{self._host} is unreachable, retrying in {self._breaker.retry_in:.0f}s"
+            )
+        try:
+            result = await self._async_send(method, path, params, data, priority)
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as err:
+            self._breaker.failure()
+            raise PVEApiError(f"{method} {path}: {err!r}") from err
+        except PVEApiError:
+            # 服务器有响应，说明主机可达
+            self._breaker.success()
+            raise
+        except asyncio.CancelledError:
+            # 被取消的探测请求没有结果，不能让断路器一直等待它
+            self._breaker.cancel()
+            raise
+        except Exception as err:
+            # 响应无法解析(内容类型、JSON、传输中断)时当作失败，半开状态的探测必须有结果
+            self._breaker.failure()
+            raise PVEApiError(f"{method} {path}: {err!r}") from err
+        self._breaker.success()
+        return result
+
+    async def _async_send(self, method: str, path: str, params, data, priority):
+        for attempt in range(2):
+            headers = await self._async_headers(method)
+            async with self.slots.slot(priority):
+                async with self._session.request(
+                    method,
+                    f"{self._base_url}/{path.lstrip('/')}",
+                    params=params,
+                    data=data,
+                    headers=headers,
+                    ssl=self._ssl,
+                    timeout=self._timeout,
+                ) as resp:
+                    if resp.status == 401:
+                        if self._token is None and not attempt:
+                            # 票据被服务器拒绝(例如PVE重启)，重新登录后重试一次
+                            _LOGGER.debug(f"{method} {path}: ticket rejected, logging in again")
+                            self._ticket = None
+                            continue
+                        raise PVEAuthError(f"{method} {path}: {resp.reason}")
+                    if resp.status >= 400:
+                        raise PVEApiError(f"{method} {path}: {resp.status} {resp.reason}")
+                    return (await resp.json()).get("data")
+
+    async def async_get(self, path: str, *, priority: int = PRIORITY_POLL, **params):
+        return await self._async_request("GET", path, params=params or None, priority=priority)
+
+    async def async_post(self, path: str, *, priority: int = PRIORITY_POLL, **data):
+        return await self._async_request("POST", path, data=data or None, priority=priority)
+
+    async def async_action(self, path: str, **data):
+        """POST a user action ahead of queued poll requests."""
+        return await self.async_post(path, priority=PRIORITY_ACTION, **data)
@@ -0,0 +1,68 @@
+"""Per-host circuit breaker with exponential backoff."""
+from __future__ import annotations
+
+import logging
+import time
+
+_LOGGER = logging.getLogger(__name__)
+
+BACKOFF_BASE = 5
+BACKOFF_MAX = 300
+# 半开状态的探测请求超过这个时间没有结果，允许发起新的探测
+PROBE_TIMEOUT = 60
+
+
+class CircuitBreaker:
+    """Stops calls to a host after it failed, until its backoff expires.
+
+    Each failure doubles the backoff up to BACKOFF_MAX. Once the backoff
+    expires a single probe call is let through (half-open); its success
+    closes the breaker, its failure opens it again for longer.
+    """
+
+    def __init__(self, host: str, base: float = BACKOFF_BASE, maximum: float = BACKOFF_MAX) -> None:
+        self.host = host
+        self._base = base
+        self._maximum = maximum
+        self._failures = 0
+        self._open_until = 0.0
+        self._probe_time = None
+
+    @property
+    def available(self) -> bool:
+        """False while the host is considered down."""
+        return self._failures == 0
+
+    @property
+    def retry_in(self) -> float:
+        return max(0.0, self._open_until - time.monotonic())
+
+    def allow(self) -> bool:
+        """Return True if a call to the host may be made now."""
+        if self._failures == 0:
+            return True
+        now = time.monotonic()
+        if now < self._open_until:
+            return False
+        if self._probe_time is not None and now - self._probe_time < PROBE_TIMEOUT:
+            # 已经有一个探测请求在进行中
+            return False
+        self._probe_time = now
+        return True
+
+    def success(self) -> None:
+        if self._failures:
+            _LOGGER.info(f"{self.host} is reachable again")
+        self._failures = 0
+        self._probe_time = None
+
+    def cancel(self) -> None:
+        """A call was cancelled before it had a result; allow a new probe."""
+        self._probe_time = None
+
+    def failure(self) -> None:
+        self._failures += 1
+        self._probe_time = None
+        backoff = min(self._maximum, self._base * 2 ** (self._failures - 1))
+        self._open_until = time.monotonic() + backoff
+        _LOGGER.warning(f"{self.host} is unreachable, retrying in {backoff:.0f}s")
@@ -0,0 +1,62 @@
+"""Guest selection and startup ordering for bulk power operations."""
+from __future__ import annotations
+
+from itertools import groupby
+import math
+import re
+
+
+def parse_startup(text: str | None) -> dict:
+    """Parse a guest's `startup` option, e.g. "order=2,up=30,down=60"."""
+    startup = {}
+    for part in (text or "").split(","):
+        key, _, value = part.partition("=")
+        if not value:
+            # 只写数字时等同于 order=<数字>
+            key, value = "order", key
+        try:
+            startup[key.strip()] = int(value)
+        except ValueError:
+            continue
+    return startup
+
+
+def guest_tags(record: dict) -> set[str]:
+    return {tag for tag in re.split(r"[;, ]+", record.get("tags") or "") if tag}
+
+
+def select_guests(data, guests=(), tags=(), pools=()) -> list[tuple[str, int, dict]]:
+    """Return (kind, vmid, record) of every guest matching any selector.
+
+    Guests are matched by vmid or by name. Templates are never selected.
+    """
+    guests = {str(guest) for guest in guests}
+    tags = set(tags)
+    pools = set(pools)
+    selected = []
+    for kind, records in (("qemu", data.qemus), ("lxc", data.lxcs)):
+        for vmid, record in records.items():
+            if record.get("template"):
+                continue
+            if (
+                str(vmid) in guests
+                or record.get("name") in guests
+                or not tags.isdisjoint(guest_tags(record))
+                or record.get("pool") in pools
+            ):
+                selected.append((kind, vmid, record))
+    return selected
+
+
+def order_groups(guests, reverse=False):
+    """Split guests into groups of equal startup order, in the order PVE uses.
+
+    `guests` is a list of (kind, vmid, record, startup). Guests without an
+    order start after and stop before all ordered guests.
+    """
+
+    def key(guest):
+        return guest[3].get("order", math.inf)
+
+    ordered = sorted(guests, key=key, reverse=reverse)
+    return [list(group) for _, group in groupby(ordered, key=key)]
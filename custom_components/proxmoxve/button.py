@@ -9,12 +9,12 @@ from homeassistant.components.button import (
     ButtonEntityDescription,
 )
 from homeassistant.const import EntityCategory
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.config_entries import ConfigEntry
 from .const import DOMAIN
 from .pve import PVEDataUpdateCoordinator, PowerAction
-from .entity import PVENodeEntity, PVEVMEntity
+from .entity import PVENodeEntity, PVEVMPowerEntity
 
 
 _LOGGER = logging.getLogger(__name__)
@@ -104,57 +104,50 @@ async def async_setup_entry(
     
     coordinator: PVEDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
 
-    cache_nodes = set()
-    cache_qemus = set()
-    cache_lxcs = set() 
-
-    def _on_update():
+    @callback
+    def _on_membership(added, removed):
         dev: list[ButtonEntity] = []
-        for id, node in coordinator.data.nodes.items():
-            if id is None or id in cache_nodes:
-                continue
-            cache_nodes.add(id)
-            for description in NODE_BUTTONS:
-                dev.append(PVENodeButton(
-                    hass,
-                    description=description,
-                    entry=entry,
-                    coordinator=coordinator,
-                    data=node
-                ))
-        for id, qemu in coordinator.data.qemus.items():
-            if id is None or id in cache_qemus:
-                continue
-            cache_qemus.add(id)
-            for description in QEMU_BUTTONS:
-                dev.append(PVEQemuButton(
-                    hass,
-                    description=description,
-                    entry=entry,
-                    coordinator=coordinator,
-                    data=qemu
-                ))
-        
-        for id, lxc in coordinator.data.lxcs.items():
-            if id is None or id in cache_lxcs:
-                continue
-            cache_lxcs.add(id)
-            for description in LXC_BUTTONS:
-                dev.append(PVELXCButton(
-                    hass,
-                    description=description,
-                    entry=entry,
-                    coordinator=coordinator,
-                    data=lxc
-                ))
-            
+        data = coordinator.data
+        for kind, id in added:
+            if kind == "node":
+                for description in NODE_BUTTONS:
+                    dev.append(PVENodeButton(
+                        hass,
+                        description=description,
+                        entry=entry,
+                        coordinator=coordinator,
+                        data=data.nodes[id]
+                    ))
+            elif kind == "qemu":
+                for description in QEMU_BUTTONS:
+                    dev.append(PVEQemuButton(
+                        hass,
+                        description=description,
+                        entry=entry,
+                        coordinator=coordinator,
+                        data=data.qemus[id]
+                    ))
+            elif kind == "lxc":
+                for description in LXC_BUTTONS:
+                    dev.append(PVELXCButton(
+                        hass,
+                        description=description,
+                        entry=entry,
+                        coordinator=coordinator,
+                        data=data.lxcs[id]
+                    ))
+
         if dev:
             async_add_entities(dev)
 
-    coordinator.async_add_listener(_on_update)
+    entry.async_on_unload(coordinator.async_add_membership_listener(_on_membership))
 
 class PVENodeButton(PVENodeEntity, ButtonEntity):
 
+    def _change_fields(self):
+        # 按钮没有状态，只需要跟随可用性刷新
+        return ()
+
     def __init__(
         self,
         hass,
@@ -169,7 +162,9 @@ class PVENodeButton(PVENodeEntity, ButtonEntity):
         await self.coordinator.async_node_power(action=self.entity_description.action, node=self.node)
 
 
-class PVEQemuButton(PVEVMEntity, ButtonEntity):
+class PVEQemuButton(PVEVMPowerEntity, ButtonEntity):
+
+    _vm_kind = "qemu"
 
     def __init__(
         self,
@@ -184,7 +179,9 @@ class PVEQemuButton(PVEVMEntity, ButtonEntity):
     async def async_press(self) -> None:
         await self.coordinator.async_qemu_power(action=self.entity_description.action, node=self.node, vm=self.vmid)
 
-class PVELXCButton(PVEVMEntity, ButtonEntity):
+class PVELXCButton(PVEVMPowerEntity, ButtonEntity):
+
+    _vm_kind = "lxc"
 
     def __init__(
         self,
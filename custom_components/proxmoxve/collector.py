@@ -0,0 +1,763 @@
+"""Home Assistant independent collection pipeline of a Proxmox VE cluster."""
+from __future__ import annotations
+
+import asyncio
+import datetime
+from enum import StrEnum
+import json
+import logging
+import time
+
+from .api import PVEApiClient, PVEAuthError
+from .disks import (
+    INVENTORY_COMMAND,
+    SmartCache,
+    parse_inventory,
+    parse_smart_batch,
+    smart_command,
+)
+from .lmsensors import SensorMap, chip_signature
+from .rates import RateTracker
+from .ssh import PVESSHPool, PVESSHError
+from .stream import PVETelemetryStream
+from .timing import PhaseTimer
+from .utils import to_pecent
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class PVECollectError(Exception):
+    """cluster/resources could not be fetched or parsed."""
+
+
+NODE_TIMEOUT = 20
+# 层级采集失败后，最多等这么久就重试，而不是等一个完整周期
+TIER_RETRY_DELAY = 30
+
+SNAPSHOT_SLOTS = ("nodes", "qemus", "lxcs", "storages", "disks", "readings")
+
+class PollTier(StrEnum):
+    SENSORS = "sensors"
+    SMART = "smart"
+
+
+class PVEData:
+    """Snapshot of a single poll.
+
+    A new snapshot is built for every poll and swapped in as a whole, so
+    entities never observe a half-built one. Snapshots are not modified
+    after they are published; cached tier results are replaced, never
+    updated in place.
+
+    `changes` maps (kind, id) to the set of fields that differ from the
+    previous snapshot, or is None when every entity should be updated.
+    `added` and `removed` hold the (kind, id) members that appeared or
+    disappeared since the previous snapshot; disks use (node, path) and
+    lm-sensors readings use (node, key) as id. The coordinator only
+    reports a member as removed once it has been missing from several
+    successful polls in a row.
+
+    Shared storages appear once under their name, local storages under
+    "node/storage".
+    """
+
+    __slots__ = (
+        "nodes",
+        "qemus",
+        "lxcs",
+        "storages",
+        "disks",
+        "readings",
+        "time",
+        "changes",
+        "added",
+        "removed",
+    )
+
+    def __init__(self, time: datetime.datetime | None = None) -> None:
+        self.nodes: dict[str, dict] = {}
+        self.qemus: dict[int, dict] = {}
+        self.lxcs: dict[int, dict] = {}
+        self.storages: dict[str, dict] = {}
+        self.disks: dict[str, dict] = {}
+        self.readings: dict[str, dict] = {}
+        self.time = time or datetime.datetime.now(datetime.timezone.utc)
+        self.changes: dict[tuple[str, object], set] | None = None
+        self.added: set[tuple[str, object]] = set()
+        self.removed: set[tuple[str, object]] = set()
+
+    def with_record(self, kind: str, id, fields: dict) -> "PVEData":
+        """Return a copy of the snapshot with one record's fields replaced.
+
+        Only the touched collection and record are copied; the copy has a
+        change set covering just that record.
+        """
+        data = PVEData()
+        for slot in SNAPSHOT_SLOTS:
+            setattr(data, slot, getattr(self, slot))
+        records = getattr(self, f"{kind}s")
+        record = records[id]
+        setattr(data, f"{kind}s", {**records, id: {**record, **fields}})
+        data.changes = {(kind, id): {key for key, value in fields.items() if record.get(key) != value}}
+        return data
+
+    def as_dict(self) -> dict:
+        """JSON compatible form of the snapshot, without change sets."""
+        return {
+            "time": self.time.isoformat(),
+            **{slot: getattr(self, slot) for slot in SNAPSHOT_SLOTS},
+        }
+
+    @classmethod
+    def from_dict(cls, value: dict) -> "PVEData":
+        data = cls(datetime.datetime.fromisoformat(value["time"]))
+        for slot in SNAPSHOT_SLOTS:
+            records = value.get(slot) or {}
+            if slot in ("qemus", "lxcs"):
+                # JSON 的键都是字符串，vmid 要转回整数
+                records = {int(id): record for id, record in records.items()}
+            setattr(data, slot, records)
+        return data
+
+    def records(self):
+        """Iterate (kind, id, record) over everything in the snapshot."""
+        for kind, records in (
+            ("node", self.nodes),
+            ("qemu", self.qemus),
+            ("lxc", self.lxcs),
+            ("storage", self.storages),
+            ("disk", self.disks),
+            ("reading", self.readings),
+        ):
+            for id, record in records.items():
+                yield kind, id, record
+
+
+def snapshot_members(data: PVEData | None) -> set[tuple[str, object]]:
+    """Return the (kind, id) of every node, guest and disk in the snapshot."""
+    if data is None:
+        return set()
+    members = {
+        (kind, id)
+        for kind, id, _ in data.records()
+        if kind not in ("disk", "reading") and id is not None
+    }
+    members.update(
+        ("disk", (node, path)) for node, disks in data.disks.items() for path in disks
+    )
+    members.update(
+        ("reading", (node, key)) for node, values in data.readings.items() for key in values
+    )
+    return members
+
+
+def diff_snapshots(old: PVEData | None, new: PVEData):
+    """Return the change set between two snapshots, see PVEData.changes."""
+    if old is None:
+        return None
+
+    old_records = {(kind, id): record for kind, id, record in old.records()}
+    changes = {}
+    for kind, id, record in new.records():
+        prev = old_records.pop((kind, id), None)
+        if prev is None:
+            changes[(kind, id)] = set(record)
+            continue
+        fields = {key for key, value in record.items() if prev.get(key) != value}
+        fields.update(key for key in prev if key not in record)
+        if fields:
+            changes[(kind, id)] = fields
+    # 消失的记录也要通知，让对应的实体刷新为未知
+    for key, prev in old_records.items():
+        changes[key] = set(prev)
+    return changes
+
+
+class PVECollector:
+    """Polls the API and the node hosts and builds PVEData snapshots.
+
+    Runs on any asyncio loop; the coordinator wraps it for Home Assistant,
+    the probe CLI and the benchmarks drive it directly. `host` is the
+    address the API client talks to, it is also used as SSH address of the
+    local node. `clock` drives the tier schedule, SMART cache and rates;
+    fixture replay passes the recorded time instead of the wall clock.
+    """
+
+    def __init__(
+        self,
+        api: PVEApiClient,
+        ssh: PVESSHPool,
+        host: str,
+        sensors_interval: float,
+        smart_interval: float,
+        smart_ttl: float,
+        rate_smoothing: float = 0.0,
+        streaming: bool = False,
+        stream_interval: float = 5.0,
+        on_stream_record=None,
+        clock=time.monotonic,
+    ) -> None:
+        self.api = api
+        self.ssh = ssh
+        self._ssh_host = host
+        self._node_hosts = {}
+        # 可选的流式采集：每个节点一个常驻SSH通道，取代周期性的 sensors -j
+        self._streaming = streaming
+        self._stream_interval = stream_interval
+        self._on_stream_record = on_stream_record
+        self._streams = {}
+        # cluster.resources 每个周期都刷新，lm-sensors 和 SMART 按各自的周期刷新
+        self._tier_intervals = {
+            PollTier.SENSORS: sensors_interval,
+            PollTier.SMART: smart_interval,
+        }
+        self._tier_next_run = {}
+        self._node_temperatures = {}
+        self._node_readings = {}
+        self._sensor_maps = {}
+        self._disks = {}
+        # SMART结果按节点缓存，过期前不再查询
+        self._smart_ttl = smart_ttl
+        self._smart_caches = {}
+        self._rates = RateTracker(smoothing=rate_smoothing)
+        self.timings = PhaseTimer()
+        self._clock = clock
+
+    async def async_collect(self) -> PVEData:
+        """Run one poll and return the new snapshot, without change sets.
+
+        Raises PVEAuthError if the API rejects the credentials and
+        PVECollectError if cluster/resources is unusable.
+        """
+        # 按阶段记录耗时，用于诊断传感器和诊断信息下载
+        with self.timings.measure("poll"):
+            try:
+                with self.timings.measure("api_fetch"):
+                    resources = await self.api.async_get("cluster/resources")
+            except PVEAuthError:
+                raise
+            except Exception as error:
+                # 不能返回空快照，否则所有节点和虚拟机都会被当作已删除
+                raise PVECollectError(f"Failed to get cluster resources: {error}") from error
+
+            node_names = [
+                res.get("node")
+                for res in resources
+                if res.get("type", None) == "node" and res.get("status") != "offline"
+            ]
+            now = self._clock()
+            sensors_due = self._tier_due(PollTier.SENSORS, now)
+            smart_due = self._tier_due(PollTier.SMART, now)
+            if sensors_due or smart_due:
+                await self._async_update_node_hosts()
+                if self._streaming:
+                    await self._async_update_streams(node_names)
+                # 各节点并发采集，单个节点超时不影响其他节点
+                failed = await asyncio.gather(
+                    *(
+                        self._async_collect_node(node_name, sensors_due, smart_due)
+                        for node_name in node_names
+                    )
+                )
+                failed = set().union(*failed)
+                for tier, due in ((PollTier.SENSORS, sensors_due), (PollTier.SMART, smart_due)):
+                    if due:
+                        self._schedule_tier(tier, now, tier not in failed)
+            if self._streams:
+                self._merge_streams()
+
+            with self.timings.measure("parse"):
+                return self._update_data(resources)
+
+    def restore(self, data: PVEData, sensor_maps: dict) -> None:
+        """Seed the tier results from a saved snapshot.
+
+        The next poll still runs every tier. Until a tier succeeds the
+        restored disks and readings are kept, as after a failed tier.
+        """
+        self._disks = dict(data.disks)
+        self._node_readings = dict(data.readings)
+        self._sensor_maps = {
+            node: SensorMap.from_dict(value) for node, value in sensor_maps.items()
+        }
+
+    def export_sensor_maps(self) -> dict:
+        """The discovered lm-sensors mappings, saved along with the snapshot."""
+        return {node: sensor_map.as_dict() for node, sensor_map in self._sensor_maps.items()}
+
+    def reset_tiers(self):
+        """Make the next poll run every tier and probe every disk."""
+        self._tier_next_run = {}
+        self._smart_caches = {}
+
+    async def async_close(self):
+        for stream in self._streams.values():
+            await stream.async_stop()
+        self._streams = {}
+        await self.ssh.async_close()
+
+    async def _async_update_streams(self, node_names):
+        streams = {}
+        for node_name in node_names:
+            host = self._get_node_host(node_name)
+            if not host:
+                continue
+            stream = self._streams.pop(node_name, None)
+            if stream is None:
+                stream = PVETelemetryStream(
+                    self.ssh, host, self._stream_interval, self._on_stream_record
+                )
+            stream.start()
+            streams[node_name] = stream
+        # 已经离开集群或离线的节点关闭其数据流
+        for stream in self._streams.values():
+            await stream.async_stop()
+        self._streams = streams
+
+    def _merge_streams(self):
+        """Merge the latest streamed record of every node into the tier caches."""
+        for node_name, stream in self._streams.items():
+            if not stream.fresh:
+                continue
+            record = stream.latest
+            temperatures = self._map_node_sensors(
+                node_name, record.get("sensors", {}), partial=True
+            )
+            temperatures["cpu_iowait"] = round(record.get("cpu", {}).get("iowait", 0), 2)
+            self._node_temperatures = {**self._node_temperatures, node_name: temperatures}
+
+            # 用 hwmon 温度覆盖 SMART 周期中读到的磁盘温度
+            disk_temps = record.get("disks", {})
+            disks = self._disks.get(node_name)
+            if disks and disk_temps:
+                self._disks = {
+                    **self._disks,
+                    node_name: {
+                        path: (
+                            {**info, "temperature": disk_temps[path]}
+                            if path in disk_temps
+                            else info
+                        )
+                        for path, info in disks.items()
+                    },
+                }
+
+    def apply_streams(self, data: PVEData) -> PVEData | None:
+        """Return a copy of `data` with the latest streamed records merged.
+
+        Between polls this publishes the streamed temperatures, readings
+        and disk temperatures without touching the API. Returns None when
+        nothing changed. Streams never change the set of members.
+        """
+        if not self._streams:
+            return None
+        self._merge_streams()
+        new = PVEData(data.time)
+        for slot in SNAPSHOT_SLOTS:
+            setattr(new, slot, getattr(data, slot))
+        new.nodes = {
+            node: {**record, **self._node_temperatures.get(node, {})}
+            for node, record in data.nodes.items()
+        }
+        new.disks = {node: disks for node, disks in self._disks.items() if node in data.nodes}
+        new.readings = {
+            node: values for node, values in self._node_readings.items() if node in data.nodes
+        }
+        changes = {}
+        for kind, old_records, records in (
+            ("node", data.nodes, new.nodes),
+            ("disk", data.disks, new.disks),
+            ("reading", data.readings, new.readings),
+        ):
+            for id, record in records.items():
+                prev = old_records.get(id, {})
+                fields = {key for key, value in record.items() if prev.get(key) != value}
+                if fields:
+                    changes[(kind, id)] = fields
+        if not changes:
+            return None
+        new.changes = changes
+        return new
+
+    async def _async_update_node_hosts(self):
+        """Resolve the SSH address of every cluster node from cluster/status."""
+        try:
+            status = await self.api.async_get("cluster/status")
+        except Exception as e:
+            _LOGGER.warning(f"Failed to get cluster status: {e}")
+            return
+
+        node_hosts = {}
+        for item in status or []:
+            if item.get("type") != "node":
+                continue
+            # 配置的主机地址就是本地节点，其他节点使用集群中登记的IP
+            if item.get("local"):
+                node_hosts[item.get("name")] = self._ssh_host
+            elif item.get("ip"):
+                node_hosts[item.get("name")] = item.get("ip")
+        self._node_hosts = node_hosts
+
+    def _get_node_host(self, node_name):
+        if node_name in self._node_hosts:
+            return self._node_hosts[node_name]
+        if not self._node_hosts:
+            # 获取不到集群状态时只能假设是单节点
+            return self._ssh_host
+        return None
+
+    def host_available(self, node_name):
+        """False while the node's SSH host is backed off after failures."""
+        host = self._get_node_host(node_name)
+        return host is None or self.ssh.available(host)
+
+    async def _async_collect_node(self, node_name, sensors_due, smart_due):
+        """Collect the due tiers of one node, return the tiers that failed."""
+        host = self._get_node_host(node_name)
+        if not host:
+            _LOGGER.debug(f"No address known for node {node_name}, skipping host telemetry")
+            return set()
+
+        tiers = {}
+        stream = self._streams.get(node_name)
+        # 数据流正常时不再单独执行 sensors -j
+        if sensors_due and not (stream and stream.fresh):
+            tiers[PollTier.SENSORS] = self._async_update_node_temperatures(node_name, host)
+        if smart_due:
+            tiers[PollTier.SMART] = self._async_update_disks(node_name, host)
+        try:
+            # 温度和磁盘采集在同一个SSH连接上并发执行
+            results = await asyncio.wait_for(asyncio.gather(*tiers.values()), NODE_TIMEOUT)
+        except asyncio.TimeoutError:
+            _LOGGER.warning(f"Collecting host telemetry from {node_name} timed out")
+            return set(tiers)
+        return {tier for tier, ok in zip(tiers, results) if not ok}
+
+    async def _async_update_disks(self, node_name, host):
+        with self.timings.measure("smart"):
+            disks, complete = await self._async_get_disk_info(node_name, host)
+        if disks is not None:
+            self._disks = {**self._disks, node_name: disks}
+        return complete
+
+    async def _async_get_disk_info(self, node_name, host):
+        """Get disk inventory and the SMART data of disks whose cache expired.
+
+        Returns (disks, complete); complete is False if a probe failed and
+        the tier should be retried soon.
+        """
+        try:
+            output = await self.ssh.async_run(host, INVENTORY_COMMAND)
+        except PVESSHError as e:
+            _LOGGER.error(f"Failed to get disk info: {e}")
+            return None, False
+
+        devices = parse_inventory(output)
+        if devices is None:
+            # lsblk 不支持 JSON 输出时退回到逐个磁盘查询
+            _LOGGER.debug("Batched disk probe unavailable, falling back to per-disk probe")
+            disks = await self._async_get_disk_info_legacy(host)
+            return disks, disks is not None
+
+        cache = self._smart_caches.setdefault(node_name, SmartCache(self._smart_ttl))
+        now = self._clock()
+        due = cache.due(devices, now)
+        # 缓存未过期的磁盘每个 SMART 周期仍读取温度
+        temperature_paths = [path for path in devices if path not in due]
+        smart_by_path = {}
+        complete = True
+        if devices:
+            try:
+                output = await self.ssh.async_run(host, smart_command(due, temperature_paths))
+            except PVESSHError as e:
+                _LOGGER.error(f"Failed to get SMART data: {e}")
+                complete = False
+            else:
+                smart_by_path = parse_smart_batch(output)
+        disk_info = cache.update(devices, smart_by_path, now, temperature_paths)
+        standby = [path for path, info in disk_info.items() if info["standby"]]
+        _LOGGER.debug(
+            f"Found {len(disk_info)} disks on {node_name}, probed {len(due)}, "
+            f"temperature only {len(temperature_paths)}, standby: {standby}"
+        )
+        return disk_info, complete
+
+    async def _async_get_disk_info_legacy(self, host):
+        """Get disk model and temperature via SSH, one probe per disk."""
+        try:
+            # List disks - 使用更可靠的方法获取磁盘列表
+            output = await self.ssh.async_run(host, "find /dev -name 'sd*' -not -path '*/mapper/*' | sort")
+            output = output.strip()
+            
+            # 确保即使只有一个磁盘也能正确处理
+            if not output:
+                _LOGGER.warning("No disks found")
+                return {}
+                
+            disks = output.split("\n")
+            
+            # 过滤掉分区（带数字的设备名）
+            main_disks = []
+            for disk in disks:
+                disk_name = disk.split("/")[-1]
+                # 只保留不包含数字的设备名（主磁盘设备）
+                if disk.strip() and not any(c.isdigit() for c in disk_name):
+                    main_disks.append(disk)
+            
+            _LOGGER.debug(f"Found {len(main_disks)} main disks (excluding partitions): {main_disks}")
+            
+            # 每个磁盘的查询作为独立通道并发执行
+            results = await asyncio.gather(
+                *(self._async_probe_disk_legacy(host, disk) for disk in main_disks)
+            )
+            return dict(zip(main_disks, results))
+        except Exception as e:
+            _LOGGER.error(f"Failed to get disk info: {e}")
+            return None
+
+    async def _async_probe_disk_legacy(self, host, disk):
+        # 首先尝试获取磁盘型号
+        model_output = await self.ssh.async_run(
+            host, f"lsblk -o NAME,MODEL,VENDOR -dn {disk}"
+        )
+        model_output = model_output.strip()
+
+        model_family = "Unknown"
+        device_model = "Unknown"
+        temperature = None
+
+        # 从lsblk输出中提取型号
+        if model_output:
+            parts = model_output.split()
+            if len(parts) > 1:
+                device_model = " ".join(parts[1:]).strip()
+
+        # 如果lsblk没有提供足够信息，尝试使用smartctl
+        if device_model == "Unknown":
+            output = await self.ssh.async_run(
+                host, f"smartctl -a {disk} | grep -E \"Model|Family\""
+            )
+
+            lines = output.strip().split("\n")
+            for line in lines:
+                if "Model Family" in line:
+                    model_family = line.split("Model Family:")[1].strip()
+                elif "Device Model" in line:
+                    device_model = line.split("Device Model:")[1].strip()
+
+        # 获取温度信息 - 使用更可靠的方法
+        temp_output = await self.ssh.async_run(
+            host, f"smartctl -a {disk} | grep -E \"Temperature_Celsius|Current Temperature\""
+        )
+
+        # 如果第一种方法没有找到温度数据，尝试备用方法
+        if not temp_output.strip():
+            temp_output = await self.ssh.async_run(
+                host, f"smartctl -a {disk} | grep -E \"Temperature:|Airflow_Temperature\""
+            )
+
+        # 提取温度信息
+        for line in temp_output.strip().split("\n"):
+            if "Temperature_Celsius" in line:
+                # 使用固定位置（第10个字段）获取温度值
+                parts = line.strip().split()
+                if len(parts) >= 10:
+                    try:
+                        # 直接使用第10个字段（索引9）获取温度
+                        temperature = int(parts[9])
+                        # 如果获取到的温度是0，可能是格式问题，尝试其他方法
+                        if temperature == 0:
+                            # 尝试使用最后一个字段
+                            temperature = int(parts[-1])
+                    except ValueError:
+                        temperature = None
+
+        # Use device model as the primary name, fallback to model family
+        model = device_model if device_model != "Unknown" else model_family
+
+        return {
+            "model": model,
+            "temperature": temperature
+        }
+
+    def _tier_due(self, tier: PollTier, now: float) -> bool:
+        """Return True if the given tier should be refreshed in this cycle."""
+        next_run = self._tier_next_run.get(tier)
+        return next_run is None or now >= next_run
+
+    def _schedule_tier(self, tier: PollTier, started: float, ok: bool) -> None:
+        """Schedule the next run of a tier that ran in the cycle started at `started`."""
+        interval = self._tier_intervals[tier]
+        if not ok:
+            # 有节点失败时尽快重试，而不是等一个完整周期
+            interval = min(interval, TIER_RETRY_DELAY)
+        self._tier_next_run[tier] = started + interval
+
+    async def _async_update_node_temperatures(self, node_name, host):
+        with self.timings.measure("sensors"):
+            result = await self._async_get_node_temperatures(node_name, host)
+        # SSH 失败时保留上一次的结果
+        if result is None:
+            return False
+        self._node_temperatures = {**self._node_temperatures, node_name: result}
+        return True
+
+    def _update_data(self, resources):
+        data = PVEData()
+        try:
+            _LOGGER.debug(resources)
+
+            for res in resources:
+                if res.get("type", None) != "node":
+                    continue
+                node, id = self._get_node_info(res)
+                data.nodes[id] = node
+
+            for res in resources:
+                res_type = res.get("type", None)
+                if res_type == "lxc":
+                    lxc, id = self._get_lxc_info(res, data.nodes)
+                    data.lxcs[id] = lxc
+                elif res_type == "qemu":
+                    qemu, id = self._get_qemu_info(res, data.nodes)
+                    data.qemus[id] = qemu
+                elif res_type == "storage":
+                    storage, id = self._get_storage_info(res)
+                    # 共享存储在每个节点上都会出现一次，只保留一份
+                    known = data.storages.get(id)
+                    if known is None or (
+                        known.get("status") != "available"
+                        and storage.get("status") == "available"
+                    ):
+                        data.storages[id] = storage
+                elif res_type == "sdn":
+                    pass
+
+            # 网络和磁盘IO计数器统一在这里换算成速率
+            guests = {("qemu", id): qemu for id, qemu in data.qemus.items()}
+            guests.update((("lxc", id), lxc) for id, lxc in data.lxcs.items())
+            self._rates.update(guests, self._clock())
+        except Exception as error:
+            raise PVECollectError(f"Failed to parse cluster resources: {error}") from error
+
+        # 返回的PVEData对象总是带有最近一次的磁盘信息，按节点分组
+        data.disks = {
+            node: disks for node, disks in self._disks.items() if node in data.nodes
+        }
+        data.readings = {
+            node: values for node, values in self._node_readings.items() if node in data.nodes
+        }
+        return data
+
+    def _get_lxc_info(self, lxc, nodes):
+        lxc = self._get_usage_info(lxc, nodes)
+        return lxc, lxc.get("vmid")
+
+    def _get_qemu_info(self, qemu, nodes):
+        qemu = self._get_usage_info(qemu, nodes)
+        return qemu, qemu.get("vmid")
+
+    def _get_storage_info(self, storage):
+        storage = self._get_usage_info(storage)
+        shared = bool(storage.get("shared"))
+        storage["shared"] = shared
+        storage["storage_type"] = "shared" if shared else "local"
+        maxdisk = storage.get("maxdisk")
+        disk = storage.get("disk")
+        storage["storage_free"] = (
+            maxdisk - disk if maxdisk is not None and disk is not None else None
+        )
+        if shared:
+            storage["key"] = storage.get("storage")
+        else:
+            storage["key"] = f"{storage.get('node')}/{storage.get('storage')}"
+        return storage, storage["key"]
+
+    def _get_node_info(self, node):
+        node = self._get_usage_info(node)
+        # 温度数据按传感器周期刷新，这里合并最近一次的结果
+        node.update(self._node_temperatures.get(node.get("node"), {}))
+        return node, node.get("node")
+
+    async def _async_get_node_temperatures(self, node_name, host):
+        """Get node temperatures via `sensors -j` over SSH."""
+        if not node_name:
+            return {}
+        # 通过SSH执行sensors -j命令获取温度数据
+        _LOGGER.debug(f"尝试通过SSH获取节点 {node_name} 的温度信息")
+        try:
+            sensors_output = await self.ssh.async_run(host, "sensors -j")
+        except PVESSHError as e:
+            _LOGGER.warning(f"SSH连接失败，无法获取温度信息: {e}")
+            return None
+
+        if not sensors_output.strip():
+            _LOGGER.warning(f"执行sensors命令时出错: 请安装lm-sensors包以获取温度相关数据")
+            return {}
+        # 解析JSON格式的温度数据
+        try:
+            sensors_data = json.loads(sensors_output)
+        except ValueError as e:
+            _LOGGER.warning(f"处理温度数据时发生错误: {e}")
+            return {}
+        return self._map_node_sensors(node_name, sensors_data)
+
+    def _map_node_sensors(self, node_name, sensors_data, partial=False):
+        """Extract the node's readings from `sensors -j` style data.
+
+        The chip/feature mapping is discovered once per node and reused
+        until the set of chips reported by the node changes. `partial`
+        data (the telemetry stream only reads temperatures) never changes
+        an existing mapping; readings of chips it lacks keep their values.
+        """
+        sensor_map = self._sensor_maps.get(node_name)
+        signature = chip_signature(sensors_data)
+        if sensor_map is None or (not partial and sensor_map.signature != signature):
+            sensor_map = SensorMap.discover(sensors_data)
+            self._sensor_maps[node_name] = sensor_map
+            _LOGGER.debug(f"Discovered {len(sensor_map.readings)} sensor readings on {node_name}")
+        values = sensor_map.extract(sensors_data)
+        if partial:
+            previous = self._node_readings.get(node_name, {})
+            values = {
+                reading.key: (
+                    values[reading.key]
+                    if reading.chip in signature
+                    else previous.get(reading.key)
+                )
+                for reading in sensor_map.readings
+            }
+        self._node_readings = {**self._node_readings, node_name: values}
+        return sensor_map.summarize(values)
+
+    def get_sensor_reading(self, node_name, key):
+        """Return the SensorReading metadata of a discovered reading."""
+        if sensor_map := self._sensor_maps.get(node_name):
+            return sensor_map.by_key.get(key)
+        return None
+
+    def _get_usage_info(self, res, nodes=None):
+        res["cpu_usage"] = to_pecent(res.get("cpu"))
+        res["mem_usage"] = self._usage_pecent(res, "mem", "maxmem")
+        res["disk_usage"] = self._usage_pecent(res, "disk", "maxdisk")
+        if nodes:
+            node = nodes.get(res.get("node"), {})
+            res["node_maxcpu"] = node.get("maxcpu")
+            cpu = res.get("cpu")
+            maxcpu = res.get("maxcpu")
+            node_maxcpu = res.get("node_maxcpu")
+            res["node_cpu_usage"] = (
+                to_pecent(cpu * maxcpu / node_maxcpu)
+                if cpu is not None and maxcpu is not None and node_maxcpu
+                else None
+            )
+            res["node_maxmem"] = node.get("maxmem")
+            res["node_mem_usage"] = self._usage_pecent(res, "mem", "node_maxmem")
+        return res
+
+    def _usage_pecent(self, data, key_a, key_b):
+        a = data.get(key_a)
+        b = data.get(key_b)
+        if a is None or not b:
+            return None
+        return to_pecent(a / b)
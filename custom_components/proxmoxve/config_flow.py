@@ -1,10 +1,13 @@
 from __future__ import annotations
+import asyncio
 import logging
 
+import aiohttp
 import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.core import callback
 import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.const import (
     CONF_NAME,
     CONF_HOST,
@@ -15,13 +18,55 @@ from homeassistant.const import (
     CONF_SCAN_INTERVAL
 )
 
-CONF_SSH_PORT = "ssh_port"
+from .const import (
+    DOMAIN,
+    CONF_SSH_PORT,
+    CONF_TOKEN_SECRET,
+    CONF_API_INTERVAL,
+    CONF_SENSORS_INTERVAL,
+    CONF_SMART_INTERVAL,
+    CONF_SMART_TTL,
+    CONF_RATE_SMOOTHING,
+    CONF_STREAMING,
+    CONF_STREAM_INTERVAL,
+    CONF_MAX_CONNECTIONS,
+    DEFAULT_API_INTERVAL,
+    DEFAULT_SENSORS_INTERVAL,
+    DEFAULT_SMART_INTERVAL,
+    DEFAULT_SMART_TTL,
+    DEFAULT_RATE_SMOOTHING,
+    DEFAULT_STREAM_INTERVAL,
+    DEFAULT_MAX_CONNECTIONS,
+)
 
-from .const import DOMAIN
+from .api import PVEApiClient, PVEApiError, PVEAuthError, is_token_user
 
 _LOGGER = logging.getLogger(__name__)
 
 
+async def async_validate_auth(hass, data) -> str | None:
+    """Try the credentials against the API, returns an error key or None."""
+    if is_token_user(data.get(CONF_USERNAME)) and not data.get(CONF_TOKEN_SECRET):
+        return "token_secret_required"
+    client = PVEApiClient(
+        async_get_clientsession(hass, verify_ssl=data.get(CONF_VERIFY_SSL, False)),
+        host=data[CONF_HOST],
+        port=data.get(CONF_PORT, 8006),
+        username=data[CONF_USERNAME],
+        password=data.get(CONF_PASSWORD, ""),
+        verify_ssl=data.get(CONF_VERIFY_SSL, False),
+        token_secret=data.get(CONF_TOKEN_SECRET),
+    )
+    try:
+        await client.async_get("version")
+    except PVEAuthError:
+        return "invalid_auth"
+    except (PVEApiError, aiohttp.ClientError, asyncio.TimeoutError) as e:
+        _LOGGER.debug(f"Failed to connect to {data[CONF_HOST]}: {e}")
+        return "cannot_connect"
+    return None
+
+
 class PVEFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
@@ -35,7 +80,9 @@ class PVEFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
                 f"{DOMAIN}-{user_input[CONF_HOST]}-{user_input[CONF_PORT]}"
             )
             self._abort_if_unique_id_configured()
-            return self.async_create_entry(title=user_input[CONF_NAME], data=user_input)
+            if (error := await async_validate_auth(self.hass, user_input)) is None:
+                return self.async_create_entry(title=user_input[CONF_NAME], data=user_input)
+            errors["base"] = error
 
         return self.async_show_form(
             step_id="user",
@@ -46,13 +93,42 @@ class PVEFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
                         vol.Required(CONF_PORT, default=8006): vol.Coerce(int),
                         vol.Optional(CONF_SSH_PORT, default=22): vol.Coerce(int),
                         vol.Required(CONF_USERNAME, default="root@pam"): str,
-                        vol.Required(CONF_PASSWORD): str,
+                        # 使用 API Token 时密码只用于SSH
+                        vol.Optional(CONF_PASSWORD, default=""): str,
+                        vol.Optional(CONF_TOKEN_SECRET, default=""): str,
                         vol.Required(CONF_VERIFY_SSL, default=False): bool,
                     }
             ),
             errors=errors,
         )
 
+    async def async_step_reauth(self, entry_data):
+        """Ask for new credentials when the API rejects the stored ones."""
+        return await self.async_step_reauth_confirm()
+
+    async def async_step_reauth_confirm(self, user_input=None):
+        errors = {}
+        entry = self.hass.config_entries.async_get_entry(self.context["entry_id"])
+
+        if user_input is not None:
+            # 留空的字段保留原来的值
+            data = {**entry.data, **{key: value for key, value in user_input.items() if value}}
+            if (error := await async_validate_auth(self.hass, data)) is None:
+                return self.async_update_reload_and_abort(entry, data=data)
+            errors["base"] = error
+
+        return self.async_show_form(
+            step_id="reauth_confirm",
+            data_schema=vol.Schema(
+                    {
+                        vol.Required(CONF_USERNAME, default=entry.data.get(CONF_USERNAME)): str,
+                        vol.Optional(CONF_PASSWORD, default=""): str,
+                        vol.Optional(CONF_TOKEN_SECRET, default=""): str,
+                    }
+            ),
+            errors=errors,
+        )
+
 
     @staticmethod
     @callback
@@ -72,7 +148,7 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
         if user_input is not None:
             self.hass.config_entries.async_update_entry(
                 self.config_entry,
-                data=user_input
+                data={**self.config, **user_input}
             )
             await self.hass.config_entries.async_reload(self.config_entry.entry_id)
             return self.async_create_entry(title="", data=user_input)
@@ -82,6 +158,38 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
             data_schema=vol.Schema(
                     {
                         vol.Required(CONF_VERIFY_SSL, default=self.config.get(CONF_VERIFY_SSL, False)): bool,
+                        vol.Required(
+                            CONF_API_INTERVAL,
+                            default=self.config.get(CONF_API_INTERVAL, DEFAULT_API_INTERVAL)
+                        ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                        vol.Required(
+                            CONF_SENSORS_INTERVAL,
+                            default=self.config.get(CONF_SENSORS_INTERVAL, DEFAULT_SENSORS_INTERVAL)
+                        ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                        vol.Required(
+                            CONF_SMART_INTERVAL,
+                            default=self.config.get(CONF_SMART_INTERVAL, DEFAULT_SMART_INTERVAL)
+                        ): vol.All(vol.Coerce(int), vol.Range(min=10)),
+                        vol.Required(
+                            CONF_SMART_TTL,
+                            default=self.config.get(CONF_SMART_TTL, DEFAULT_SMART_TTL)
+                        ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+                        vol.Required(
+                            CONF_RATE_SMOOTHING,
+                            default=self.config.get(CONF_RATE_SMOOTHING, DEFAULT_RATE_SMOOTHING)
+                        ): vol.All(vol.Coerce(float), vol.Range(min=0, max=0.95)),
+                        vol.Required(
+                            CONF_STREAMING,
+                            default=self.config.get(CONF_STREAMING, False)
+                        ): bool,
+                        vol.Required(
+                            CONF_STREAM_INTERVAL,
+                            default=self.config.get(CONF_STREAM_INTERVAL, DEFAULT_STREAM_INTERVAL)
+                        ): vol.All(vol.Coerce(float), vol.Range(min=0.5)),
+                        vol.Required(
+                            CONF_MAX_CONNECTIONS,
+                            default=self.config.get(CONF_MAX_CONNECTIONS, DEFAULT_MAX_CONNECTIONS)
+                        ): vol.All(vol.Coerce(int), vol.Range(min=1, max=16)),
                     }
             ),
         )
@@ -1 +1,27 @@
-DOMAIN = "proxmoxve"
\ No newline at end of file
+DOMAIN = "proxmoxve"
+
+CONF_SSH_PORT = "ssh_port"
+CONF_TOKEN_SECRET = "token_secret"
+CONF_API_INTERVAL = "api_interval"
+CONF_SENSORS_INTERVAL = "sensors_interval"
+CONF_SMART_INTERVAL = "smart_interval"
+
+DEFAULT_API_INTERVAL = 2
+DEFAULT_SENSORS_INTERVAL = 30
+DEFAULT_SMART_INTERVAL = 300
+
+CONF_SMART_TTL = "smart_ttl"
+DEFAULT_SMART_TTL = 1800
+
+CONF_RATE_SMOOTHING = "rate_smoothing"
+DEFAULT_RATE_SMOOTHING = 0.0
+
+CONF_STREAMING = "streaming"
+CONF_STREAM_INTERVAL = "stream_interval"
+DEFAULT_STREAM_INTERVAL = 5.0
+
+DEFAULT_BULK_CONCURRENCY = 4
+
+# 每个集成条目同时进行的API请求数量上限
+CONF_MAX_CONNECTIONS = "max_connections"
+DEFAULT_MAX_CONNECTIONS = 4
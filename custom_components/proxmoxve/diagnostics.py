@@ -0,0 +1,41 @@
+"""Diagnostics support for the Proxmox VE integration."""
+from __future__ import annotations
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_HOST, CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN, CONF_TOKEN_SECRET
+
+TO_REDACT = {CONF_HOST, CONF_PASSWORD, CONF_USERNAME, CONF_TOKEN_SECRET, "serial", "wwn"}
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict:
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    data = coordinator.data
+
+    snapshot = None
+    if data is not None:
+        snapshot = {
+            "time": data.time.isoformat(),
+            "nodes": len(data.nodes),
+            "qemus": len(data.qemus),
+            "lxcs": len(data.lxcs),
+            "storages": len(data.storages),
+            "disks": {
+                node: async_redact_data(disks, TO_REDACT) for node, disks in data.disks.items()
+            },
+            "readings": {node: len(values) for node, values in data.readings.items()},
+        }
+
+    return {
+        "entry": {
+            "data": async_redact_data(dict(entry.data), TO_REDACT),
+            "options": async_redact_data(dict(entry.options), TO_REDACT),
+        },
+        "last_update_success": coordinator.last_update_success,
+        "timings": coordinator.timings.summary(),
+        "stats": coordinator.entry_stats(),
+        "snapshot": snapshot,
+    }
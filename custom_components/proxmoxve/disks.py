@@ -0,0 +1,225 @@
+"""Disk inventory and standby-aware SMART probe with a per-disk result cache."""
+from __future__ import annotations
+
+import json
+import logging
+import shlex
+
+_LOGGER = logging.getLogger(__name__)
+
+SMART_MARKER = "@@SMART@@"
+
+# lsblk 只读取内核中的信息，不会唤醒休眠的磁盘
+INVENTORY_COMMAND = "lsblk -J -d -o NAME,PATH,MODEL,VENDOR,SERIAL,WWN,TYPE,ROTA"
+SKIPPED_DEVICES = ("zram", "rbd", "nbd")
+
+# 磨损程度的属性，归一化值是剩余寿命百分比
+WEAR_ATTRIBUTES = (177, 231, 233)
+
+
+def _loads(text):
+    try:
+        return json.loads(text)
+    except ValueError:
+        return None
+
+
+def parse_inventory(output: str) -> dict | None:
+    """Parse the output of INVENTORY_COMMAND into {path: device}.
+
+    Returns None if lsblk has no JSON output, so callers can fall back to
+    the per-disk probe.
+    """
+    inventory = _loads(output)
+    if not inventory or "blockdevices" not in inventory:
+        return None
+    devices = {}
+    for device in inventory["blockdevices"]:
+        path = device.get("path") or f"/dev/{device.get('name')}"
+        if device.get("type") != "disk" or any(skip in path for skip in SKIPPED_DEVICES):
+            continue
+        devices[path] = device
+    return devices
+
+
+def _smart_loop(paths, option: str) -> str:
+    quoted = " ".join(shlex.quote(path) for path in paths)
+    return (
+        f"for d in {quoted}; do "
+        f"printf '\\n%s %s\\n' '{SMART_MARKER}' \"$d\"; "
+        f"smartctl -n standby -j {option} \"$d\"; "
+        "done"
+    )
+
+
+def smart_command(paths, temperature_paths=()) -> str:
+    """One remote call running `smartctl -n standby` on each of the given disks.
+
+    `paths` get the full SMART data, `temperature_paths` only the
+    attributes, which carry the current temperature.
+    """
+    loops = []
+    if paths:
+        loops.append(_smart_loop(paths, "-a"))
+    if temperature_paths:
+        loops.append(_smart_loop(temperature_paths, "-A"))
+    return "; ".join(loops)
+
+
+def parse_smart_batch(output: str) -> dict:
+    """Split the output of smart_command into {path: smartctl JSON}."""
+    smart_by_path = {}
+    for chunk in output.split(f"\n{SMART_MARKER} ")[1:]:
+        path, _, body = chunk.partition("\n")
+        smart = _loads(body)
+        if smart is None:
+            _LOGGER.debug(f"No SMART JSON for {path.strip()}")
+            continue
+        smart_by_path[path.strip()] = smart
+    return smart_by_path
+
+
+def is_standby(smart: dict) -> bool:
+    """True if smartctl skipped the disk because it is spun down."""
+    status = smart.get("smartctl", {})
+    if not status.get("exit_status", 0) & 2:
+        return False
+    # -n standby 跳过时返回 2，并提示 "Device is in STANDBY mode"
+    return any(
+        "STANDBY" in message.get("string", "") or "SLEEP" in message.get("string", "")
+        for message in status.get("messages", [])
+    )
+
+
+def _ata_attribute(smart, ids):
+    for attr in smart.get("ata_smart_attributes", {}).get("table", []):
+        if attr.get("id") in ids:
+            return attr
+    return None
+
+
+def _smart_temperature(smart):
+    temperature = smart.get("temperature", {}).get("current")
+    if temperature is not None:
+        return temperature
+    # 部分设备只在属性表中提供温度
+    attr = _ata_attribute(smart, (194, 190))
+    if attr and (value := attr.get("raw", {}).get("value")) is not None:
+        # raw 值的低16位是当前温度
+        return value & 0xFFFF
+    return None
+
+
+def _smart_reallocated(smart):
+    if (attr := _ata_attribute(smart, (5,))) is not None:
+        return attr.get("raw", {}).get("value")
+    # SAS 磁盘使用 grown defect list
+    return smart.get("scsi_grown_defect_list")
+
+
+def _smart_wear(smart):
+    """Percentage of rated endurance used, 0 for a new SSD."""
+    nvme = smart.get("nvme_smart_health_information_log", {})
+    if (used := nvme.get("percentage_used")) is not None:
+        return used
+    if (attr := _ata_attribute(smart, WEAR_ATTRIBUTES)) is not None:
+        if (value := attr.get("value")) is not None:
+            return max(0, 100 - value)
+    return None
+
+
+def parse_smart(smart: dict) -> dict:
+    """Fields exposed for one disk from its smartctl JSON."""
+    passed = smart.get("smart_status", {}).get("passed")
+    return {
+        "model": smart.get("model_name") or smart.get("model_family"),
+        "serial": smart.get("serial_number"),
+        "temperature": _smart_temperature(smart),
+        "smart_status": None if passed is None else ("passed" if passed else "failed"),
+        "power_on_hours": smart.get("power_on_time", {}).get("hours"),
+        "reallocated_sectors": _smart_reallocated(smart),
+        "wear_level": _smart_wear(smart),
+    }
+
+
+# parse_smart 给出的字段，没有 SMART 结果的磁盘这些字段为 None
+SMART_FIELDS = tuple(parse_smart({}))
+
+
+def disk_key(device: dict, path: str) -> str:
+    """Stable identity of a disk: WWN, then serial, then device path."""
+    return device.get("wwn") or device.get("serial") or path
+
+
+class SmartCache:
+    """Last SMART result of every disk on one node, reused until the TTL expires.
+
+    The TTL only applies to the full SMART data; the temperature of every
+    other disk is read on each SMART cycle and merged into the cached
+    result. A disk found in standby keeps its previous result and is
+    probed again on the next SMART cycle instead of waiting for the TTL.
+    A disk without
+    any SMART result yet is still listed from the inventory, with its SMART
+    fields set to None, and is probed again on the next SMART cycle.
+    """
+
+    def __init__(self, ttl: float) -> None:
+        self._ttl = ttl
+        # disk key -> [checked_at, fields]，checked_at 为 None 表示需要重新查询
+        self._entries: dict[str, list] = {}
+
+    def due(self, devices: dict, now: float) -> list[str]:
+        """Paths whose cached SMART result is missing, stale or from standby."""
+        paths = []
+        for path, device in devices.items():
+            entry = self._entries.get(disk_key(device, path))
+            if entry is None or entry[0] is None or now - entry[0] >= self._ttl:
+                paths.append(path)
+        return paths
+
+    def update(
+        self, devices: dict, smart_by_path: dict, now: float, temperature_paths=()
+    ) -> dict:
+        """Store fresh results and return {path: info} for the whole inventory.
+
+        Results of `temperature_paths` only hold the attributes and only
+        refresh the temperature.
+        """
+        entries = {}
+        standby = set()
+        for path, device in devices.items():
+            key = disk_key(device, path)
+            entry = self._entries.get(key)
+            smart = smart_by_path.get(path)
+            if smart is not None and is_standby(smart):
+                standby.add(key)
+                entry = [None, entry[1] if entry else {}]
+            elif smart is not None and path in temperature_paths and entry is not None:
+                entry = [entry[0], {**entry[1], "temperature": _smart_temperature(smart)}]
+            elif smart is not None:
+                entry = [now, parse_smart(smart)]
+            elif entry is None:
+                # 没有 smartctl 结果时只保留清单信息，下个 SMART 周期再查询
+                entry = [None, {}]
+            entries[key] = entry
+        # 不在清单中的磁盘被移除，不再保留缓存
+        self._entries = entries
+
+        disk_info = {}
+        for path, device in devices.items():
+            key = disk_key(device, path)
+            fields = entries[key][1]
+            disk_info[path] = {
+                **dict.fromkeys(SMART_FIELDS),
+                **fields,
+                "model": (
+                    fields.get("model")
+                    or (device.get("model") or "").strip()
+                    or "Unknown"
+                ),
+                "serial": fields.get("serial") or device.get("serial"),
+                "wwn": device.get("wwn"),
+                "rotational": device.get("rota") in (True, 1, "1"),
+                "standby": key in standby,
+            }
+        return disk_info
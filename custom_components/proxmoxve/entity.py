@@ -2,22 +2,57 @@ from __future__ import annotations
 
 import logging
 
-from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.core import callback
+from homeassistant.helpers.device_registry import DeviceEntryType, DeviceInfo
 from homeassistant.helpers.entity import EntityDescription
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
-from .pve import async_get_or_create_device, PVEDataUpdateCoordinator
+from .pve import PVEDataUpdateCoordinator
 
 from .const import DOMAIN
 
 _LOGGER = logging.getLogger(__name__)
 
 
-class PVENodeEntity(CoordinatorEntity[PVEDataUpdateCoordinator]):
+class PVEEntity(CoordinatorEntity[PVEDataUpdateCoordinator]):
+    """Base entity that only writes state when its data changed."""
 
     _attr_has_entity_name = True
-    
+
     entity_description: EntityDescription
 
+    def __init__(self, coordinator):
+        super().__init__(coordinator)
+        self._last_available = None
+
+    def _change_key(self):
+        """(kind, id) of the snapshot record this entity reads."""
+
+    def _change_fields(self):
+        """Fields this entity reads, or None if it reads the whole record."""
+        data_key = getattr(self.entity_description, "data_key", None)
+        return (data_key,) if data_key else None
+
+    def _should_update(self):
+        changes = self.coordinator.data.changes if self.coordinator.data else None
+        if changes is None:
+            return True
+        fields = changes.get(self._change_key())
+        if not fields:
+            return False
+        wanted = self._change_fields()
+        return wanted is None or not fields.isdisjoint(wanted)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        available = self.available
+        if available == self._last_available and not self._should_update():
+            return
+        self._last_available = available
+        super()._handle_coordinator_update()
+
+
+class PVENodeEntity(PVEEntity):
+
     def __init__(self, hass, description, entry, coordinator, data):
         super().__init__(coordinator)
         self.hass = hass
@@ -32,44 +67,125 @@ class PVENodeEntity(CoordinatorEntity[PVEDataUpdateCoordinator]):
                 self.entity_description.key
             ]
         )
-        device = async_get_or_create_device(
-            hass=self.hass,
-            entry_id=entry.entry_id,
-            node=data
-        )
-        
+        device = coordinator.async_get_device(node=data)
+
         self._attr_device_info = DeviceInfo(
             identifiers=device.identifiers,
         )
-        
-class PVEVMEntity(CoordinatorEntity[PVEDataUpdateCoordinator]):
 
-    _attr_has_entity_name = True
-    
-    entity_description: EntityDescription
+    def _change_key(self):
+        return ("node", self.node)
+
+
+class PVEVMEntity(PVEEntity):
+
+    _vm_kind: str
 
     def __init__(self, hass, description, entry, coordinator, data):
         super().__init__(coordinator)
         self.hass = hass
         self.entity_description = description
-        self.node = data.get("node")
+        self._node = data.get("node")
         self.vmid = data.get("vmid")
         self._attr_unique_id = "_".join(
             [
                 DOMAIN,
                 entry.entry_id,
                 "vm",
-                self.node,
+                self._node,
                 str(self.vmid),
                 self.entity_description.key
             ]
         )
-        device = async_get_or_create_device(
-            hass=self.hass,
-            entry_id=entry.entry_id,
-            vm=data,
+        device = coordinator.async_get_device(vm=data)
+
+        self._attr_device_info = DeviceInfo(
+            identifiers=device.identifiers,
         )
-        
+
+    def _get_record(self):
+        if self.coordinator.data:
+            return getattr(self.coordinator.data, f"{self._vm_kind}s").get(self.vmid)
+        return None
+
+    @property
+    def node(self):
+        """Node the guest currently runs on, follows migrations."""
+        if record := self._get_record():
+            return record.get("node", self._node)
+        return self._node
+
+    def _change_key(self):
+        return (self._vm_kind, self.vmid)
+
+
+class PVEVMPowerEntity(PVEVMEntity):
+    """Guest entity that starts power tasks and shows whether they are pending or failed."""
+
+    def _change_fields(self):
+        return ("task_state", "task_error")
+
+    @property
+    def extra_state_attributes(self):
+        record = self._get_record() or {}
+        return {
+            "task_state": record.get("task_state"),
+            "task_error": record.get("task_error"),
+        }
+
+
+class PVEStorageEntity(PVEEntity):
+
+    def __init__(self, hass, description, entry, coordinator, data):
+        super().__init__(coordinator)
+        self.hass = hass
+        self.entity_description = description
+        self.storage_key = data.get("key")
+        self._attr_unique_id = "_".join(
+            [
+                DOMAIN,
+                entry.entry_id,
+                "storage",
+                self.storage_key,
+                self.entity_description.key
+            ]
+        )
+        device = coordinator.async_get_device(storage=data)
+
         self._attr_device_info = DeviceInfo(
             identifiers=device.identifiers,
         )
+
+    def _change_key(self):
+        return ("storage", self.storage_key)
+
+
+class PVEEntryEntity(PVEEntity):
+    """Entity about the config entry itself, e.g. its request queue."""
+
+    def __init__(self, hass, description, entry, coordinator):
+        super().__init__(coordinator)
+        self.hass = hass
+        self.entity_description = description
+        self._attr_unique_id = "_".join(
+            [
+                DOMAIN,
+                entry.entry_id,
+                "entry",
+                self.entity_description.key
+            ]
+        )
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, entry.entry_id, "entry")},
+            name=entry.title,
+            manufacturer="PVE",
+            entry_type=DeviceEntryType.SERVICE,
+        )
+
+    @property
+    def available(self):
+        # 轮询失败时这些数据仍然有意义
+        return True
+
+    def _should_update(self):
+        return True
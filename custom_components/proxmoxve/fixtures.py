@@ -0,0 +1,371 @@
+"""Record API responses and SSH output of real polls and replay them.
+
+A bundle is plain JSON:
+
+    {
+        "version": 1,
+        "host": "192.0.2.1",
+        "settings": {"sensors_interval": 30, ...},
+        "coordinator": {"api_interval": 2},
+        "api": {"GET cluster/resources": [{"t": 0.0, "data": [...]}, ...]},
+        "ssh": {"192.0.2.1": {"sensors -j": [{"t": 0.1, "output": "..."}]}}
+    }
+
+`settings` holds the PVECollector arguments the polls ran with, see
+replay_settings(); `coordinator` the Home Assistant side settings, which
+a replay does not need. Every call appends one entry under its key; `t`
+is seconds since the
+recording started. Addresses, MAC addresses, serial numbers, WWNs and
+tickets are replaced by stable placeholders, so the same disk or host
+keeps the same identity throughout the bundle. Node and guest names are
+kept.
+"""
+from __future__ import annotations
+
+import json
+import re
+import time
+from urllib.parse import urlencode
+
+from .api import PVEApiError, PVEAuthError, PVEUnavailableError
+from .disks import SMART_MARKER
+from .ssh import PVESSHError
+
+BUNDLE_VERSION = 1
+
+# bundle["settings"] 中可以直接传给 PVECollector 的参数
+COLLECTOR_SETTINGS = ("sensors_interval", "smart_interval", "smart_ttl", "rate_smoothing")
+
+IPV4_RE = re.compile(r"\b(?:\d{1,3}\.){3}\d{1,3}\b")
+MAC_RE = re.compile(r"\b(?:[0-9a-fA-F]{2}:){5}[0-9a-fA-F]{2}\b")
+# 旧版 smartctl 文本输出中的序列号
+SERIAL_TEXT_RE = re.compile(r"(Serial Number:\s*)(\S+)", re.IGNORECASE)
+
+# 这些字段的值整个替换，字典和列表中的值也一样；同一磁盘的不同字段使用同一类占位符
+SECRET_KEYS = {
+    "serial": "serial",
+    "serial_number": "serial",
+    "wwn": "wwn",
+    "logical_unit_id": "wwn",
+    "eui64": "eui",
+    "nguid": "eui",
+    "ticket": "ticket",
+    "CSRFPreventionToken": "ticket",
+}
+
+ERRORS = {
+    "PVEApiError": PVEApiError,
+    "PVEAuthError": PVEAuthError,
+    "PVEUnavailableError": PVEUnavailableError,
+    "PVESSHError": PVESSHError,
+}
+
+
+def _api_key(method: str, path: str, params=None) -> str:
+    key = f"{method} {path.lstrip('/')}"
+    if params:
+        key += "?" + urlencode(sorted(params.items()))
+    return key
+
+
+class Redactor:
+    """Maps sensitive values to placeholders, the same value to the same one."""
+
+    def __init__(self, hosts=()) -> None:
+        self._maps: dict[str, dict] = {}
+        self._hosts = [host for host in hosts if host and not IPV4_RE.fullmatch(host)]
+
+    def _placeholder(self, kind: str, value):
+        mapping = self._maps.setdefault(kind, {})
+        if value not in mapping:
+            n = len(mapping) + 1
+            if kind == "ip":
+                # RFC 5737 文档专用地址段
+                mapping[value] = f"192.0.2.{n}" if n < 255 else f"198.51.100.{n % 254 + 1}"
+            elif kind == "mac":
+                mapping[value] = f"02:00:00:00:{n >> 8 & 0xff:02x}:{n & 0xff:02x}"
+            elif kind == "host":
+                mapping[value] = f"host{n}.invalid"
+            elif isinstance(value, int):
+                mapping[value] = n
+            else:
+                mapping[value] = f"{kind.upper()}{n:04d}"
+        return mapping[value]
+
+    def host(self, host: str) -> str:
+        if IPV4_RE.fullmatch(host):
+            return self._placeholder("ip", host)
+        return self._placeholder("host", host)
+
+    def text(self, text: str) -> str:
+        for host in self._hosts:
+            text = text.replace(host, self.host(host))
+        for kind, values in self._maps.items():
+            if kind in ("ip", "mac", "host"):
+                continue
+            for value, placeholder in values.items():
+                if isinstance(value, str) and len(value) > 3:
+                    text = text.replace(value, placeholder)
+        text = SERIAL_TEXT_RE.sub(
+            lambda m: m.group(1) + self._placeholder("serial", m.group(2)), text
+        )
+        text = IPV4_RE.sub(lambda m: self._placeholder("ip", m.group(0)), text)
+        return MAC_RE.sub(lambda m: self._placeholder("mac", m.group(0).lower()), text)
+
+    def data(self, value, secret: str | None = None):
+        if isinstance(value, dict):
+            return {
+                key: self.data(item, SECRET_KEYS.get(key, secret))
+                for key, item in value.items()
+            }
+        if isinstance(value, list):
+            return [self.data(item, secret) for item in value]
+        if secret is not None and isinstance(value, (str, int)) and not isinstance(value, bool):
+            return self._placeholder(secret, value)
+        if isinstance(value, str):
+            return self.text(value)
+        return value
+
+    def output(self, output: str) -> str:
+        """Redact SSH output: JSON documents field by field, the rest as text."""
+        if f"\n{SMART_MARKER} " in output:
+            head, *chunks = output.split(f"\n{SMART_MARKER} ")
+            parts = [head]
+            for chunk in chunks:
+                path, _, body = chunk.partition("\n")
+                parts.append(f"{path}\n{self.output(body)}")
+            return f"\n{SMART_MARKER} ".join(parts)
+        try:
+            document = json.loads(output)
+        except ValueError:
+            return self.text(output)
+        return json.dumps(self.data(document), indent=1)
+
+
+class FixtureRecorder:
+    """Collects the calls made through the wrapped transports."""
+
+    def __init__(self) -> None:
+        self._start = time.monotonic()
+        self._api: dict[str, list] = {}
+        self._ssh: dict[str, dict[str, list]] = {}
+
+    def _elapsed(self) -> float:
+        return round(time.monotonic() - self._start, 3)
+
+    def wrap_api(self, api):
+        return RecordingApi(api, self)
+
+    def wrap_ssh(self, ssh):
+        return RecordingSSH(ssh, self)
+
+    def add_api(self, key: str, entry: dict) -> None:
+        self._api.setdefault(key, []).append({"t": self._elapsed(), **entry})
+
+    def add_ssh(self, host: str, command: str, entry: dict) -> None:
+        self._ssh.setdefault(host, {}).setdefault(command, []).append(
+            {"t": self._elapsed(), **entry}
+        )
+
+    def bundle(
+        self, host: str, settings: dict | None = None, coordinator: dict | None = None
+    ) -> dict:
+        """Return the redacted bundle of everything recorded so far."""
+        redactor = Redactor(hosts=[host, *self._ssh])
+        # 先处理结构化数据，收集到的序列号等再用于替换纯文本输出
+        api = {
+            key: [
+                {**entry, "data": redactor.data(entry["data"])}
+                if "data" in entry
+                else dict(entry)
+                for entry in entries
+            ]
+            for key, entries in self._api.items()
+        }
+        ssh = {
+            redactor.host(ssh_host): {
+                command: [
+                    {**entry, "output": redactor.output(entry["output"])}
+                    if "output" in entry
+                    else dict(entry)
+                    for entry in entries
+                ]
+                for command, entries in commands.items()
+            }
+            for ssh_host, commands in self._ssh.items()
+        }
+        # 错误信息里可能带有地址
+        for entries in (*api.values(), *(e for c in ssh.values() for e in c.values())):
+            for entry in entries:
+                if "message" in entry:
+                    entry["message"] = redactor.text(entry["message"])
+        return {
+            "version": BUNDLE_VERSION,
+            "host": redactor.host(host),
+            "settings": settings or {},
+            "coordinator": coordinator or {},
+            "api": api,
+            "ssh": ssh,
+        }
+
+
+class RecordingApi:
+    """PVEApiClient wrapper recording every response and error."""
+
+    def __init__(self, api, recorder: FixtureRecorder) -> None:
+        self._api = api
+        self._recorder = recorder
+
+    def __getattr__(self, name):
+        return getattr(self._api, name)
+
+    async def _async_record(self, key, call):
+        try:
+            data = await call
+        except PVEApiError as error:
+            self._recorder.add_api(key, {"error": type(error).__name__, "message": str(error)})
+            raise
+        self._recorder.add_api(key, {"data": data})
+        return data
+
+    async def async_get(self, path: str, **kwargs):
+        params = {key: value for key, value in kwargs.items() if key != "priority"}
+        return await self._async_record(
+            _api_key("GET", path, params), self._api.async_get(path, **kwargs)
+        )
+
+    async def async_post(self, path: str, **kwargs):
+        data = {key: value for key, value in kwargs.items() if key != "priority"}
+        return await self._async_record(
+            _api_key("POST", path, data), self._api.async_post(path, **kwargs)
+        )
+
+    async def async_action(self, path: str, **data):
+        return await self._async_record(
+            _api_key("POST", path, data), self._api.async_action(path, **data)
+        )
+
+
+class RecordingSSH:
+    """PVESSHPool wrapper recording the output of every command."""
+
+    def __init__(self, ssh, recorder: FixtureRecorder) -> None:
+        self._ssh = ssh
+        self._recorder = recorder
+
+    def __getattr__(self, name):
+        return getattr(self._ssh, name)
+
+    async def async_run(self, host: str, command: str, **kwargs) -> str:
+        try:
+            output = await self._ssh.async_run(host, command, **kwargs)
+        except PVESSHError as error:
+            self._recorder.add_ssh(host, command, {"error": "PVESSHError", "message": str(error)})
+            raise
+        self._recorder.add_ssh(host, command, {"output": output})
+        return output
+
+
+class _Replay:
+    """Hands out the recorded entries of each key in order.
+
+    The last entry of a key is repeated once it is exhausted, so a replay
+    can run more polls than were recorded and stays deterministic.
+    """
+
+    def __init__(self, clock: ReplayClock) -> None:
+        self._clock = clock
+        self._cursors: dict[object, int] = {}
+
+    def next(self, key, entries, missing_error):
+        if not entries:
+            raise missing_error(f"{key} is not in the fixture bundle")
+        index = self._cursors.get(key, 0)
+        self._cursors[key] = index + 1
+        entry = entries[min(index, len(entries) - 1)]
+        self._clock.advance_to(entry.get("t", 0.0))
+        if "error" in entry:
+            raise ERRORS.get(entry["error"], missing_error)(entry.get("message", ""))
+        return entry
+
+
+class ReplayClock:
+    """Monotonic clock following the timestamps of the replayed entries."""
+
+    def __init__(self) -> None:
+        self._now = 0.0
+
+    def advance_to(self, t: float) -> None:
+        self._now = max(self._now, t)
+
+    def __call__(self) -> float:
+        return self._now
+
+
+class ReplayApi:
+    """Stands in for PVEApiClient, answering from a bundle."""
+
+    def __init__(self, bundle: dict, clock: ReplayClock) -> None:
+        self._api = bundle.get("api", {})
+        self._replay = _Replay(clock)
+        self.available = True
+
+    def _answer(self, key):
+        return self._replay.next(key, self._api.get(key), PVEApiError)["data"]
+
+    async def async_get(self, path: str, *, priority=None, **params):
+        return self._answer(_api_key("GET", path, params))
+
+    async def async_post(self, path: str, *, priority=None, **data):
+        return self._answer(_api_key("POST", path, data))
+
+    async def async_action(self, path: str, **data):
+        return self._answer(_api_key("POST", path, data))
+
+
+class ReplaySSH:
+    """Stands in for PVESSHPool, answering from a bundle.
+
+    Streaming telemetry is not recorded and cannot be replayed.
+    """
+
+    def __init__(self, bundle: dict, clock: ReplayClock) -> None:
+        self._ssh = bundle.get("ssh", {})
+        self._replay = _Replay(clock)
+
+    def available(self, host: str) -> bool:
+        return True
+
+    async def async_run(self, host: str, command: str, **kwargs) -> str:
+        entries = self._ssh.get(host, {}).get(command)
+        return self._replay.next((host, command), entries, PVESSHError)["output"]
+
+    async def async_open_process(self, host: str, command: str):
+        raise PVESSHError(f"{host}: streaming is not available in a replay")
+
+    async def async_close(self) -> None:
+        pass
+
+
+def replay_transports(bundle: dict):
+    """Return (api, ssh, clock) answering from the bundle, for PVECollector."""
+    if bundle.get("version") != BUNDLE_VERSION:
+        raise ValueError(f"Unsupported fixture bundle version {bundle.get('version')}")
+    clock = ReplayClock()
+    return ReplayApi(bundle, clock), ReplaySSH(bundle, clock), clock
+
+
+def replay_settings(bundle: dict) -> dict:
+    """The PVECollector keyword arguments recorded in the bundle."""
+    settings = bundle.get("settings", {})
+    return {key: settings[key] for key in COLLECTOR_SETTINGS if key in settings}
+
+
+def load_bundle(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_bundle(path: str, bundle: dict) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(bundle, f, indent=1)
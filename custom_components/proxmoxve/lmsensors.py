@@ -0,0 +1,142 @@
+"""Chip-agnostic mapping of `sensors -j` output to typed readings."""
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+import re
+
+CPU_CHIPS = ("coretemp", "k10temp", "zenpower", "cpu_thermal")
+BOARD_CHIPS = ("acpitz", "nct", "it87", "it86", "w83", "asus", "f718", "motherboard")
+NVME_CHIPS = ("nvme",)
+
+# 子特性前缀 -> 读数类型
+KINDS = {
+    "temp": "temperature",
+    "fan": "fan",
+    "in": "voltage",
+    "power": "power",
+    "curr": "current",
+}
+
+
+@dataclass(frozen=True, slots=True)
+class SensorReading:
+    """One `<chip>/<feature>/<subfeature>_input` value of `sensors -j`."""
+
+    key: str
+    chip: str
+    feature: str
+    subfeature: str
+    kind: str
+    role: str | None
+    label: str
+
+
+def _slug(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", text.lower()).strip("_")
+
+
+def _chip_prefix(chip: str) -> str:
+    return chip.split("-", 1)[0].lower()
+
+
+def _role(chip: str, feature: str, kind: str) -> str | None:
+    if kind != "temperature":
+        return None
+    prefix = _chip_prefix(chip)
+    if prefix.startswith(CPU_CHIPS):
+        if feature.startswith("Package id") or feature in ("Tdie", "Tctl"):
+            return "cpu_package"
+        return "cpu_core"
+    if prefix.startswith(NVME_CHIPS):
+        # NVMe 的 Composite 是厂商定义的整体温度，其他传感器只作为独立读数
+        return "nvme" if feature == "Composite" else None
+    if prefix.startswith(BOARD_CHIPS):
+        return "motherboard"
+    return None
+
+
+def chip_signature(data: dict) -> frozenset[str]:
+    return frozenset(chip for chip, features in data.items() if isinstance(features, dict))
+
+
+class SensorMap:
+    """Readings discovered on one node, with the chip set they came from."""
+
+    def __init__(self, readings: list[SensorReading], signature: frozenset[str]) -> None:
+        self.readings = readings
+        self.signature = signature
+        self.by_key = {reading.key: reading for reading in readings}
+
+    @classmethod
+    def discover(cls, data: dict) -> SensorMap:
+        readings = []
+        for chip, features in data.items():
+            if not isinstance(features, dict):
+                continue
+            for feature, subfeatures in features.items():
+                if not isinstance(subfeatures, dict):
+                    continue
+                for subfeature in subfeatures:
+                    match = re.fullmatch(r"([a-z]+)\d+_input", subfeature)
+                    if not match or match.group(1) not in KINDS:
+                        continue
+                    kind = KINDS[match.group(1)]
+                    readings.append(
+                        SensorReading(
+                            key=_slug(f"{chip}_{feature}"),
+                            chip=chip,
+                            feature=feature,
+                            subfeature=subfeature,
+                            kind=kind,
+                            role=_role(chip, feature, kind),
+                            label=f"{_chip_prefix(chip)} {feature}",
+                        )
+                    )
+                    break
+        return cls(readings, chip_signature(data))
+
+    def as_dict(self) -> dict:
+        return {
+            "signature": sorted(self.signature),
+            "readings": [asdict(reading) for reading in self.readings],
+        }
+
+    @classmethod
+    def from_dict(cls, value: dict) -> SensorMap:
+        return cls(
+            [SensorReading(**reading) for reading in value["readings"]],
+            frozenset(value["signature"]),
+        )
+
+    def extract(self, data: dict) -> dict[str, float | None]:
+        """Read only the mapped paths.
+
+        Every mapped reading gets a key; readings missing from `data` are
+        None, so a briefly absent value does not look like a removed one.
+        """
+        values = {}
+        for reading in self.readings:
+            try:
+                values[reading.key] = data[reading.chip][reading.feature][reading.subfeature]
+            except (KeyError, TypeError):
+                values[reading.key] = None
+        return values
+
+    def summarize(self, values: dict[str, float]) -> dict:
+        """Derive the node level cpu, motherboard and nvme temperatures."""
+        by_role: dict[str, list[float]] = {}
+        for reading in self.readings:
+            if reading.role and values.get(reading.key) is not None:
+                by_role.setdefault(reading.role, []).append(values[reading.key])
+
+        summary = {}
+        # 多路CPU取最高的封装温度，没有封装温度时取核心平均值
+        if packages := by_role.get("cpu_package"):
+            summary["cpu_temperature"] = max(packages)
+        elif cores := by_role.get("cpu_core"):
+            summary["cpu_temperature"] = round(sum(cores) / len(cores), 1)
+        if boards := by_role.get("motherboard"):
+            summary["motherboard_temperature"] = boards[0]
+        if nvmes := by_role.get("nvme"):
+            summary["nvme_temperature"] = max(nvmes)
+        return summary
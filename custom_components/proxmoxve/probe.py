@@ -0,0 +1,187 @@
+"""Run the collection pipeline without Home Assistant.
+
+    python -m custom_components.proxmoxve.probe --host 10.0.0.2 --username root@pam
+    python -m custom_components.proxmoxve.probe --fixture bundle.json --polls 20 --profile poll.prof
+
+Polls a host or replays a fixture bundle, then prints the per-phase
+timings and the last snapshot. The password or token secret is read from
+PVE_PASSWORD / PVE_TOKEN_SECRET when not given. Home Assistant must be
+importable because the package imports it, but it is not started.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import cProfile
+import getpass
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import aiohttp
+
+from .api import PVEApiClient, is_token_user
+from .collector import PVECollector
+from .const import (
+    DEFAULT_MAX_CONNECTIONS,
+    DEFAULT_RATE_SMOOTHING,
+    DEFAULT_SENSORS_INTERVAL,
+    DEFAULT_SMART_INTERVAL,
+    DEFAULT_SMART_TTL,
+    DEFAULT_STREAM_INTERVAL,
+)
+from .fixtures import load_bundle, replay_transports
+from .ssh import PVESSHPool
+
+
+def _parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m custom_components.proxmoxve.probe",
+        description="Poll a Proxmox VE cluster or replay a fixture bundle and report timings.",
+    )
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--host", help="address of the PVE API")
+    source.add_argument("--fixture", help="replay this bundle instead of polling a host")
+    parser.add_argument("--port", type=int, default=8006)
+    parser.add_argument("--username", default="root@pam", help="user@realm or user@realm!tokenid")
+    parser.add_argument("--password", default=os.environ.get("PVE_PASSWORD"))
+    parser.add_argument("--token-secret", default=os.environ.get("PVE_TOKEN_SECRET"))
+    parser.add_argument("--ssh-port", type=int, default=22)
+    parser.add_argument("--verify-ssl", action="store_true")
+    parser.add_argument("--max-connections", type=int, default=DEFAULT_MAX_CONNECTIONS)
+    parser.add_argument("--polls", type=int, default=1)
+    parser.add_argument("--interval", type=float, default=0, help="seconds between polls")
+    parser.add_argument("--sensors-interval", type=float, default=DEFAULT_SENSORS_INTERVAL)
+    parser.add_argument("--smart-interval", type=float, default=DEFAULT_SMART_INTERVAL)
+    parser.add_argument("--smart-ttl", type=float, default=DEFAULT_SMART_TTL)
+    parser.add_argument("--rate-smoothing", type=float, default=DEFAULT_RATE_SMOOTHING)
+    parser.add_argument("--streaming", action="store_true")
+    parser.add_argument("--stream-interval", type=float, default=DEFAULT_STREAM_INTERVAL)
+    parser.add_argument("--no-snapshot", action="store_true", help="only print the timings")
+    parser.add_argument("--profile", metavar="FILE", help="write cProfile stats of the polls")
+    parser.add_argument(
+        "--tracemalloc",
+        metavar="N",
+        type=int,
+        default=0,
+        help="trace allocations and print the N largest allocation sites",
+    )
+    return parser.parse_args(argv)
+
+
+async def _async_poll(collector: PVECollector, args):
+    data = None
+    for poll in range(args.polls):
+        if poll and args.interval:
+            await asyncio.sleep(args.interval)
+        start = time.monotonic()
+        data = await collector.async_collect()
+        print(
+            f"poll {poll + 1}/{args.polls}: {(time.monotonic() - start) * 1000:.1f} ms, "
+            f"{len(data.nodes)} nodes, {len(data.qemus)} qemu, {len(data.lxcs)} lxc, "
+            f"{len(data.storages)} storages",
+            file=sys.stderr,
+        )
+    return data
+
+
+async def _async_run(args):
+    if args.fixture:
+        bundle = load_bundle(args.fixture)
+        api, ssh, clock = replay_transports(bundle)
+        settings = bundle.get("settings", {})
+        collector = PVECollector(
+            api,
+            ssh,
+            bundle["host"],
+            sensors_interval=settings.get("sensors_interval", args.sensors_interval),
+            smart_interval=settings.get("smart_interval", args.smart_interval),
+            smart_ttl=settings.get("smart_ttl", args.smart_ttl),
+            rate_smoothing=settings.get("rate_smoothing", args.rate_smoothing),
+            clock=clock,
+        )
+        try:
+            return collector, await _async_poll(collector, args)
+        finally:
+            await collector.async_close()
+
+    password = args.password
+    if not password and not (args.token_secret and is_token_user(args.username)):
+        password = getpass.getpass(f"Password for {args.username}: ")
+    async with aiohttp.ClientSession() as session:
+        api = PVEApiClient(
+            session,
+            host=args.host,
+            port=args.port,
+            username=args.username,
+            password=password or "",
+            verify_ssl=args.verify_ssl,
+            token_secret=args.token_secret,
+            max_connections=args.max_connections,
+        )
+        ssh = PVESSHPool(args.username.split("@")[0], password or "", port=args.ssh_port)
+        collector = PVECollector(
+            api,
+            ssh,
+            args.host,
+            sensors_interval=args.sensors_interval,
+            smart_interval=args.smart_interval,
+            smart_ttl=args.smart_ttl,
+            rate_smoothing=args.rate_smoothing,
+            streaming=args.streaming,
+            stream_interval=args.stream_interval,
+        )
+        try:
+            return collector, await _async_poll(collector, args)
+        finally:
+            await collector.async_close()
+
+
+def _print_timings(summary):
+    print(
+        f"{'phase':<10} {'count':>6} {'last':>9} {'p50':>9} {'p95':>9} {'max':>9}",
+        file=sys.stderr,
+    )
+    for phase, stats in summary.items():
+        print(
+            f"{phase:<10} {stats['count']:>6} {stats['last']:>9.1f} {stats['p50']:>9.1f} "
+            f"{stats['p95']:>9.1f} {stats['max']:>9.1f}",
+            file=sys.stderr,
+        )
+    print("times in ms", file=sys.stderr)
+
+
+def main(argv=None) -> int:
+    args = _parse_args(argv)
+    profiler = cProfile.Profile() if args.profile else None
+    if args.tracemalloc:
+        tracemalloc.start()
+    if profiler:
+        profiler.enable()
+    try:
+        collector, data = asyncio.run(_async_run(args))
+    finally:
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(args.profile)
+            print(f"cProfile stats written to {args.profile}", file=sys.stderr)
+
+    _print_timings(collector.timings.summary())
+    if args.tracemalloc:
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"memory: {current // 1024} KiB current, {peak // 1024} KiB peak", file=sys.stderr)
+        for stat in snapshot.statistics("lineno")[: args.tracemalloc]:
+            print(f"  {stat}", file=sys.stderr)
+    # 快照输出到标准输出，计时等信息输出到标准错误，方便重定向
+    if data is not None and not args.no_snapshot:
+        json.dump(data.as_dict(), sys.stdout, indent=2, default=str)
+        print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+"""Profile a number of coordinator cycles on request."""
+from __future__ import annotations
+
+import asyncio
+import cProfile
+import io
+import pstats
+import tracemalloc
+
+TOP_FUNCTIONS = 40
+
+
+class ProfilerBusyError(Exception):
+    """Another profiler is already active on the event loop thread."""
+
+
+class CycleProfiler:
+    """cProfile and tracemalloc over the next `cycles` poll cycles.
+
+    The coordinator calls enable() when an update starts and disable()
+    once its listeners were dispatched, or when the update failed and
+    nothing is dispatched. cProfile sees everything that runs on the event
+    loop in between, not only this integration. tracemalloc traces the
+    whole process from start() until finish().
+    """
+
+    def __init__(self, cycles: int, top: int) -> None:
+        self.cycles = cycles
+        self.top = top
+        self.done = 0
+        self.running = False
+        self.result: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._profile = cProfile.Profile()
+        self._started_tracing = False
+        self._baseline = None
+
+    def _enable(self) -> None:
+        try:
+            self._profile.enable()
+        except ValueError as error:
+            # Python 3.12 起同一线程只允许一个分析器
+            raise ProfilerBusyError(str(error)) from error
+
+    def start(self) -> None:
+        # 先确认分析器可用，再开始跟踪内存
+        self._enable()
+        self._profile.disable()
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        self._baseline = tracemalloc.take_snapshot()
+
+    def enable(self) -> None:
+        if not self.running:
+            self._enable()
+            self.running = True
+
+    def disable(self) -> bool:
+        """End the current cycle; return True once all cycles were profiled."""
+        if not self.running:
+            return False
+        self._profile.disable()
+        self.running = False
+        self.done += 1
+        return self.done >= self.cycles
+
+    def finish(self) -> tuple[cProfile.Profile, str]:
+        """Stop tracing and return the profile and the allocation summary."""
+        if self.running:
+            # 在周期中途被取消
+            self._profile.disable()
+            self.running = False
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        if self._started_tracing:
+            tracemalloc.stop()
+        filters = [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ]
+        snapshot = snapshot.filter_traces(filters)
+        lines = [
+            f"{self.done} cycles, traced memory {current // 1024} KiB, peak {peak // 1024} KiB",
+            "",
+            f"Top {self.top} allocation sites:",
+            *(f"  {stat}" for stat in snapshot.statistics("lineno")[: self.top]),
+        ]
+        if self._baseline is not None:
+            growth = snapshot.compare_to(self._baseline.filter_traces(filters), "lineno")
+            lines += [
+                "",
+                f"Top {self.top} changes since profiling started:",
+                *(f"  {stat}" for stat in growth[: self.top]),
+            ]
+        return self._profile, "\n".join(lines) + "\n"
+
+
+def write_profile(profile: cProfile.Profile, summary: str, profile_path: str, summary_path: str):
+    """Write the pstats file and the text summary, runs in the executor."""
+    profile.dump_stats(profile_path)
+    stream = io.StringIO()
+    pstats.Stats(profile, stream=stream).sort_stats("cumulative").print_stats(TOP_FUNCTIONS)
+    with open(summary_path, "w", encoding="utf-8") as f:
+        f.write(summary)
+        f.write("\n")
+        f.write(stream.getvalue())
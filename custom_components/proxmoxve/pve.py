@@ -1,13 +1,16 @@
+import asyncio
 from datetime import timedelta
-import datetime
 from enum import StrEnum
 import logging
+import time
 from asyncio.exceptions import CancelledError
-from custom_components.proxmoxve.utils import to_pecent
+from homeassistant.core import callback
+from homeassistant.exceptions import ConfigEntryAuthFailed
 from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
-from proxmoxer import ProxmoxAPI
-from homeassistant.util import dt as dt_util
 from homeassistant.const import (
     CONF_HOST,
     CONF_PORT,
@@ -15,12 +18,39 @@ from homeassistant.const import (
     CONF_PASSWORD,
     CONF_VERIFY_SSL,
 )
-from .const import DOMAIN
-import urllib3
-import paramiko
-from io import StringIO
-
-urllib3.disable_warnings()
+from .api import PVEApiClient, PVEApiError, PVEAuthError
+from .ssh import PVESSHPool
+from .collector import (
+    PVECollector,
+    PVECollectError,
+    PVEData,
+    diff_snapshots,
+    snapshot_members,
+)
+from .fixtures import FixtureRecorder
+from .profiling import CycleProfiler, ProfilerBusyError
+from .slots import PRIORITY_ACTION
+from .bulk import order_groups, parse_startup
+from .const import (
+    DOMAIN,
+    CONF_SSH_PORT,
+    CONF_TOKEN_SECRET,
+    CONF_API_INTERVAL,
+    CONF_SENSORS_INTERVAL,
+    CONF_SMART_INTERVAL,
+    CONF_SMART_TTL,
+    CONF_RATE_SMOOTHING,
+    CONF_STREAMING,
+    CONF_STREAM_INTERVAL,
+    CONF_MAX_CONNECTIONS,
+    DEFAULT_API_INTERVAL,
+    DEFAULT_SENSORS_INTERVAL,
+    DEFAULT_SMART_INTERVAL,
+    DEFAULT_SMART_TTL,
+    DEFAULT_RATE_SMOOTHING,
+    DEFAULT_STREAM_INTERVAL,
+    DEFAULT_MAX_CONNECTIONS,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -35,15 +65,61 @@ class PowerAction(StrEnum):
     RESUME = "resume"
 
 
-class PVEData:
-    nodes = dict()
-    qemus = dict()
-    lxcs = dict()
-    disks = dict()
-    time: datetime
-
-
-def async_get_or_create_device(hass, entry_id, node=None, vm=None):
+VM_POWER_COMMANDS = {
+    "qemu": {
+        PowerAction.ON: "start",
+        PowerAction.OFF: "stop",
+        PowerAction.SUSPEND: "suspend",
+        PowerAction.RESUME: "resume",
+        PowerAction.RESET: "reset",
+        PowerAction.REBOOT: "reboot",
+        PowerAction.SHUTDOWN: "shutdown",
+    },
+    "lxc": {
+        PowerAction.ON: "start",
+        PowerAction.OFF: "stop",
+        PowerAction.SUSPEND: "suspend",
+        PowerAction.RESUME: "resume",
+        PowerAction.REBOOT: "reboot",
+        PowerAction.SHUTDOWN: "shutdown",
+    },
+}
+
+
+# 电源操作任务的轮询间隔和最长等待时间
+TASK_POLL_INTERVAL = 1
+TASK_TIMEOUT = 300
+BULK_TASK_TIMEOUT = 1800
+
+# 可以交给节点按启动顺序批量执行的操作: (命令, 参数)
+BULK_NODE_COMMANDS = {
+    # force: 没有设置开机自启的虚拟机也启动
+    PowerAction.ON: ("startall", {"force": 1}),
+    PowerAction.SHUTDOWN: ("stopall", {}),
+}
+# 逐个执行时的顺序：启动类按启动顺序并等待 up 延时，停止类按相反顺序，
+# 重启和复位不改变运行状态，不排序
+STARTING_ACTIONS = (PowerAction.ON, PowerAction.RESUME)
+STOPPING_ACTIONS = (PowerAction.OFF, PowerAction.SHUTDOWN, PowerAction.SUSPEND)
+
+# 数据流推送给实体的最短间隔，秒
+STREAM_PUSH_MIN_INTERVAL = 1.0
+
+# 成员连续这么多次成功轮询都不在列表中才算移除，节点短暂离线或迁移途中
+# 不会删除设备和用户对实体的设置
+MEMBER_REMOVAL_POLLS = 2
+
+SNAPSHOT_STORAGE_VERSION = 1
+# 快照最多每隔这么久保存一次；Home Assistant 关闭时总会写入最新的快照
+SNAPSHOT_SAVE_DELAY = 300
+
+
+def snapshot_store(hass, entry_id) -> Store:
+    """Store of the snapshot restored at startup."""
+    return Store(hass, SNAPSHOT_STORAGE_VERSION, f"{DOMAIN}.{entry_id}.snapshot")
+
+
+def async_get_or_create_device(hass, entry_id, node=None, vm=None, storage=None):
     if not entry_id:
         return None
 
@@ -76,6 +152,28 @@ def async_get_or_create_device(hass, entry_id, node=None, vm=None):
             via_device=(DOMAIN, entry_id, "node", node_name),
         )
 
+    if storage:
+        key = storage.get("key", None)
+        if not key:
+            return None
+        # 共享存储属于整个集群，不挂在某个节点下
+        if storage.get("shared"):
+            return dev_reg.async_get_or_create(
+                config_entry_id=entry_id,
+                identifiers={(DOMAIN, entry_id, "storage", key)},
+                name=storage.get("storage"),
+                manufacturer="PVE",
+                model=storage.get("plugintype"),
+            )
+        return dev_reg.async_get_or_create(
+            config_entry_id=entry_id,
+            identifiers={(DOMAIN, entry_id, "storage", key)},
+            name=f"{storage.get('node')} {storage.get('storage')}",
+            manufacturer="PVE",
+            model=storage.get("plugintype"),
+            via_device=(DOMAIN, entry_id, "node", storage.get("node")),
+        )
+
     return None
 
 
@@ -85,417 +183,609 @@ class PVEDataUpdateCoordinator(DataUpdateCoordinator):
     def __init__(self, hass, config):
         """Initialize the data object."""
         super().__init__(
-            hass, _LOGGER, name=DOMAIN, update_interval=timedelta(seconds=2)
+            hass,
+            _LOGGER,
+            name=DOMAIN,
+            update_interval=timedelta(
+                seconds=config.get(CONF_API_INTERVAL, DEFAULT_API_INTERVAL)
+            ),
         )
         self._config = config
-        self._conn = None
-        self._ssh_client = None
-        self._ssh_connected = False
+        api = PVEApiClient(
+            async_get_clientsession(hass, verify_ssl=config.get(CONF_VERIFY_SSL, False)),
+            host=config.get(CONF_HOST),
+            port=config.get(CONF_PORT, 8006),
+            username=config.get(CONF_USERNAME),
+            password=config.get(CONF_PASSWORD),
+            verify_ssl=config.get(CONF_VERIFY_SSL, False),
+            token_secret=config.get(CONF_TOKEN_SECRET),
+            max_connections=config.get(CONF_MAX_CONNECTIONS, DEFAULT_MAX_CONNECTIONS),
+        )
+        ssh = PVESSHPool(
+            username=config.get(CONF_USERNAME, "root").split('@')[0],
+            password=config.get(CONF_PASSWORD, ""),
+            port=config.get(CONF_SSH_PORT, 22),
+        )
+        # 采集流程不依赖 Home Assistant，协调器只负责调度和实体相关的部分
+        self._collector = PVECollector(
+            api,
+            ssh,
+            host=config.get(CONF_HOST),
+            sensors_interval=config.get(CONF_SENSORS_INTERVAL, DEFAULT_SENSORS_INTERVAL),
+            smart_interval=config.get(CONF_SMART_INTERVAL, DEFAULT_SMART_INTERVAL),
+            smart_ttl=config.get(CONF_SMART_TTL, DEFAULT_SMART_TTL),
+            rate_smoothing=config.get(CONF_RATE_SMOOTHING, DEFAULT_RATE_SMOOTHING),
+            streaming=config.get(CONF_STREAMING, False),
+            stream_interval=config.get(CONF_STREAM_INTERVAL, DEFAULT_STREAM_INTERVAL),
+            on_stream_record=self._async_stream_record,
+        )
+        # 数据流的记录在轮询之间推送给实体，各节点的记录合并后每个间隔最多推送一次
+        self._stream_debouncer = Debouncer(
+            hass,
+            _LOGGER,
+            cooldown=max(
+                config.get(CONF_STREAM_INTERVAL, DEFAULT_STREAM_INTERVAL), STREAM_PUSH_MIN_INTERVAL
+            ),
+            immediate=True,
+            function=self._async_push_stream,
+        )
+        self._api = api
+        self.timings = self._collector.timings
+        self._members = set()
+        # 暂时不在列表中的成员，按 (类型, id) 记录连续缺席的成功轮询次数
+        self._missing = {}
+        self._membership_listeners = []
+        self._membership_snapshot = None
+        # 设备注册缓存，按节点名和 vmid 索引
+        self._devices = {}
+        # 正在执行或失败的电源操作任务，按 (类型, vmid) 索引
+        self._tasks = {}
+        # 只在 proxmoxve.profile 服务运行期间存在
+        self._profiler = None
+        # 正在分析的周期返回的快照，通知完实体后这个周期才结束
+        self._profiled_data = None
+        # 录制测试数据期间由 async_record_fixture 自己刷新
+        self._recording = False
+        self._store = None
+        self._snapshot_save_due = 0.0
 
     async def _async_update_data(self):
+        profiler = self._profiler
+        if profiler is not None:
+            try:
+                profiler.enable()
+            except ProfilerBusyError as error:
+                self._async_end_profile(profiler, error)
+                profiler = None
+        data = None
+        try:
+            data = await self._async_poll()
+            return data
+        finally:
+            if profiler is not None:
+                if data is not None:
+                    # 成功的周期在 async_update_listeners 通知完实体后结束
+                    self._profiled_data = data
+                elif profiler.disable():
+                    # 失败或取消的更新也算一个周期，分析器不会一直开着
+                    self._async_end_profile(profiler)
+
+    async def _async_poll(self):
         try:
-            return await self.hass.async_add_executor_job(self._update_data)
+            data = await self._collector.async_collect()
+        except PVEAuthError as error:
+            # 由 DataUpdateCoordinator 发起重新认证流程
+            raise ConfigEntryAuthFailed(f"Authentication failed: {error}") from error
+        except PVECollectError as error:
+            raise UpdateFailed(str(error)) from error
         except CancelledError:
             _LOGGER.debug("Cancel update")
+            return None
 
-    def _connect(self):
-        self._conn = ProxmoxAPI(
-            host=self._config.get(CONF_HOST),
-            backend="https",
-            port=self._config.get(CONF_PORT, 8006),
-            user=self._config.get(CONF_USERNAME),
-            password=self._config.get(CONF_PASSWORD),
-            verify_ssl=self._config.get(CONF_VERIFY_SSL, False),
-            timeout=5,
-        )
-        
-    def _connect_ssh(self):
-        """Establish SSH connection to the Proxmox node."""
-        if self._ssh_connected:
-            return True
-            
+        # 电源操作任务的状态作为普通字段合并进虚拟机记录
+        self._tasks = {
+            (kind, id): task
+            for (kind, id), task in self._tasks.items()
+            if id in getattr(data, f"{kind}s")
+        }
+        for kind, records in (("qemu", data.qemus), ("lxc", data.lxcs)):
+            for id, record in records.items():
+                record.update(self._task_fields(kind, id))
+
+        data.changes = diff_snapshots(self.data, data)
+        members = snapshot_members(data)
+        missing = {
+            member: self._missing.get(member, 0) + 1 for member in self._members - members
+        }
+        data.removed = {
+            member for member, polls in missing.items() if polls >= MEMBER_REMOVAL_POLLS
+        }
+        self._missing = {
+            member: polls for member, polls in missing.items() if member not in data.removed
+        }
+        # 缺席期间仍算作成员，重新出现时不会重复添加实体
+        data.added = members - self._members
+        self._members = members | self._missing.keys()
+        self._async_schedule_snapshot_save()
+        return data
+
+    async def async_restore_snapshot(self) -> bool:
+        """Load the snapshot saved before the restart, return True if there was one.
+
+        The restored snapshot stands in for the first poll: entities are
+        created from it and show its values until live data arrives.
+        """
+        self._store = snapshot_store(self.hass, self.config_entry.entry_id)
         try:
-            self._ssh_client = paramiko.SSHClient()
-            self._ssh_client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-            self._ssh_client.connect(
-                hostname=self._config.get(CONF_HOST),
-                port=self._config.get("ssh_port", 22),
-                username=self._config.get(CONF_USERNAME, "root").split('@')[0],
-                password=self._config.get(CONF_PASSWORD, ""),
-                timeout=5,
-            )
-            self._ssh_connected = True
-            _LOGGER.debug("SSH connection established successfully")
-            return True
-        except Exception as e:
-            _LOGGER.error(f"Failed to establish SSH connection: {e}")
-            self._ssh_connected = False
+            stored = await self._store.async_load()
+        except Exception as error:
+            _LOGGER.warning(f"Failed to load the saved snapshot: {error}")
+            return False
+        if not stored:
             return False
-            
-    def _get_disk_info(self):
-        """Get disk model and temperature via SSH."""
-        if not self._ssh_connected:
-            if not self._connect_ssh():
-                return None
-                
         try:
-            # List disks - 使用更可靠的方法获取磁盘列表
-            stdin, stdout, stderr = self._ssh_client.exec_command("find /dev -name 'sd*' -not -path '*/mapper/*' | sort")
-            output = stdout.read().decode().strip()
-            
-            # 确保即使只有一个磁盘也能正确处理
-            if not output:
-                _LOGGER.warning("No disks found")
-                return {}
-                
-            disks = output.split("\n")
-            
-            # 过滤掉分区（带数字的设备名）
-            main_disks = []
-            for disk in disks:
-                disk_name = disk.split("/")[-1]
-                # 只保留不包含数字的设备名（主磁盘设备）
-                if disk.strip() and not any(c.isdigit() for c in disk_name):
-                    main_disks.append(disk)
-            
-            _LOGGER.debug(f"Found {len(main_disks)} main disks (excluding partitions): {main_disks}")
-            
-            disk_info = {}
-            for disk in main_disks:
-                # 首先尝试获取磁盘型号
-                stdin, stdout, stderr = self._ssh_client.exec_command(
-                    f"lsblk -o NAME,MODEL,VENDOR -dn {disk}"
-                )
-                model_output = stdout.read().decode().strip()
-                
-                model_family = "Unknown"
-                device_model = "Unknown"
-                temperature = None
-                
-                # 从lsblk输出中提取型号
-                if model_output:
-                    parts = model_output.split()
-                    if len(parts) > 1:
-                        device_model = " ".join(parts[1:]).strip()
-                
-                # 如果lsblk没有提供足够信息，尝试使用smartctl
-                if device_model == "Unknown":
-                    stdin, stdout, stderr = self._ssh_client.exec_command(
-                        f"smartctl -a {disk} | grep -E \"Model|Family\""
-                    )
-                    output = stdout.read().decode()
-                    
-                    lines = output.strip().split("\n")
-                    for line in lines:
-                        if "Model Family" in line:
-                            model_family = line.split("Model Family:")[1].strip()
-                        elif "Device Model" in line:
-                            device_model = line.split("Device Model:")[1].strip()
-                
-                # 获取温度信息 - 使用更可靠的方法
-                stdin, stdout, stderr = self._ssh_client.exec_command(
-                    f"smartctl -a {disk} | grep -E \"Temperature_Celsius|Current Temperature\""
-                )
-                temp_output = stdout.read().decode()
-                
-                # 如果第一种方法没有找到温度数据，尝试备用方法
-                if not temp_output.strip():
-                    stdin, stdout, stderr = self._ssh_client.exec_command(
-                        f"smartctl -a {disk} | grep -E \"Temperature:|Airflow_Temperature\""
-                    )
-                    temp_output = stdout.read().decode()
-                
-                # 提取温度信息
-                for line in temp_output.strip().split("\n"):
-                    if "Temperature_Celsius" in line:
-                        # 使用固定位置（第10个字段）获取温度值
-                        parts = line.strip().split()
-                        if len(parts) >= 10:
-                            try:
-                                # 直接使用第10个字段（索引9）获取温度
-                                temperature = int(parts[9])
-                                # 如果获取到的温度是0，可能是格式问题，尝试其他方法
-                                if temperature == 0:
-                                    # 尝试使用最后一个字段
-                                    temperature = int(parts[-1])
-                            except ValueError:
-                                temperature = None
-                
-                # Use device model as the primary name, fallback to model family
-                model = device_model if device_model != "Unknown" else model_family
-                
-                disk_info[disk] = {
-                    "model": model,
-                    "temperature": temperature
-                }
-            
-            return disk_info
-        except Exception as e:
-            _LOGGER.error(f"Failed to get disk info: {e}")
+            data = PVEData.from_dict(stored["snapshot"])
+            self._collector.restore(data, stored.get("sensor_maps") or {})
+        except (KeyError, TypeError, ValueError) as error:
+            _LOGGER.warning(f"Ignoring the saved snapshot: {error}")
+            return False
+
+        # 重启前的电源操作任务已经无法跟踪
+        for kind, records in (("qemu", data.qemus), ("lxc", data.lxcs)):
+            for id, record in records.items():
+                record.update(self._task_fields(kind, id))
+        self._members = snapshot_members(data)
+        self._missing = {}
+        self.data = data
+        _LOGGER.debug(f"Restored snapshot from {data.time}, {len(self._members)} members")
+        return True
+
+    @callback
+    def _async_schedule_snapshot_save(self):
+        # 写入时才序列化当前的快照，保存间隔内的更新不再重复安排写入
+        now = time.monotonic()
+        if self._store is None or now < self._snapshot_save_due:
+            return
+        self._snapshot_save_due = now + SNAPSHOT_SAVE_DELAY
+        self._store.async_delay_save(self._snapshot_payload, SNAPSHOT_SAVE_DELAY)
+
+    def _snapshot_payload(self):
+        return {
+            "snapshot": self.data.as_dict(),
+            "sensor_maps": self._collector.export_sensor_maps(),
+        }
+
+    async def async_close(self):
+        # 卸载或重新加载时保存最新的快照，下次加载时直接恢复
+        if self._store is not None and self.data is not None:
+            await self._store.async_save(self._snapshot_payload())
+        await self._collector.async_close()
+        self._stream_debouncer.async_cancel()
+
+    @callback
+    def _async_stream_record(self):
+        self.hass.async_create_task(self._stream_debouncer.async_call())
+
+    @callback
+    def _async_push_stream(self):
+        """Publish the latest streamed records between polls."""
+        # 上次轮询失败时实体不可用，等下一次成功的轮询
+        if self.data is None or not self.last_update_success:
+            return
+        data = self._collector.apply_streams(self.data)
+        if data is None:
+            return
+        # 不用 async_set_updated_data，它会重新安排下一次轮询，推送频繁时轮询永远不会执行
+        self.data = data
+        self.async_update_listeners()
+
+    def host_available(self, node_name):
+        """False while the node's SSH host is backed off after failures."""
+        return self._collector.host_available(node_name)
+
+    def get_sensor_reading(self, node_name, key):
+        """Return the SensorReading metadata of a discovered reading."""
+        return self._collector.get_sensor_reading(node_name, key)
+
+    @callback
+    def async_add_membership_listener(self, update_callback):
+        """Listen for added and removed nodes, guests and disks.
+
+        The callback is called right away with every current member as
+        added, and after that once per snapshot whose membership changed.
+        """
+        self._membership_listeners.append(update_callback)
+        if self.data is not None:
+            update_callback(snapshot_members(self.data), set())
+
+        @callback
+        def remove_listener():
+            self._membership_listeners.remove(update_callback)
+
+        return remove_listener
+
+    @callback
+    def async_get_device(self, node=None, vm=None, storage=None):
+        """Get or create the device of a node, guest or storage, cached per entry.
+
+        The registry is only touched again when the name, type or node of
+        the record changed since the device was last written.
+        """
+        if node:
+            key = ("node", node.get("node"))
+            signature = (node.get("type"),)
+        elif vm:
+            key = ("vm", vm.get("vmid"))
+            signature = (vm.get("name"), vm.get("type"), vm.get("node"))
+        elif storage:
+            key = ("storage", storage.get("key"))
+            signature = (storage.get("plugintype"), storage.get("shared"))
+        else:
             return None
 
-    def _update_data(self):
-        data = PVEData()
+        cached = self._devices.get(key)
+        if cached and cached[1] == signature:
+            return cached[0]
+        device = async_get_or_create_device(
+            hass=self.hass,
+            entry_id=self.config_entry.entry_id,
+            node=node,
+            vm=vm,
+            storage=storage,
+        )
+        if device:
+            self._devices[key] = (device, signature)
+        return device
+
+    @callback
+    def _async_update_devices(self, data):
+        # 虚拟机改名或迁移到其他节点后更新设备信息
+        for (kind, id), fields in data.changes.items():
+            if kind not in ("qemu", "lxc") or ("vm", id) not in self._devices:
+                continue
+            if fields.isdisjoint(("name", "type", "node")):
+                continue
+            if record := getattr(data, f"{kind}s").get(id):
+                self.async_get_device(vm=record)
+
+    @callback
+    def async_update_listeners(self):
+        with self.timings.measure("dispatch"):
+            self._async_dispatch()
+        # 分析时一个周期到通知完实体为止；数据流推送等其他通知不结束周期
+        profiler = self._profiler
+        if profiler is not None and self.data is self._profiled_data:
+            self._profiled_data = None
+            if profiler.disable():
+                self._async_end_profile(profiler)
+
+    @callback
+    def _async_dispatch(self):
+        data = self.data
+        # 每个快照只分发一次成员变化，更新失败时重复通知的旧快照会被忽略
+        if data is not None and data is not self._membership_snapshot:
+            self._membership_snapshot = data
+            if data.changes:
+                self._async_update_devices(data)
+            if data.removed:
+                self._async_remove_devices(data.removed)
+            if data.added or data.removed:
+                for update_callback in list(self._membership_listeners):
+                    update_callback(data.added, data.removed)
+        super().async_update_listeners()
+
+    @callback
+    def _async_remove_devices(self, removed):
+        entry_id = self.config_entry.entry_id
+        dev_reg = dr.async_get(self.hass)
+        for kind, id in removed:
+            if kind == "node":
+                identifier = (DOMAIN, entry_id, "node", id)
+            elif kind in ("qemu", "lxc"):
+                identifier = (DOMAIN, entry_id, "vm", id)
+            elif kind == "storage":
+                identifier = (DOMAIN, entry_id, "storage", id)
+            else:
+                continue
+            self._devices.pop(identifier[2:], None)
+            if device := dev_reg.async_get_device(identifiers={identifier}):
+                _LOGGER.debug(f"Removing device for {kind} {id}")
+                dev_reg.async_update_device(device.id, remove_config_entry_id=entry_id)
+
+    def entry_stats(self):
+        """Diagnostics of this entry, read by the entry level sensors."""
+        slots = self._api.slots
+        waits = slots.waits
+        return {
+            "api_queue_depth": slots.queued,
+            "api_slots_in_use": slots.in_use,
+            "api_wait_avg": round(sum(waits) / len(waits) * 1000, 1) if waits else None,
+            "api_wait_max": round(max(waits) * 1000, 1) if waits else None,
+        }
+
+    async def async_record_fixture(self, polls: int) -> dict:
+        """Record the next polls and return them as a redacted fixture bundle.
+
+        The first recorded poll runs every tier so the bundle holds
+        lm-sensors and SMART output; the others follow the regular
+        schedule so the counters advance. The coordinator's scheduled
+        refresh is paused meanwhile, so exactly `polls` cycles are
+        recorded. Streamed readings are not recorded.
+        """
+        recorder = FixtureRecorder()
+        collector = self._collector
+        api, ssh = collector.api, collector.ssh
+        collector.api, collector.ssh = recorder.wrap_api(api), recorder.wrap_ssh(ssh)
+        collector.reset_tiers()
+        self._recording = True
+        self._async_unsub_refresh()
         try:
-            if not self._conn:
-                self._connect()
-
-            resources = self._conn.cluster.resources.get()
-            data.time = dt_util.utcnow()
-            _LOGGER.debug(resources)
-
-            for res in resources:
-                if res.get("type", None) != "node":
-                    continue
-                node, id = self._get_node_info(res)
-                data.nodes[id] = node
-
-            for res in resources:
-                res_type = res.get("type", None)
-                if res_type == "lxc":
-                    lxc, id = self._get_lxc_info(res, data.nodes)
-                    data.lxcs[id] = lxc
-                elif res_type == "qemu":
-                    qemu, id = self._get_qemu_info(res, data.nodes)
-                    data.qemus[id] = qemu
-                elif res_type == "storage":
-                    pass
-                elif res_type == "sdn":
-                    pass
-
-            data.disks = self._get_disk_info()
-            return data
-        except Exception as error:
-            _LOGGER.exception(error)
-            # 返回一个空的PVEData对象，避免后续访问None
-            data.disks = self._get_disk_info()
-            return data
+            for poll in range(polls):
+                if poll:
+                    await asyncio.sleep(self.update_interval.total_seconds())
+                await self.async_refresh()
+        finally:
+            collector.api, collector.ssh = api, ssh
+            self._recording = False
+            if self._listeners:
+                self._schedule_refresh()
+        config = self._config
+        return recorder.bundle(
+            config.get(CONF_HOST),
+            settings={
+                CONF_SENSORS_INTERVAL: config.get(CONF_SENSORS_INTERVAL, DEFAULT_SENSORS_INTERVAL),
+                CONF_SMART_INTERVAL: config.get(CONF_SMART_INTERVAL, DEFAULT_SMART_INTERVAL),
+                CONF_SMART_TTL: config.get(CONF_SMART_TTL, DEFAULT_SMART_TTL),
+                CONF_RATE_SMOOTHING: config.get(CONF_RATE_SMOOTHING, DEFAULT_RATE_SMOOTHING),
+            },
+            coordinator={CONF_API_INTERVAL: self.update_interval.total_seconds()},
+        )
 
-    def _get_lxc_info(self, lxc, nodes):
-        lxc = self._get_usage_info(lxc, nodes)
-        return lxc, lxc.get("vmid")
+    @callback
+    def _schedule_refresh(self):
+        if self._recording:
+            return
+        super()._schedule_refresh()
+
+    @property
+    def profiling(self) -> bool:
+        return self._profiler is not None
 
-    def _get_qemu_info(self, qemu, nodes):
-        qemu = self._get_usage_info(qemu, nodes)
-        return qemu, qemu.get("vmid")
+    async def async_profile(self, cycles: int, top: int):
+        """Profile the next cycles, return (cProfile.Profile, allocation summary).
 
-    def _get_node_info(self, node):
-        node = self._get_usage_info(node)
-        
-        # 获取节点温度信息
+        Raises ProfilerBusyError if another profiler is active.
+        """
+        profiler = CycleProfiler(cycles, top)
+        profiler.start()
+        self._profiler = profiler
         try:
-            node_name = node.get("node")
-            if node_name:
-                # 通过SSH执行sensors -j命令获取温度数据
-                _LOGGER.debug(f"尝试通过SSH获取节点 {node_name} 的温度信息")
-                
-                # 确保SSH连接已建立
-                if not self._connect_ssh():
-                    _LOGGER.warning("SSH连接失败，无法获取温度信息")
-                    return node, node.get("node")
-                
-                # 执行sensors -j命令
-                stdin, stdout, stderr = self._ssh_client.exec_command("sensors -j")
-                sensors_output = stdout.read().decode("utf-8")
-                stderr_output = stderr.read().decode("utf-8")
-                
-                if stderr_output:
-                    _LOGGER.warning(f"执行sensors命令时出错: 请安装lm-sensors包以获取温度相关数据")
-                
-                if sensors_output:
-                    _LOGGER.debug(f"获取到温度数据结果，开始处理")
-                    
-                    # 解析JSON格式的温度数据
-                    import json
-                    try:
-                        sensors_data = json.loads(sensors_output)
-                        _LOGGER.debug(f"成功解析温度数据，找到传感器: {list(sensors_data.keys())}")
-                        
-                        # 提取温度数据
-                        temperatures = {}
-                        
-                        # 处理CPU温度
-                        if "coretemp-isa-0000" in sensors_data:
-                            cpu_data = sensors_data["coretemp-isa-0000"]
-                            # 获取Package温度
-                            if "Package id 0" in cpu_data:
-                                package = cpu_data["Package id 0"]
-                                if "temp1_input" in package:
-                                    temperatures["cpu_package"] = package["temp1_input"]
-                            
-                            # 获取各个核心温度
-                            core_temps = []
-                            for key, value in cpu_data.items():
-                                if key.startswith("Core "):
-                                    for temp_key, temp_value in value.items():
-                                        if temp_key.endswith("_input"):
-                                            core_temps.append(temp_value)
-                                            temperatures[f"cpu_{key.lower()}"] = temp_value
-                            
-                            # 计算CPU平均温度
-                            if core_temps:
-                                temperatures["cpu_avg"] = sum(core_temps) / len(core_temps)
-                        
-                        # 处理主板温度
-                        for sensor_key in sensors_data:
-                            # 尝试查找主板温度传感器
-                            if sensor_key.startswith("acpitz-acpi") or "motherboard" in sensor_key.lower():
-                                acpi_data = sensors_data[sensor_key]
-                                # 遍历所有可能的温度传感器
-                                for temp_key in acpi_data:
-                                    if temp_key.startswith("temp"):
-                                        temp_data = acpi_data[temp_key]
-                                        if isinstance(temp_data, dict) and "temp1_input" in temp_data:
-                                            temperatures["motherboard"] = temp_data["temp1_input"]
-                                            break
-                                        elif isinstance(temp_data, dict) and any(k.endswith("_input") for k in temp_data):
-                                            # 找到第一个输入温度
-                                            for k, v in temp_data.items():
-                                                if k.endswith("_input"):
-                                                    temperatures["motherboard"] = v
-                                                    break
-                                            break
-                                if "motherboard" in temperatures:
-                                    break
-                        
-                        # 处理NVMe温度
-                        if "nvme-pci-0600" in sensors_data:
-                            nvme_data = sensors_data["nvme-pci-0600"]
-                            if "Composite" in nvme_data and "temp1_input" in nvme_data["Composite"]:
-                                temperatures["nvme"] = nvme_data["Composite"]["temp1_input"]
-                        
-                        # 添加到节点数据中
-                        if temperatures:
-                            node["temperatures"] = temperatures
-                            _LOGGER.debug(f"找到的温度数据: {temperatures}")
-                            
-                            # 设置CPU温度为主要温度指标
-                            if "cpu_package" in temperatures:
-                                node["cpu_temperature"] = temperatures["cpu_package"]
-                            elif "cpu_avg" in temperatures:
-                                node["cpu_temperature"] = temperatures["cpu_avg"]
-                            elif temperatures:
-                                # 如果没有找到CPU温度，使用第一个温度作为默认值
-                                node["cpu_temperature"] = next(iter(temperatures.values()))
-                            
-                            # 添加其他温度传感器
-                            if "motherboard" in temperatures:
-                                node["motherboard_temperature"] = temperatures["motherboard"]
-                            else:
-                                # 如果没有找到主板温度，尝试使用其他温度传感器
-                                for key, value in temperatures.items():
-                                    if "board" in key.lower() or "sys" in key.lower():
-                                        node["motherboard_temperature"] = value
-                                        break
-                            
-                            if "nvme" in temperatures:
-                                node["nvme_temperature"] = temperatures["nvme"]
-                            else:
-                                # 尝试查找其他NVMe温度传感器
-                                for key, value in temperatures.items():
-                                    if "nvme" in key.lower() or "ssd" in key.lower():
-                                        node["nvme_temperature"] = value
-                                        break
-                    except Exception as e:
-                        _LOGGER.warning(f"处理温度数据时发生错误: {e}")
-        except Exception as e:
-            _LOGGER.warning(f"获取节点温度失败: {e}")
-            import traceback
-            _LOGGER.debug(f"详细错误: {traceback.format_exc()}")
-            
-        return node, node.get("node")
-
-    def _get_usage_info(self, res, nodes=None):
-        res["cpu_usage"] = to_pecent(res.get("cpu"))
-        res["mem_usage"] = self._usage_pecent(res, "mem", "maxmem")
-        res["disk_usage"] = self._usage_pecent(res, "disk", "maxdisk")
-        if nodes:
-            node = nodes.get(res.get("node"), {})
-            res["node_maxcpu"] = node.get("maxcpu")
-            cpu = res.get("cpu")
-            maxcpu = res.get("maxcpu")
-            node_maxcpu = res.get("node_maxcpu")
-            res["node_cpu_usage"] = (
-                to_pecent(cpu * maxcpu / node_maxcpu)
-                if cpu is not None and maxcpu is not None and node_maxcpu
-                else None
-            )
-            res["node_maxmem"] = node.get("maxmem")
-            res["node_mem_usage"] = self._usage_pecent(res, "mem", "node_maxmem")
-        return res
-
-    def _usage_pecent(self, data, key_a, key_b):
-        a = data.get(key_a)
-        b = data.get(key_b)
-        if a is None or not b:
-            return None
-        return to_pecent(a / b)
+            return await profiler.result
+        finally:
+            if not profiler.result.done():
+                # 服务调用被取消，停止跟踪
+                self._async_end_profile(profiler, asyncio.CancelledError())
+
+    @callback
+    def _async_end_profile(self, profiler, error=None):
+        if self._profiler is profiler:
+            self._profiler = None
+            self._profiled_data = None
+        result = profiler.finish()
+        if profiler.result.done():
+            return
+        if error is not None:
+            profiler.result.set_exception(error)
+        else:
+            profiler.result.set_result(result)
 
     async def async_node_power(self, action: PowerAction, node: str):
-        await self.hass.async_add_executor_job(self.node_power, action, node)
+        if not node or not action:
+            return None
+
+        if action in (PowerAction.REBOOT, PowerAction.SHUTDOWN):
+            return await self._api.async_action(f"nodes/{node}/status", command=str(action))
+        return None
 
     async def async_qemu_power(self, action: PowerAction, node: str, vm: str):
-        await self.hass.async_add_executor_job(self.qemu_power, action, node, vm)
+        return await self._async_vm_power("qemu", action, node, vm)
 
     async def async_lxc_power(self, action: PowerAction, node: str, vm: str):
-        await self.hass.async_add_executor_job(self.lxc_power, action, node, vm)
-
-    def node_power(self, action: PowerAction, node: str):
-        if not node or not action:
-            return
-
-        if action == PowerAction.REBOOT:
-            self._conn.nodes(node).status.post(command="reboot")
-            return
-        if action == PowerAction.SHUTDOWN:
-            self._conn.nodes(node).status.post(command="shutdown")
-            return
+        return await self._async_vm_power("lxc", action, node, vm)
+
+    async def _async_vm_power(self, vm_type: str, action: PowerAction, node: str, vm: str):
+        """Start a power task and track it in the background, returns the UPID."""
+        upid = await self._async_start_vm_task(vm_type, action, node, vm)
+        if upid:
+            self.config_entry.async_create_background_task(
+                self.hass,
+                self._async_track_task(vm_type, node, vm, upid),
+                f"{DOMAIN} {vm_type} {vm} {action}",
+            )
+        return upid
 
-    def qemu_power(self, action: PowerAction, node: str, vm: str):
+    async def _async_start_vm_task(self, vm_type, action, node, vm):
         if not node or not vm or not action:
-            return
+            return None
 
-        if action == PowerAction.ON:
-            self._conn.nodes(node).qemu(vm).status.start.post()
-            return
-        if action == PowerAction.OFF:
-            self._conn.nodes(node).qemu(vm).status.stop.post()
-            return
-        if action == PowerAction.SUSPEND:
-            self._conn.nodes(node).qemu(vm).status.suspend.post()
-            return
-        if action == PowerAction.RESUME:
-            self._conn.nodes(node).qemu(vm).status.resume.post()
-            return
-        if action == PowerAction.RESET:
-            self._conn.nodes(node).qemu(vm).status.reset.post()
-            return
-        if action == PowerAction.REBOOT:
-            self._conn.nodes(node).qemu(vm).status.reboot.post()
+        command = VM_POWER_COMMANDS.get(vm_type, {}).get(action)
+        if command is None:
+            return None
+        upid = await self._api.async_action(f"nodes/{node}/{vm_type}/{vm}/status/{command}")
+        if upid:
+            self._tasks[(vm_type, vm)] = {"upid": upid, "state": "pending", "error": None}
+            self._async_publish_guests({(vm_type, vm): {}})
+        return upid
+
+    def _task_fields(self, kind, id):
+        task = self._tasks.get((kind, id))
+        if task is None:
+            return {"task_state": None, "task_error": None}
+        return {"task_state": task["state"], "task_error": task["error"]}
+
+    def _finish_task(self, kind, id, upid, error):
+        """Clear or fail a tracked task, False if a newer task replaced it."""
+        task = self._tasks.get((kind, id))
+        if task is None or task["upid"] != upid:
+            return False
+        if error:
+            self._tasks[(kind, id)] = {**task, "state": "failed", "error": error}
+        else:
+            del self._tasks[(kind, id)]
+        return True
+
+    async def async_wait_task(self, node: str, upid: str, timeout: float = TASK_TIMEOUT):
+        """Poll a task until it stops, returns None on success or the error."""
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                status = await self._api.async_get(
+                    f"nodes/{node}/tasks/{upid}/status", priority=PRIORITY_ACTION
+                )
+            except PVEApiError as e:
+                return str(e)
+            if (status or {}).get("status") == "stopped":
+                exitstatus = status.get("exitstatus")
+                return None if exitstatus == "OK" else (exitstatus or "unknown error")
+            if time.monotonic() > deadline:
+                return "timed out"
+            await asyncio.sleep(TASK_POLL_INTERVAL)
+
+    async def _async_track_task(self, vm_type, node, vm, upid):
+        """Wait for a guest task, then refresh that guest only. Returns the error."""
+        error = await self.async_wait_task(node, upid)
+        if error:
+            _LOGGER.warning(f"Power task {upid} failed: {error}")
+
+        # 只刷新这一个虚拟机，不等待下一次全量轮询
+        fields = {}
+        try:
+            current = await self._api.async_get(
+                f"nodes/{node}/{vm_type}/{vm}/status/current", priority=PRIORITY_ACTION
+            )
+        except PVEApiError as e:
+            _LOGGER.warning(f"Failed to refresh {vm_type} {vm}: {e}")
+        else:
+            if current and current.get("status"):
+                fields["status"] = current["status"]
+
+        # 已经被更新的任务取代时不再发布
+        if self._finish_task(vm_type, vm, upid, error):
+            self._async_publish_guests({(vm_type, vm): fields})
+        return error
+
+    @callback
+    def _async_publish_guests(self, updates):
+        """Publish the current snapshot with guest fields and task states updated.
+
+        `updates` maps (kind, vmid) to the fields to replace.
+        """
+        if self.data is None:
             return
-        if action == PowerAction.SHUTDOWN:
-            self._conn.nodes(node).qemu(vm).status.shutdown.post()
+        data = self.data
+        changes = {}
+        for (kind, id), fields in updates.items():
+            if id not in getattr(data, f"{kind}s"):
+                continue
+            data = data.with_record(kind, id, {**fields, **self._task_fields(kind, id)})
+            changes.update(data.changes)
+        if changes:
+            data.changes = changes
+            self.async_set_updated_data(data)
+
+    async def async_bulk_power(self, action: PowerAction, guests, concurrency: int, progress=None):
+        """Run a power action on many guests, returns {vmid: error or None}.
+
+        `guests` is a list of (kind, vmid, record) from bulk.select_guests.
+        Nodes are handled in parallel; `progress(vmid, error)` is called as
+        every guest finishes.
+        """
+        by_node = {}
+        for kind, vmid, record in guests:
+            by_node.setdefault(record.get("node"), []).append((kind, vmid, record))
+
+        results = {}
+
+        def report(vmid, error):
+            results[vmid] = error
+            if progress is not None:
+                progress(vmid, error)
+
+        await asyncio.gather(
+            *(
+                self._async_bulk_node(node, action, node_guests, concurrency, report)
+                for node, node_guests in by_node.items()
+            )
+        )
+        # 批量任务结束后全量刷新一次
+        await self.async_refresh()
+        return results
+
+    async def _async_bulk_node(self, node, action, guests, concurrency, report):
+        if action in BULK_NODE_COMMANDS and await self._async_bulk_node_task(
+            node, action, guests, report
+        ):
             return
 
-    def lxc_power(self, action: PowerAction, node: str, vm: str):
-        if not node or not vm or not action:
-            return
+        starting = action in STARTING_ACTIONS
+        if starting or action in STOPPING_ACTIONS:
+            # 逐个执行时按启动顺序分组，同一组内并发
+            configs = await asyncio.gather(
+                *(
+                    self._api.async_get(f"nodes/{node}/{kind}/{vmid}/config")
+                    for kind, vmid, _ in guests
+                ),
+                return_exceptions=True,
+            )
+            guests = [
+                (kind, vmid, record, parse_startup(None if isinstance(config, Exception) else config.get("startup")))
+                for (kind, vmid, record), config in zip(guests, configs)
+            ]
+            groups = order_groups(guests, reverse=not starting)
+        else:
+            groups = [[(kind, vmid, record, {}) for kind, vmid, record in guests]]
+        slots = asyncio.Semaphore(concurrency)
+
+        async def _async_run(kind, vmid):
+            async with slots:
+                try:
+                    upid = await self._async_start_vm_task(kind, action, node, vmid)
+                except PVEApiError as e:
+                    report(vmid, str(e))
+                    return
+                if not upid:
+                    report(vmid, f"{action} is not supported")
+                    return
+                report(vmid, await self._async_track_task(kind, node, vmid, upid))
+
+        for group in groups:
+            await asyncio.gather(*(_async_run(kind, vmid) for kind, vmid, _, _ in group))
+            # 与 startall 一致，启动后等待 up 秒再启动下一组
+            if starting and (delay := max(startup.get("up", 0) for *_, startup in group)):
+                await asyncio.sleep(delay)
+
+    async def _async_bulk_node_task(self, node, action, guests, report):
+        """Run startall/stopall for the guests of one node, False if unavailable."""
+        command, params = BULK_NODE_COMMANDS[action]
+        vms = ",".join(str(vmid) for _, vmid, _ in guests)
+        try:
+            upid = await self._api.async_action(f"nodes/{node}/{command}", vms=vms, **params)
+        except PVEApiError as e:
+            _LOGGER.debug(f"Bulk {action} on {node} unavailable, running per guest: {e}")
+            return False
+        if not upid:
+            return False
 
-        if action == PowerAction.ON:
-            self._conn.nodes(node).lxc(vm).status.start.post()
-            return
-        if action == PowerAction.OFF:
-            self._conn.nodes(node).lxc(vm).status.stop.post()
-            return
-        if action == PowerAction.SUSPEND:
-            self._conn.nodes(node).lxc(vm).status.suspend.post()
-            return
-        if action == PowerAction.RESUME:
-            self._conn.nodes(node).lxc(vm).status.resume.post()
-            return
-        if action == PowerAction.REBOOT:
-            self._conn.nodes(node).lxc(vm).status.reboot.post()
-            return
-        if action == PowerAction.SHUTDOWN:
-            self._conn.nodes(node).lxc(vm).status.shutdown.post()
-            return
+        for kind, vmid, _ in guests:
+            self._tasks[(kind, vmid)] = {"upid": upid, "state": "pending", "error": None}
+        self._async_publish_guests({(kind, vmid): {} for kind, vmid, _ in guests})
+
+        # startall/stopall 自己按启动顺序执行，并等待 up/down 延时
+        error = await self.async_wait_task(node, upid, BULK_TASK_TIMEOUT)
+        updates = {}
+        for kind, vmid, _ in guests:
+            if self._finish_task(kind, vmid, upid, error):
+                updates[(kind, vmid)] = {}
+            report(vmid, error)
+        self._async_publish_guests(updates)
+        return True
@@ -0,0 +1,55 @@
+"""Derive per-second rates from the cumulative counters in cluster/resources."""
+from __future__ import annotations
+
+RATE_COUNTERS = ("netin", "netout", "diskread", "diskwrite")
+
+# pvestatd 大约每10秒才更新一次计数器，在这个窗口内计数器不变时保持上一次的速率
+HOLD_WINDOW_SEC = 25
+
+
+class RateTracker:
+    """Keeps the last sample of every counter and writes `<counter>_rate`.
+
+    Timestamps must come from a monotonic clock. A counter that goes
+    backwards (guest restarted) is treated as a reset and yields no rate
+    for that sample. `smoothing` is the EWMA weight given to the previous
+    rate, 0 disables smoothing.
+    """
+
+    def __init__(self, counters=RATE_COUNTERS, smoothing: float = 0.0) -> None:
+        self._counters = counters
+        self._smoothing = smoothing
+        # key -> counter -> [value, time, rate]
+        self._samples: dict[object, dict[str, list]] = {}
+
+    def update(self, records: dict, now: float) -> None:
+        """Add rate fields to every record and forget keys no longer present."""
+        samples = {}
+        for key, record in records.items():
+            previous = self._samples.get(key, {})
+            current = {}
+            for counter in self._counters:
+                sample = self._update_counter(previous.get(counter), record.get(counter), now)
+                if sample is not None:
+                    current[counter] = sample
+                rate = sample[2] if sample is not None else None
+                record[f"{counter}_rate"] = round(rate, 0) if rate is not None else None
+            samples[key] = current
+        self._samples = samples
+
+    def _update_counter(self, sample, value, now):
+        if value is None:
+            return None
+        if sample is None or value < sample[0]:
+            # 第一次采样或计数器被重置
+            return [value, now, None]
+
+        last_value, last_time, rate = sample
+        elapsed = now - last_time
+        if elapsed <= 0 or (value == last_value and elapsed < HOLD_WINDOW_SEC):
+            return sample
+
+        raw = (value - last_value) / elapsed
+        if rate is not None and self._smoothing:
+            raw = self._smoothing * rate + (1 - self._smoothing) * raw
+        return [value, now, raw]
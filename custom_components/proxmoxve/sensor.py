@@ -12,28 +12,34 @@ from homeassistant.components.sensor import (
 )
 from homeassistant.const import (
     PERCENTAGE,
+    EntityCategory,
+    REVOLUTIONS_PER_MINUTE,
+    UnitOfElectricCurrent,
+    UnitOfElectricPotential,
+    UnitOfInformation,
+    UnitOfPower,
     UnitOfTime,
     UnitOfDataRate,
     UnitOfTemperature,
 )
 from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.config_entries import ConfigEntry
-from .entity import PVENodeEntity, PVEVMEntity
+from .entity import PVEEntryEntity, PVENodeEntity, PVEStorageEntity, PVEVMEntity
 from .pve import PVEDataUpdateCoordinator
+from .timing import POLL_PHASES
 
 from .const import DOMAIN
 
 _LOGGER = logging.getLogger(__name__)
 
-MIN_STATISTICS_SEC = 15
-MAX_STATISTICS_SEC = 25
-
 
 @dataclass(frozen=True, kw_only=True)
 class PVESensorEntityDescription(SensorEntityDescription):
-    statistics: bool = False
     data_key: str
+    # 数据通过SSH从宿主机采集，主机不可达时实体不可用
+    host_telemetry: bool = False
 
 
 SENSORS: tuple[PVESensorEntityDescription, ...] = (
@@ -80,6 +86,7 @@ NODE_SENSORS: tuple[PVESensorEntityDescription, ...] = SENSORS + (
         state_class=SensorStateClass.MEASUREMENT,
         native_unit_of_measurement=UnitOfTemperature.CELSIUS,
         data_key="cpu_temperature",
+        host_telemetry=True,
     ),
     PVESensorEntityDescription(
         key="motherboard_temperature",
@@ -89,6 +96,7 @@ NODE_SENSORS: tuple[PVESensorEntityDescription, ...] = SENSORS + (
         state_class=SensorStateClass.MEASUREMENT,
         native_unit_of_measurement=UnitOfTemperature.CELSIUS,
         data_key="motherboard_temperature",
+        host_telemetry=True,
     ),
     PVESensorEntityDescription(
         key="nvme_temperature",
@@ -98,13 +106,21 @@ NODE_SENSORS: tuple[PVESensorEntityDescription, ...] = SENSORS + (
         state_class=SensorStateClass.MEASUREMENT,
         native_unit_of_measurement=UnitOfTemperature.CELSIUS,
         data_key="nvme_temperature",
+        host_telemetry=True,
     ),
     PVESensorEntityDescription(
-        key="disk_model",
-        translation_key="disk_model",
-        icon="mdi:harddisk",
-        data_key="disks",
+        key="cpu_iowait",
+        translation_key="cpu_iowait",
+        icon="mdi:timer-sand",
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=PERCENTAGE,
+        entity_registry_enabled_default=False,
+        data_key="cpu_iowait",
+        host_telemetry=True,
     ),
+)
+# 每个磁盘一组传感器，数值来自缓存的SMART结果
+DISK_SENSORS: tuple[PVESensorEntityDescription, ...] = (
     PVESensorEntityDescription(
         key="disk_temperature",
         translation_key="disk_temperature",
@@ -112,7 +128,49 @@ NODE_SENSORS: tuple[PVESensorEntityDescription, ...] = SENSORS + (
         device_class=SensorDeviceClass.TEMPERATURE,
         state_class=SensorStateClass.MEASUREMENT,
         native_unit_of_measurement=UnitOfTemperature.CELSIUS,
-        data_key="disks",
+        data_key="temperature",
+        host_telemetry=True,
+    ),
+    PVESensorEntityDescription(
+        key="disk_smart_status",
+        translation_key="disk_smart_status",
+        icon="mdi:harddisk",
+        device_class=SensorDeviceClass.ENUM,
+        options=["passed", "failed"],
+        entity_category=EntityCategory.DIAGNOSTIC,
+        data_key="smart_status",
+        host_telemetry=True,
+    ),
+    PVESensorEntityDescription(
+        key="disk_reallocated_sectors",
+        translation_key="disk_reallocated_sectors",
+        icon="mdi:harddisk-remove",
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        data_key="reallocated_sectors",
+        host_telemetry=True,
+    ),
+    PVESensorEntityDescription(
+        key="disk_wear_level",
+        translation_key="disk_wear_level",
+        icon="mdi:chart-line-variant",
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=PERCENTAGE,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        data_key="wear_level",
+        host_telemetry=True,
+    ),
+    PVESensorEntityDescription(
+        key="disk_power_on_hours",
+        translation_key="disk_power_on_hours",
+        icon="mdi:clock-outline",
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        native_unit_of_measurement=UnitOfTime.HOURS,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        data_key="power_on_hours",
+        host_telemetry=True,
     ),
 )
 VM_SENSORS: tuple[PVESensorEntityDescription, ...] = SENSORS + (
@@ -157,8 +215,7 @@ VM_SENSORS: tuple[PVESensorEntityDescription, ...] = SENSORS + (
         native_unit_of_measurement=UnitOfDataRate.BYTES_PER_SECOND,
         suggested_unit_of_measurement=UnitOfDataRate.MEGABYTES_PER_SECOND,
         suggested_display_precision=2,
-        statistics=True,
-        data_key="netin",
+        data_key="netin_rate",
     ),
     PVESensorEntityDescription(
         key="netout",
@@ -169,11 +226,154 @@ VM_SENSORS: tuple[PVESensorEntityDescription, ...] = SENSORS + (
         native_unit_of_measurement=UnitOfDataRate.BYTES_PER_SECOND,
         suggested_unit_of_measurement=UnitOfDataRate.MEGABYTES_PER_SECOND,
         suggested_display_precision=2,
-        statistics=True,
-        data_key="netout",
+        data_key="netout_rate",
+    ),
+    PVESensorEntityDescription(
+        key="diskread",
+        translation_key="diskread",
+        icon="mdi:harddisk",
+        device_class=SensorDeviceClass.DATA_RATE,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfDataRate.BYTES_PER_SECOND,
+        suggested_unit_of_measurement=UnitOfDataRate.MEGABYTES_PER_SECOND,
+        suggested_display_precision=2,
+        data_key="diskread_rate",
+    ),
+    PVESensorEntityDescription(
+        key="diskwrite",
+        translation_key="diskwrite",
+        icon="mdi:harddisk",
+        device_class=SensorDeviceClass.DATA_RATE,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfDataRate.BYTES_PER_SECOND,
+        suggested_unit_of_measurement=UnitOfDataRate.MEGABYTES_PER_SECOND,
+        suggested_display_precision=2,
+        data_key="diskwrite_rate",
     ),
 )
 
+STORAGE_SENSORS: tuple[PVESensorEntityDescription, ...] = (
+    PVESensorEntityDescription(
+        key="storage_usage",
+        translation_key="storage_usage",
+        icon="mdi:database",
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=PERCENTAGE,
+        data_key="disk_usage",
+    ),
+    PVESensorEntityDescription(
+        key="storage_free",
+        translation_key="storage_free",
+        icon="mdi:database-outline",
+        device_class=SensorDeviceClass.DATA_SIZE,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        suggested_unit_of_measurement=UnitOfInformation.GIGABYTES,
+        suggested_display_precision=1,
+        data_key="storage_free",
+    ),
+    PVESensorEntityDescription(
+        key="storage_status",
+        translation_key="storage_status",
+        icon="mdi:database-check",
+        data_key="status",
+    ),
+    PVESensorEntityDescription(
+        key="storage_type",
+        translation_key="storage_type",
+        icon="mdi:database-arrow-right",
+        device_class=SensorDeviceClass.ENUM,
+        options=["shared", "local"],
+        data_key="storage_type",
+    ),
+)
+
+# 集成条目自身的诊断信息，默认不启用
+ENTRY_SENSORS: tuple[PVESensorEntityDescription, ...] = (
+    PVESensorEntityDescription(
+        key="api_queue_depth",
+        translation_key="api_queue_depth",
+        icon="mdi:tray-full",
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        data_key="api_queue_depth",
+    ),
+    PVESensorEntityDescription(
+        key="api_slots_in_use",
+        translation_key="api_slots_in_use",
+        icon="mdi:connection",
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        data_key="api_slots_in_use",
+    ),
+    PVESensorEntityDescription(
+        key="api_wait_avg",
+        translation_key="api_wait_avg",
+        icon="mdi:timer-outline",
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        data_key="api_wait_avg",
+    ),
+    PVESensorEntityDescription(
+        key="api_wait_max",
+        translation_key="api_wait_max",
+        icon="mdi:timer-alert-outline",
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        data_key="api_wait_max",
+    ),
+)
+
+# 每个轮询阶段一个传感器，状态为p95耗时，p50和最大值在属性中
+TIMING_SENSORS: tuple[PVESensorEntityDescription, ...] = tuple(
+    PVESensorEntityDescription(
+        key=f"{phase}_time",
+        translation_key=f"{phase}_time",
+        icon="mdi:timer-sand",
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        data_key=phase,
+    )
+    for phase in POLL_PHASES
+)
+
+# lm-sensors 读数类型 -> (设备类别, 单位)
+READING_KINDS = {
+    "temperature": (SensorDeviceClass.TEMPERATURE, UnitOfTemperature.CELSIUS),
+    "fan": (None, REVOLUTIONS_PER_MINUTE),
+    "voltage": (SensorDeviceClass.VOLTAGE, UnitOfElectricPotential.VOLT),
+    "power": (SensorDeviceClass.POWER, UnitOfPower.WATT),
+    "current": (SensorDeviceClass.CURRENT, UnitOfElectricCurrent.AMPERE),
+}
+
+
+def reading_description(reading) -> PVESensorEntityDescription:
+    device_class, unit = READING_KINDS[reading.kind]
+    return PVESensorEntityDescription(
+        key=f"reading_{reading.key}",
+        name=reading.label,
+        icon="mdi:fan" if reading.kind == "fan" else None,
+        device_class=device_class,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=unit,
+        # 每个核心和电压读数默认不启用，避免大型主机一次生成几十个实体
+        entity_registry_enabled_default=(
+            reading.kind == "temperature" and reading.role != "cpu_core"
+        ),
+        data_key=reading.key,
+        host_telemetry=True,
+    )
 
 
 async def async_setup_entry(
@@ -182,115 +382,128 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     coordinator: PVEDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+    ent_reg = er.async_get(hass)
 
-    cache_nodes = set()
-    cache_qemus = set()
-    cache_lxcs = set()
-    cache_disks = set()  # 添加磁盘缓存集合
-
-    def _on_update():
+    @callback
+    def _on_membership(added, removed):
         dev: list[SensorEntity] = []
-        if coordinator.data is None:
-            _LOGGER.warning("Coordinator data is None, skipping update")
-            return
-            
-        # 处理磁盘传感器
-        if coordinator.data.disks:
-            _LOGGER.debug(f"Found {len(coordinator.data.disks)} disks: {list(coordinator.data.disks.keys())}")
-            
-            # 获取磁盘温度传感器描述
-            disk_temp_desc = next((d for d in NODE_SENSORS if d.key == "disk_temperature"), None)
-            
-            if disk_temp_desc:
-                # 为每个磁盘创建温度传感器
-                for disk_path, disk_info in coordinator.data.disks.items():
-                    # 检查磁盘是否已经在缓存中
-                    if disk_path in cache_disks:
-                        _LOGGER.debug(f"Disk {disk_path} already in cache, skipping")
-                        continue
-                        
-                    # 记录磁盘信息，无论是否有温度数据
-                    _LOGGER.debug(f"Processing disk {disk_path} with model {disk_info.get('model')}, temperature: {disk_info.get('temperature')}")
-                    
-                    # 添加到缓存
-                    cache_disks.add(disk_path)
-                    
-                    # 为所有磁盘创建传感器，即使没有温度数据
-                    _LOGGER.debug(f"Creating temperature sensor for disk {disk_path}")
-                    
-                    # 创建传感器实体
+        data = coordinator.data
+
+        for kind, id in added:
+            if kind == "disk":
+                # 磁盘按所在节点分组，为所有磁盘创建传感器，即使没有温度数据
+                node_name, disk_path = id
+                for description in DISK_SENSORS:
                     sensor = PVENodeSensor(
                         hass,
-                        description=disk_temp_desc,
+                        description=description,
                         entry=entry,
                         coordinator=coordinator,
-                        data={"node": list(coordinator.data.nodes.keys())[0] if coordinator.data.nodes else "unknown"}
+                        data=data.nodes.get(node_name, {"node": node_name})
                     )
                     # 设置磁盘路径，这会影响 unique_id 的生成
                     sensor.disk_path = disk_path
-                    # 记录生成的唯一ID，用于调试
-                    _LOGGER.debug(f"Created disk temperature sensor with unique_id: {sensor.unique_id}")
                     dev.append(sensor)
-            
-        for id, node in coordinator.data.nodes.items():
-            if id is None or id in cache_nodes:
-                continue
-            cache_nodes.add(id)
-            for description in NODE_SENSORS:
-                # 跳过磁盘温度传感器，因为我们已经为每个磁盘创建了单独的传感器
-                if description.key in ["disk_temperature", "disk_model"]:
+                _LOGGER.debug(f"Created sensors for disk {disk_path} on {node_name}")
+            elif kind == "node":
+                for description in NODE_SENSORS:
+                    dev.append(
+                        PVENodeSensor(
+                            hass,
+                            description=description,
+                            entry=entry,
+                            coordinator=coordinator,
+                            data=data.nodes[id],
+                        )
+                    )
+            elif kind == "qemu":
+                for description in VM_SENSORS:
+                    dev.append(
+                        PVEQemuSensor(
+                            hass,
+                            description=description,
+                            entry=entry,
+                            coordinator=coordinator,
+                            data=data.qemus[id],
+                        )
+                    )
+            elif kind == "lxc":
+                for description in VM_SENSORS:
+                    dev.append(
+                        PVELXCSensor(
+                            hass,
+                            description=description,
+                            entry=entry,
+                            coordinator=coordinator,
+                            data=data.lxcs[id],
+                        )
+                    )
+            elif kind == "reading":
+                node_name, key = id
+                reading = coordinator.get_sensor_reading(node_name, key)
+                if reading is None:
                     continue
                 dev.append(
-                    PVENodeSensor(
+                    PVEReadingSensor(
                         hass,
-                        description=description,
+                        description=reading_description(reading),
                         entry=entry,
                         coordinator=coordinator,
-                        data=node,
+                        data=data.nodes.get(node_name, {"node": node_name}),
                     )
                 )
-        for id, qemu in coordinator.data.qemus.items():
-            if id is None or id in cache_qemus:
-                continue
-            cache_qemus.add(id)
-            for description in VM_SENSORS:
-                dev.append(
-                    PVEQemuSensor(
-                        hass,
-                        description=description,
-                        entry=entry,
-                        coordinator=coordinator,
-                        data=qemu,
+            elif kind == "storage":
+                for description in STORAGE_SENSORS:
+                    dev.append(
+                        PVEStorageSensor(
+                            hass,
+                            description=description,
+                            entry=entry,
+                            coordinator=coordinator,
+                            data=data.storages[id],
+                        )
                     )
-                )
 
-        for id, lxc in coordinator.data.lxcs.items():
-            if id is None or id in cache_lxcs:
-                continue
-            cache_lxcs.add(id)
-            for description in VM_SENSORS:
-                dev.append(
-                    PVELXCSensor(
-                        hass,
-                        description=description,
-                        entry=entry,
-                        coordinator=coordinator,
-                        data=lxc,
+        # 节点和虚拟机的实体随设备一起删除，磁盘和温度读数需要单独删除
+        for kind, id in removed:
+            if kind == "disk":
+                node_name, disk_path = id
+                unique_ids = [
+                    PVENodeSensor.disk_unique_id(
+                        entry.entry_id, node_name, disk_path, description.key
                     )
-                )
+                    for description in DISK_SENSORS
+                ]
+            elif kind == "reading":
+                node_name, key = id
+                unique_ids = ["_".join([DOMAIN, entry.entry_id, "node", node_name, f"reading_{key}"])]
+            else:
+                continue
+            for unique_id in unique_ids:
+                if entity_id := ent_reg.async_get_entity_id("sensor", DOMAIN, unique_id):
+                    ent_reg.async_remove(entity_id)
 
         if dev:
             async_add_entities(dev)
 
-    coordinator.async_add_listener(_on_update)
+    async_add_entities(
+        [
+            *(
+                PVEEntrySensor(hass, description=description, entry=entry, coordinator=coordinator)
+                for description in ENTRY_SENSORS
+            ),
+            *(
+                PVETimingSensor(hass, description=description, entry=entry, coordinator=coordinator)
+                for description in TIMING_SENSORS
+            ),
+        ]
+    )
+    entry.async_on_unload(coordinator.async_add_membership_listener(_on_membership))
 
 
 class PVEVMSensorEntity(PVEVMEntity, SensorEntity):
     def __init__(self, hass, description, entry, coordinator, data):
         super().__init__(hass, description, entry, coordinator, data)
-        if self.entity_description.statistics:
-            self._last_value = None
-            self._last_time = None
 
     def _get_data(self):
         """data"""
@@ -300,47 +513,15 @@ class PVEVMSensorEntity(PVEVMEntity, SensorEntity):
             return data.get(self.entity_description.data_key, None)
         return None
 
-    def _should_update(self):
-        return True
-
-    @callback
-    def _handle_coordinator_update(self) -> None:
-        if (
-            self.entity_description.statistics
-            and self._last_time is not None
-            and (self.coordinator.data.time - self._last_time).total_seconds()
-            < MIN_STATISTICS_SEC
-            and self._last_value is not None
-            and self._get_value() == self._last_value
-        ):
-            return
-        super()._handle_coordinator_update()
-
     @property
     def native_value(self):
-        value = self._get_value()
-        if not self.entity_description.statistics:
-            return value
-        
-        last_value = self._last_value
-        last_time = self._last_time
-        this_time = self.coordinator.data.time
-        self._last_time = this_time
-        self._last_value = value
-        if (
-            last_value is None
-            or last_time is None
-            or value is None
-            or last_value > value
-        ):
-            return None
-        delta_sec = (this_time - last_time).total_seconds()
-        if delta_sec > MAX_STATISTICS_SEC or delta_sec <= 0:
-            return None
-        return round((value - last_value) / delta_sec, 0)
+        # 网络和磁盘IO速率由协调器统一计算，这里直接读取
+        return self._get_value()
 
 
 class PVEQemuSensor(PVEVMSensorEntity):
+    _vm_kind = "qemu"
+
     def __init__(self, hass, description, entry, coordinator, data):
         super().__init__(hass, description, entry, coordinator, data)
 
@@ -349,6 +530,8 @@ class PVEQemuSensor(PVEVMSensorEntity):
 
 
 class PVELXCSensor(PVEVMSensorEntity):
+    _vm_kind = "lxc"
+
     def __init__(self, hass, description, entry, coordinator, data):
         super().__init__(hass, description, entry, coordinator, data)
 
@@ -356,7 +539,67 @@ class PVELXCSensor(PVEVMSensorEntity):
         return self.coordinator.data.lxcs.get(self.vmid, None)
 
 
-class PVENodeSensor(PVENodeEntity, SensorEntity):
+class PVEStorageSensor(PVEStorageEntity, SensorEntity):
+
+    @property
+    def native_value(self):
+        if data := self.coordinator.data.storages.get(self.storage_key, None):
+            return data.get(self.entity_description.data_key, None)
+        return None
+
+
+class PVEEntrySensor(PVEEntryEntity, SensorEntity):
+
+    @property
+    def native_value(self):
+        return self.coordinator.entry_stats().get(self.entity_description.data_key)
+
+
+class PVETimingSensor(PVEEntryEntity, SensorEntity):
+
+    def _get_summary(self):
+        return self.coordinator.timings.summary().get(self.entity_description.data_key)
+
+    @property
+    def native_value(self):
+        if summary := self._get_summary():
+            return summary["p95"]
+        return None
+
+    @property
+    def extra_state_attributes(self):
+        return self._get_summary()
+
+
+class PVEHostTelemetrySensor(PVENodeEntity, SensorEntity):
+    """Node sensor that may read data collected over SSH."""
+
+    @property
+    def available(self):
+        if self.entity_description.host_telemetry and not self.coordinator.host_available(self.node):
+            return False
+        return super().available
+
+
+class PVEReadingSensor(PVEHostTelemetrySensor):
+    """A single lm-sensors reading discovered on a node."""
+
+    def _change_key(self):
+        return ("reading", self.node)
+
+    @property
+    def available(self):
+        # 读数暂时缺失时实体不可用，只有重新发现传感器后才会删除实体
+        return super().available and self.native_value is not None
+
+    @property
+    def native_value(self):
+        if data := self.coordinator.data.readings.get(self.node, None):
+            return data.get(self.entity_description.data_key, None)
+        return None
+
+
+class PVENodeSensor(PVEHostTelemetrySensor):
     def __init__(self, hass, description, entry, coordinator, data):
         super().__init__(hass, description, entry, coordinator, data)
         self.disk_path = None
@@ -364,65 +607,100 @@ class PVENodeSensor(PVENodeEntity, SensorEntity):
     @property
     def unique_id(self):
         """Return a unique ID for this entity."""
-        # 如果是磁盘温度传感器，则在 unique_id 中包含磁盘路径
-        if self.entity_description.key == "disk_temperature" and self.disk_path:
-            # 从路径中提取磁盘名称（例如 sda）
-            disk_name = self.disk_path.split("/")[-1]
-            return "_".join(
-                [
-                    DOMAIN,
-                    self.coordinator.config_entry.entry_id,
-                    "node",
-                    self.node,
-                    self.entity_description.key,
-                    disk_name  # 添加磁盘名称到 unique_id
-                ]
+        # 如果是磁盘传感器，则在 unique_id 中包含磁盘路径
+        if self.disk_path:
+            return self.disk_unique_id(
+                self.coordinator.config_entry.entry_id,
+                self.node,
+                self.disk_path,
+                self.entity_description.key,
             )
         # 对于其他传感器，使用默认的 unique_id
         return self._attr_unique_id
-        
+
+    @staticmethod
+    def disk_unique_id(entry_id, node, disk_path, key="disk_temperature"):
+        # 从路径中提取磁盘名称（例如 sda）
+        disk_name = disk_path.split("/")[-1]
+        return "_".join(
+            [
+                DOMAIN,
+                entry_id,
+                "node",
+                node,
+                key,
+                disk_name  # 添加磁盘名称到 unique_id
+            ]
+        )
+
+    def _change_key(self):
+        if self.disk_path:
+            return ("disk", self.node)
+        return super()._change_key()
+
+    def _change_fields(self):
+        if self.disk_path:
+            return (self.disk_path,)
+        return super()._change_fields()
+
+    def _get_disk_info(self):
+        disks = self.coordinator.data.disks.get(self.node) if self.coordinator.data.disks else None
+        if not disks:
+            _LOGGER.debug(f"No disk information available for {self.node}")
+            return None
+        if self.disk_path not in disks:
+            _LOGGER.debug(f"Disk {self.disk_path} not found in available disks: {list(disks.keys())}")
+            return None
+        return disks[self.disk_path]
+
+    @property
+    def translation_placeholders(self):
+        if self.disk_path:
+            return {"disk": self.disk_path.split("/")[-1]}
+        return super().translation_placeholders
+
     @property
     def name(self):
         """Return the name of the sensor."""
         if self.entity_description.key == "disk_temperature" and self.coordinator.data.disks:
             # 直接使用磁盘名称（如sda、sdb）作为实体名称
-            if self.disk_path and self.disk_path in self.coordinator.data.disks:
+            if self.disk_path and self.disk_path in self.coordinator.data.disks.get(self.node, {}):
                 # 从路径中提取磁盘名称（例如 /dev/sda 提取为 sda）
                 disk_name = self.disk_path.split("/")[-1]
                 return f"磁盘{disk_name}"
         return super().name
 
+    @property
+    def extra_state_attributes(self):
+        if self.disk_path and (disk_info := self._get_disk_info()):
+            # 休眠中的磁盘显示的是最近一次查询到的值
+            return {
+                "model": disk_info.get("model"),
+                "serial": disk_info.get("serial"),
+                "standby": disk_info.get("standby", False),
+            }
+        return None
+
     @property
     def native_value(self):
-        if self.entity_description.key == "disk_temperature":
-            # 处理磁盘温度信息
-            if not self.coordinator.data.disks:
-                _LOGGER.debug("No disk information available")
+        if self.disk_path:
+            disk_info = self._get_disk_info()
+            if disk_info is None:
                 return None
-                
-            # 确保磁盘路径已设置
-            if self.disk_path is None:
-                _LOGGER.debug("Disk path is not set")
-                return None
-                
-            # 确保磁盘信息存在
-            if self.disk_path not in self.coordinator.data.disks:
-                _LOGGER.debug(f"Disk {self.disk_path} not found in available disks: {list(self.coordinator.data.disks.keys())}")
-                return None
-                
-            disk_info = self.coordinator.data.disks[self.disk_path]
-            temperature = disk_info.get("temperature")
-            
+            value = disk_info.get(self.entity_description.data_key)
+            if self.entity_description.key != "disk_temperature":
+                return value
+
             # 如果温度为None或"未知"，对于数值类型传感器返回None而不是字符串
-            if temperature is None or temperature == "未知":
+            if value is None or value == "未知":
                 _LOGGER.debug(f"Disk {self.disk_path} temperature is unknown, returning None instead of string")
                 return None
             
             # 尝试将温度转换为数值
             try:
-                return float(temperature)
+                return float(value)
             except (ValueError, TypeError):
-                _LOGGER.warning(f"Invalid temperature value for disk {self.disk_path}: {temperature}")
+                _LOGGER.warning(f"Invalid temperature value for disk {self.disk_path}: {value}")
                 return None
         else:
             # 处理其他节点信息
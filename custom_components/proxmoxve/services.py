@@ -0,0 +1,215 @@
+"""Services of the Proxmox VE integration."""
+from __future__ import annotations
+
+import asyncio
+from functools import partial
+import logging
+
+import voluptuous as vol
+from homeassistant.core import HomeAssistant, ServiceCall, SupportsResponse
+from homeassistant.exceptions import ServiceValidationError
+import homeassistant.helpers.config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from .bulk import select_guests
+from .const import DOMAIN, DEFAULT_BULK_CONCURRENCY
+from .fixtures import save_bundle
+from .profiling import ProfilerBusyError, write_profile
+from .pve import PowerAction
+
+_LOGGER = logging.getLogger(__name__)
+
+SERVICE_BULK_POWER = "bulk_power"
+SERVICE_RECORD_FIXTURE = "record_fixture"
+SERVICE_PROFILE = "profile"
+EVENT_BULK_POWER_PROGRESS = f"{DOMAIN}_bulk_power_progress"
+
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_ACTION = "action"
+ATTR_GUESTS = "guests"
+ATTR_TAGS = "tags"
+ATTR_POOLS = "pools"
+ATTR_CONCURRENCY = "concurrency"
+ATTR_POLLS = "polls"
+ATTR_CYCLES = "cycles"
+ATTR_TOP = "top"
+
+BULK_POWER_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Required(ATTR_ACTION): vol.In([action.value for action in PowerAction]),
+        vol.Optional(ATTR_GUESTS, default=[]): vol.All(cv.ensure_list_csv, [cv.string]),
+        vol.Optional(ATTR_TAGS, default=[]): vol.All(cv.ensure_list_csv, [cv.string]),
+        vol.Optional(ATTR_POOLS, default=[]): vol.All(cv.ensure_list_csv, [cv.string]),
+        vol.Optional(ATTR_CONCURRENCY, default=DEFAULT_BULK_CONCURRENCY): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=32)
+        ),
+    }
+)
+
+RECORD_FIXTURE_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_POLLS, default=3): vol.All(vol.Coerce(int), vol.Range(min=1, max=20)),
+    }
+)
+
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_CYCLES, default=5): vol.All(vol.Coerce(int), vol.Range(min=1, max=50)),
+        vol.Optional(ATTR_TOP, default=25): vol.All(vol.Coerce(int), vol.Range(min=1, max=200)),
+    }
+)
+
+# 已经处于目标状态的虚拟机直接跳过
+DONE_STATUS = {
+    PowerAction.ON: "running",
+    PowerAction.OFF: "stopped",
+    PowerAction.SHUTDOWN: "stopped",
+}
+
+
+def _get_coordinator(hass: HomeAssistant, entry_id: str):
+    coordinator = hass.data.get(DOMAIN, {}).get(entry_id)
+    if coordinator is None:
+        raise ServiceValidationError(f"Unknown config entry {entry_id}")
+    return coordinator
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+
+    async def _async_bulk_power(call: ServiceCall):
+        action = PowerAction(call.data[ATTR_ACTION])
+        if not (call.data[ATTR_GUESTS] or call.data[ATTR_TAGS] or call.data[ATTR_POOLS]):
+            raise ServiceValidationError("Select at least one guest, tag or pool")
+
+        coordinators = hass.data.get(DOMAIN, {})
+        if entry_id := call.data.get(ATTR_CONFIG_ENTRY_ID):
+            coordinators = {entry_id: _get_coordinator(hass, entry_id)}
+
+        targets = []
+        skipped = []
+        for entry_id, coordinator in coordinators.items():
+            if coordinator.data is None:
+                continue
+            guests = []
+            for kind, vmid, record in select_guests(
+                coordinator.data,
+                call.data[ATTR_GUESTS],
+                call.data[ATTR_TAGS],
+                call.data[ATTR_POOLS],
+            ):
+                if record.get("status") == DONE_STATUS.get(action):
+                    skipped.append({ATTR_CONFIG_ENTRY_ID: entry_id, "vmid": vmid})
+                else:
+                    guests.append((kind, vmid, record))
+            if guests:
+                targets.append((entry_id, coordinator, guests))
+
+        total = sum(len(guests) for *_, guests in targets)
+        progress = {"done": 0, "failed": 0}
+        _LOGGER.info(f"Bulk {action} on {total} guests, {len(skipped)} already done")
+
+        def _report(entry_id, vmid, error):
+            progress["done"] += 1
+            if error:
+                progress["failed"] += 1
+            hass.bus.async_fire(
+                EVENT_BULK_POWER_PROGRESS,
+                {
+                    ATTR_ACTION: str(action),
+                    ATTR_CONFIG_ENTRY_ID: entry_id,
+                    "vmid": vmid,
+                    "error": error,
+                    "done": progress["done"],
+                    "failed": progress["failed"],
+                    "total": total,
+                },
+            )
+
+        # 不同集群可能有相同的 vmid，结果按 (条目, vmid) 区分
+        results = {}
+        for (entry_id, *_), result in zip(
+            targets,
+            await asyncio.gather(
+                *(
+                    coordinator.async_bulk_power(
+                        action,
+                        guests,
+                        call.data[ATTR_CONCURRENCY],
+                        partial(_report, entry_id),
+                    )
+                    for entry_id, coordinator, guests in targets
+                )
+            ),
+        ):
+            results.update({(entry_id, vmid): error for vmid, error in result.items()})
+
+        return {
+            ATTR_ACTION: str(action),
+            "total": total,
+            "succeeded": [
+                {ATTR_CONFIG_ENTRY_ID: entry_id, "vmid": vmid}
+                for (entry_id, vmid), error in results.items()
+                if not error
+            ],
+            "failed": [
+                {ATTR_CONFIG_ENTRY_ID: entry_id, "vmid": vmid, "error": error}
+                for (entry_id, vmid), error in results.items()
+                if error
+            ],
+            "skipped": skipped,
+        }
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_BULK_POWER,
+        _async_bulk_power,
+        schema=BULK_POWER_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    async def _async_record_fixture(call: ServiceCall):
+        coordinator = _get_coordinator(hass, call.data[ATTR_CONFIG_ENTRY_ID])
+        bundle = await coordinator.async_record_fixture(call.data[ATTR_POLLS])
+        # 写入配置目录，用户可以直接下载后提交
+        path = hass.config.path(
+            f"{DOMAIN}_fixture_{dt_util.now().strftime('%Y%m%d-%H%M%S')}.json"
+        )
+        await hass.async_add_executor_job(save_bundle, path, bundle)
+        _LOGGER.info(f"Fixture bundle written to {path}")
+        return {"path": path}
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_RECORD_FIXTURE,
+        _async_record_fixture,
+        schema=RECORD_FIXTURE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    async def _async_profile(call: ServiceCall):
+        coordinator = _get_coordinator(hass, call.data[ATTR_CONFIG_ENTRY_ID])
+        if coordinator.profiling:
+            raise ServiceValidationError("A profile of this entry is already running")
+        try:
+            profile, summary = await coordinator.async_profile(
+                call.data[ATTR_CYCLES], call.data[ATTR_TOP]
+            )
+        except ProfilerBusyError as error:
+            raise ServiceValidationError(f"Profiler busy: {error}") from error
+        base = hass.config.path(f"{DOMAIN}_profile_{dt_util.now().strftime('%Y%m%d-%H%M%S')}")
+        await hass.async_add_executor_job(
+            write_profile, profile, summary, f"{base}.prof", f"{base}.txt"
+        )
+        _LOGGER.info(f"Profile written to {base}.prof and {base}.txt")
+        return {"profile": f"{base}.prof", "summary": f"{base}.txt"}
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PROFILE,
+        _async_profile,
+        schema=PROFILE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
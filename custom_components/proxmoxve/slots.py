@@ -0,0 +1,69 @@
+"""Bounded request slots with a priority lane and wait-time accounting."""
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+import heapq
+import itertools
+import time
+
+PRIORITY_ACTION = 0
+PRIORITY_POLL = 1
+
+WAIT_SAMPLES = 100
+
+
+class PrioritySlots:
+    """A semaphore that hands free slots to the highest priority waiter first.
+
+    Waiters of the same priority are served in arrival order. The wait of
+    the last WAIT_SAMPLES acquisitions is kept for diagnostics.
+    """
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self._free = limit
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self.waits: deque[float] = deque(maxlen=WAIT_SAMPLES)
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for *_, future in self._waiters if not future.done())
+
+    @property
+    def in_use(self) -> int:
+        return self.limit - self._free
+
+    async def acquire(self, priority: int = PRIORITY_POLL) -> None:
+        start = time.monotonic()
+        if self._free and not self.queued:
+            self._free -= 1
+        else:
+            future = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._waiters, (priority, next(self._seq), future))
+            try:
+                await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    # 已经分配到位置后才被取消，交给下一个等待者
+                    self.release()
+                raise
+        self.waits.append(time.monotonic() - start)
+
+    def release(self) -> None:
+        while self._waiters:
+            *_, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self._free += 1
+
+    @asynccontextmanager
+    async def slot(self, priority: int = PRIORITY_POLL):
+        await self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release()
@@ -0,0 +1,131 @@
+"""Pooled asyncio SSH transport for PVE hosts."""
+from __future__ import annotations
+
+import asyncio
+import logging
+
+import asyncssh
+
+from .breaker import CircuitBreaker
+
+_LOGGER = logging.getLogger(__name__)
+
+KEEPALIVE_INTERVAL = 15
+KEEPALIVE_COUNT_MAX = 3
+CONNECT_TIMEOUT = 5
+COMMAND_TIMEOUT = 30
+
+
+class PVESSHError(Exception):
+    """SSH command could not be run on a PVE host."""
+
+
+class _PooledClient(asyncssh.SSHClient):
+    """Marks a pooled connection dead as soon as the transport drops."""
+
+    def __init__(self) -> None:
+        self.closed = False
+
+    def connection_lost(self, exc: Exception | None) -> None:
+        self.closed = True
+
+
+class PVESSHPool:
+    """Keeps one SSH connection per host and runs commands as channels on it.
+
+    Liveness is checked with SSH keepalives; a dropped connection is
+    replaced the next time a command is run on that host. Hosts that
+    cannot be connected to are left alone until their backoff expires.
+    """
+
+    def __init__(self, username: str, password: str, port: int = 22) -> None:
+        self._username = username
+        self._password = password
+        self._port = port
+        self._conns: dict[str, tuple[asyncssh.SSHClientConnection, _PooledClient]] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._breakers: dict[str, CircuitBreaker] = {}
+
+    def available(self, host: str) -> bool:
+        """False while connecting to the host keeps failing."""
+        breaker = self._breakers.get(host)
+        return breaker is None or breaker.available
+
+    async def _async_connect(self, host: str) -> asyncssh.SSHClientConnection:
+        async with self._locks.setdefault(host, asyncio.Lock()):
+            if (pooled := self._conns.get(host)) and not pooled[1].closed:
+                return pooled[0]
+            breaker = self._breakers.setdefault(host, CircuitBreaker(f"SSH {host}"))
+            if not breaker.allow():
+                raise PVESSHError(f"{host}: unreachable, retrying in {breaker.retry_in:.0f}s")
+            try:
+                conn, client = await asyncio.wait_for(
+                    asyncssh.create_connection(
+                        _PooledClient,
+                        host,
+                        port=self._port,
+                        username=self._username,
+                        password=self._password,
+                        known_hosts=None,
+                        keepalive_interval=KEEPALIVE_INTERVAL,
+                        keepalive_count_max=KEEPALIVE_COUNT_MAX,
+                    ),
+                    CONNECT_TIMEOUT,
+                )
+            except asyncio.TimeoutError as err:
+                breaker.failure()
+                # 与命令执行超时区分开，后者说明主机可达
+                raise PVESSHError(
+                    f"{host}: connection timed out after {CONNECT_TIMEOUT}s"
+                ) from err
+            except (OSError, asyncssh.Error):
+                breaker.failure()
+                raise
+            breaker.success()
+            self._conns[host] = (conn, client)
+            _LOGGER.debug(f"SSH connection to {host} established")
+            return conn
+
+    def _drop(self, host: str) -> None:
+        if pooled := self._conns.pop(host, None):
+            pooled[0].close()
+
+    async def async_run(self, host: str, command: str, timeout: float = COMMAND_TIMEOUT) -> str:
+        """Run a command on the host and return its stdout.
+
+        A command that fails because the pooled connection went away is
+        retried once on a fresh connection.
+        """
+        for attempt in range(2):
+            try:
+                conn = await self._async_connect(host)
+                result = await conn.run(command, check=False, timeout=timeout)
+            except (asyncssh.ChannelOpenError, asyncssh.ConnectionLost, BrokenPipeError) as err:
+                self._drop(host)
+                if attempt:
+                    raise PVESSHError(f"{host}: {err}") from err
+                _LOGGER.debug(f"SSH connection to {host} lost, reconnecting")
+                continue
+            except asyncio.TimeoutError as err:
+                raise PVESSHError(f"{host}: {command!r} timed out after {timeout}s") from err
+            except (OSError, asyncssh.Error) as err:
+                self._drop(host)
+                raise PVESSHError(f"{host}: {err}") from err
+            if result.stderr:
+                _LOGGER.debug(f"{command!r} on {host} wrote to stderr: {result.stderr.strip()}")
+            return result.stdout or ""
+
+    async def async_open_process(self, host: str, command: str) -> asyncssh.SSHClientProcess:
+        """Start a long-running command on the host's pooled connection."""
+        try:
+            conn = await self._async_connect(host)
+            return await conn.create_process(command)
+        except (OSError, asyncssh.Error) as err:
+            self._drop(host)
+            raise PVESSHError(f"{host}: {err}") from err
+
+    async def async_close(self) -> None:
+        for host in list(self._conns):
+            conn = self._conns.pop(host)[0]
+            conn.close()
+            await conn.wait_closed()
@@ -0,0 +1,175 @@
+"""Streaming host telemetry over a long-lived SSH channel."""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import shlex
+import time
+
+import asyncssh
+
+from .ssh import PVESSHPool, PVESSHError
+
+_LOGGER = logging.getLogger(__name__)
+
+RECONNECT_DELAY = 10
+
+# 在宿主机上常驻运行的采集循环，直接读取 sysfs 和 /proc，不再为每次采样 fork 进程。
+# 每行输出一条 JSON 记录，sensors 字段的结构与 `sensors -j` 相同。
+COLLECTOR_SCRIPT = r'''
+import glob, json, os, re, sys, time
+
+interval = float(sys.argv[1])
+
+
+def read(path):
+    with open(path) as f:
+        return f.read().strip()
+
+
+def chip_name(name, d):
+    # 与 libsensors 的芯片命名一致，例如 coretemp-isa-0000、nvme-pci-0100、acpitz-acpi-0
+    device = d + "/device"
+    if not os.path.exists(device):
+        return "%s-virtual-0" % name
+    dev_name = os.path.basename(os.path.realpath(device))
+    subsys = os.path.basename(os.path.realpath(device + "/subsystem"))
+    m = re.match(r"^(\d+)-([0-9a-f]{4})$", dev_name)
+    if subsys == "i2c" and m:
+        return "%s-i2c-%d-%02x" % (name, int(m.group(1)), int(m.group(2), 16))
+    m = re.match(r"^([0-9a-f]+):([0-9a-f]+):([0-9a-f]+)\.([0-9a-f]+)$", dev_name)
+    if subsys == "pci" and m:
+        domain, bus, slot, fn = (int(x, 16) for x in m.groups())
+        return "%s-pci-%04x" % (name, (domain << 16) + (bus << 8) + (slot << 3) + fn)
+    if subsys in ("platform", "of_platform"):
+        m = re.match(r"^[a-z0-9_]+\.(\d+)$", dev_name)
+        return "%s-isa-%04x" % (name, int(m.group(1)) if m else 0)
+    m = re.match(r"^[^:]+:(\d+)$", dev_name)
+    if subsys == "acpi" and m:
+        return "%s-acpi-%x" % (name, int(m.group(1)))
+    m = re.match(r"^(\d+):\d+:\d+:([0-9a-f]+)$", dev_name)
+    if subsys == "scsi" and m:
+        return "%s-scsi-%d-%x" % (name, int(m.group(1)), int(m.group(2), 16))
+    return "%s-%s" % (name, dev_name)
+
+
+def hwmon():
+    chips, disks = {}, {}
+    for d in sorted(glob.glob("/sys/class/hwmon/hwmon*")):
+        try:
+            name = read(d + "/name")
+        except OSError:
+            continue
+        if name == "drivetemp":
+            # 读取 drivetemp 会向磁盘发送命令，休眠的磁盘会被唤醒；SATA 磁盘温度留给 SMART 周期
+            continue
+        chip = {}
+        for f in sorted(glob.glob(d + "/temp*_input")):
+            base = f[:-len("_input")]
+            feature = os.path.basename(base)
+            try:
+                value = int(read(f)) / 1000.0
+            except (OSError, ValueError):
+                continue
+            try:
+                label = read(base + "_label")
+            except OSError:
+                label = feature
+            chip[label] = {feature + "_input": value}
+        if not chip:
+            continue
+        # hwmon 编号在重启后可能变化，芯片名由总线地址决定
+        chips[chip_name(name, d)] = chip
+        if name == "nvme":
+            blocks = glob.glob(d + "/device/block/*") or glob.glob(d + "/device/nvme*n[0-9]*")
+            first = next(iter(chip.values()))
+            for block in blocks:
+                disks["/dev/" + os.path.basename(block)] = next(iter(first.values()))
+    return chips, disks
+
+
+def cpu():
+    with open("/proc/stat") as f:
+        return [int(x) for x in f.readline().split()[1:]]
+
+
+prev = cpu()
+while True:
+    time.sleep(interval)
+    cur = cpu()
+    delta = [c - p for c, p in zip(cur, prev)]
+    prev = cur
+    total = sum(delta) or 1
+    chips, disks = hwmon()
+    record = {
+        "ts": time.time(),
+        "sensors": chips,
+        "disks": disks,
+        "cpu": {"iowait": 100.0 * delta[4] / total},
+    }
+    sys.stdout.write(json.dumps(record) + "\n")
+    sys.stdout.flush()
+'''
+
+
+def collector_command(interval: float) -> str:
+    return f"python3 -u -c {shlex.quote(COLLECTOR_SCRIPT)} {interval}"
+
+
+class PVETelemetryStream:
+    """Consumes the NDJSON records of one host's collector loop.
+
+    The latest record is kept as it arrives and `on_record()` is called,
+    so the consumer can publish it right away. The channel is reopened if
+    it ends or fails.
+    """
+
+    def __init__(self, ssh: PVESSHPool, host: str, interval: float, on_record=None) -> None:
+        self._ssh = ssh
+        self._host = host
+        self._interval = interval
+        self._on_record = on_record
+        self._task: asyncio.Task | None = None
+        self.latest: dict | None = None
+        self.latest_time: float | None = None
+
+    @property
+    def fresh(self) -> bool:
+        """True if a record arrived within the last few intervals."""
+        return (
+            self.latest_time is not None
+            and time.monotonic() - self.latest_time < max(self._interval * 3, 5)
+        )
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._async_consume())
+
+    async def async_stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _async_consume(self) -> None:
+        command = collector_command(self._interval)
+        while True:
+            try:
+                process = await self._ssh.async_open_process(self._host, command)
+                async with process:
+                    async for line in process.stdout:
+                        try:
+                            self.latest = json.loads(line)
+                        except ValueError:
+                            continue
+                        self.latest_time = time.monotonic()
+                        if self._on_record is not None:
+                            self._on_record()
+                _LOGGER.debug(f"Telemetry stream from {self._host} ended")
+            except (PVESSHError, OSError, asyncssh.Error) as e:
+                _LOGGER.warning(f"Telemetry stream from {self._host} failed: {e}")
+            await asyncio.sleep(RECONNECT_DELAY)
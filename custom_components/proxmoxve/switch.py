@@ -7,12 +7,12 @@ from typing import Any
 from homeassistant.const import EntityCategory
 from homeassistant.components.switch import SwitchDeviceClass, SwitchEntity, SwitchEntityDescription
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from .const import DOMAIN
 from .pve import PVEDataUpdateCoordinator, PowerAction
-from .entity import  PVEVMEntity
+from .entity import PVEVMPowerEntity
 
 VM_SWITCHS: tuple[SwitchEntityDescription, ...] = (
     SwitchEntityDescription(
@@ -32,45 +32,41 @@ async def async_setup_entry(
     
     coordinator: PVEDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
 
-    cache_qemus = set()
-    cache_lxcs = set() 
-
-    def _on_update():
-
+    @callback
+    def _on_membership(added, removed):
         dev: list[SwitchEntity] = []
- 
-        for id, qemu in coordinator.data.qemus.items():
-            if id is None or id in cache_qemus:
-                continue
-            cache_qemus.add(id)
-            for description in VM_SWITCHS:
-                dev.append(PVEQemuSwitch(
-                    hass,
-                    description=description,
-                    entry=entry,
-                    coordinator=coordinator,
-                    data=qemu
-                ))
-        
-        for id, lxc in coordinator.data.lxcs.items():
-            if id is None or id in cache_lxcs:
-                continue
-            cache_lxcs.add(id)
-            for description in VM_SWITCHS:
-                dev.append(PVELXCSwitch(
-                    hass,
-                    description=description,
-                    entry=entry,
-                    coordinator=coordinator,
-                    data=lxc
-                ))
-            
+        data = coordinator.data
+        for kind, id in added:
+            if kind == "qemu":
+                for description in VM_SWITCHS:
+                    dev.append(PVEQemuSwitch(
+                        hass,
+                        description=description,
+                        entry=entry,
+                        coordinator=coordinator,
+                        data=data.qemus[id]
+                    ))
+            elif kind == "lxc":
+                for description in VM_SWITCHS:
+                    dev.append(PVELXCSwitch(
+                        hass,
+                        description=description,
+                        entry=entry,
+                        coordinator=coordinator,
+                        data=data.lxcs[id]
+                    ))
+
         if dev:
             async_add_entities(dev)
 
-    coordinator.async_add_listener(_on_update)
+    entry.async_on_unload(coordinator.async_add_membership_listener(_on_membership))
+
+class PVEQemuSwitch(PVEVMPowerEntity, SwitchEntity):
 
-class PVEQemuSwitch(PVEVMEntity, SwitchEntity):
+    _vm_kind = "qemu"
+
+    def _change_fields(self):
+        return ("status", *super()._change_fields())
 
     def __init__(
         self,
@@ -104,7 +100,12 @@ class PVEQemuSwitch(PVEVMEntity, SwitchEntity):
             return None
         return status == "running"
 
-class PVELXCSwitch(PVEVMEntity, SwitchEntity):
+class PVELXCSwitch(PVEVMPowerEntity, SwitchEntity):
+
+    _vm_kind = "lxc"
+
+    def _change_fields(self):
+        return ("status", *super()._change_fields())
 
     def __init__(
         self,
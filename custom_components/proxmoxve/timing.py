@@ -0,0 +1,56 @@
+"""Rolling timing statistics of the poll phases."""
+from __future__ import annotations
+
+from collections import deque
+from contextlib import contextmanager
+import math
+import time
+
+# poll: 整个轮询周期; api_fetch: cluster/resources; sensors/smart: 每个节点的SSH采集;
+# parse: 生成快照; dispatch: 通知实体
+POLL_PHASES = ("poll", "api_fetch", "sensors", "smart", "parse", "dispatch")
+
+TIMING_SAMPLES = 200
+
+
+def _percentile(ordered, fraction):
+    # 最近秩法，样本少时也总是返回真实的样本值
+    # 第 ceil(p*n) 个样本；p*n 为整数时 round(p*n + 0.5) 会按银行家舍入多取一位
+    index = max(0, min(len(ordered) - 1, math.ceil(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+class PhaseTimer:
+    """Keeps the last TIMING_SAMPLES durations of every phase."""
+
+    def __init__(self, samples: int = TIMING_SAMPLES) -> None:
+        self._maxlen = samples
+        self._samples: dict[str, deque[float]] = {}
+
+    def record(self, phase: str, seconds: float) -> None:
+        self._samples.setdefault(phase, deque(maxlen=self._maxlen)).append(seconds)
+
+    @contextmanager
+    def measure(self, phase: str):
+        """Time the block, also when it awaits or raises."""
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.record(phase, time.monotonic() - start)
+
+    def summary(self) -> dict[str, dict]:
+        """{phase: {count, last, p50, p95, max}} with durations in milliseconds."""
+        summary = {}
+        for phase, samples in self._samples.items():
+            if not samples:
+                continue
+            ordered = sorted(samples)
+            summary[phase] = {
+                "count": len(samples),
+                "last": round(samples[-1] * 1000, 1),
+                "p50": round(_percentile(ordered, 0.50) * 1000, 1),
+                "p95": round(_percentile(ordered, 0.95) * 1000, 1),
+                "max": round(ordered[-1] * 1000, 1),
+            }
+        return summary
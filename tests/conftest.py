@@ -0,0 +1,241 @@
+"""Stand-ins for the API client and the SSH pool, and a bare Home Assistant."""
+from __future__ import annotations
+
+import asyncio
+from contextlib import asynccontextmanager
+import json
+
+from homeassistant import config_entries, loader
+from homeassistant.config_entries import ConfigEntries, ConfigEntry
+from homeassistant.const import CONF_HOST, CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import area_registry as ar
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers import entity_registry as er
+import pytest
+
+from custom_components.proxmoxve.api import PVEApiError
+from custom_components.proxmoxve.const import DOMAIN
+from custom_components.proxmoxve.pve import PVEDataUpdateCoordinator
+from custom_components.proxmoxve.ssh import PVESSHError
+
+HOST = "192.0.2.1"
+
+
+def make_resources(tick: int = 1) -> list[dict]:
+    return [
+        {
+            "id": "node/pve",
+            "type": "node",
+            "node": "pve",
+            "status": "online",
+            "cpu": 0.25,
+            "maxcpu": 8,
+            "mem": 8 * 1024**3,
+            "maxmem": 32 * 1024**3,
+            "disk": 10 * 1024**3,
+            "maxdisk": 100 * 1024**3,
+            "uptime": 1000 + tick,
+        },
+        {
+            "id": "qemu/100",
+            "type": "qemu",
+            "vmid": 100,
+            "name": "web",
+            "node": "pve",
+            "status": "running",
+            "cpu": 0.5,
+            "maxcpu": 2,
+            "mem": 1024**3,
+            "maxmem": 4 * 1024**3,
+            "netin": 1000 * tick,
+            "netout": 500 * tick,
+            "diskread": 0,
+            "diskwrite": 0,
+        },
+        {
+            "id": "lxc/200",
+            "type": "lxc",
+            "vmid": 200,
+            "name": "dns",
+            "node": "pve",
+            "status": "stopped",
+            "cpu": 0,
+            "maxcpu": 1,
+            "mem": 0,
+            "maxmem": 512 * 1024**2,
+        },
+        {
+            "id": "storage/pve/local",
+            "type": "storage",
+            "storage": "local",
+            "node": "pve",
+            "status": "available",
+            "shared": 0,
+            "disk": 20,
+            "maxdisk": 100,
+        },
+    ]
+
+
+SENSORS = {
+    "coretemp-isa-0000": {
+        "Adapter": "ISA adapter",
+        "Package id 0": {"temp1_input": 51.0},
+        "Core 0": {"temp2_input": 49.0},
+    },
+    "nvme-pci-0100": {"Adapter": "PCI adapter", "Composite": {"temp1_input": 38.9}},
+}
+
+LSBLK = {
+    "blockdevices": [
+        {
+            "name": "sda",
+            "path": "/dev/sda",
+            "model": "HDD",
+            "serial": "S1",
+            "wwn": "0x5000c500a",
+            "type": "disk",
+            "rota": True,
+        }
+    ]
+}
+
+
+def smart_output(paths, smart=None):
+    smart = smart or {
+        "smartctl": {"exit_status": 0},
+        "model_name": "HDD",
+        "serial_number": "S1",
+        "smart_status": {"passed": True},
+        "temperature": {"current": 35},
+        "power_on_time": {"hours": 1234},
+    }
+    return "".join(f"\n@@SMART@@ {path}\n{json.dumps(smart)}" for path in paths)
+
+
+class FakeApi:
+    """Answers GET requests from a dict of path -> data or callable."""
+
+    def __init__(self, responses: dict | None = None) -> None:
+        self.tick = 0
+        self.responses = {
+            "cluster/resources": lambda: make_resources(self.tick),
+            "cluster/status": [{"type": "node", "name": "pve", "local": 1, "ip": HOST}],
+            **(responses or {}),
+        }
+        self.calls = []
+
+    async def async_get(self, path, *, priority=None, **params):
+        self.calls.append(path)
+        if path == "cluster/resources":
+            self.tick += 1
+        response = self.responses.get(path)
+        if response is None:
+            raise PVEApiError(f"GET {path}: 501")
+        if isinstance(response, Exception):
+            raise response
+        return response() if callable(response) else response
+
+
+class FakeProcess:
+    """An SSH process whose stdout yields the given lines once `ready` is set."""
+
+    def __init__(self, lines, ready: asyncio.Event) -> None:
+        self.stdout = self._lines(lines, ready)
+
+    async def _lines(self, lines, ready):
+        await ready.wait()
+        for line in lines:
+            yield line
+        await asyncio.Event().wait()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeSSH:
+    """Answers commands from a dict of command prefix -> output or exception."""
+
+    def __init__(self, outputs: dict | None = None, stream_lines=()) -> None:
+        self.outputs = {
+            "sensors -j": json.dumps(SENSORS),
+            "lsblk -J": json.dumps(LSBLK),
+            **(outputs or {}),
+        }
+        self.stream_lines = list(stream_lines)
+        self.stream_ready = asyncio.Event()
+        self.commands = []
+        self.opened = []
+        self.closed = False
+
+    def available(self, host):
+        return True
+
+    async def async_run(self, host, command, **kwargs):
+        self.commands.append(command)
+        if "smartctl" in command and not any(key in command for key in self.outputs):
+            return smart_output(["/dev/sda"])
+        for prefix, output in self.outputs.items():
+            if command.startswith(prefix) or prefix in command:
+                if isinstance(output, Exception):
+                    raise output
+                return output
+        raise PVESSHError(f"{host}: unexpected command {command!r}")
+
+    async def async_open_process(self, host, command):
+        self.opened.append((host, command))
+        return FakeProcess(self.stream_lines, self.stream_ready)
+
+    async def async_close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def api():
+    return FakeApi()
+
+
+@pytest.fixture
+def ssh():
+    return FakeSSH()
+
+
+@asynccontextmanager
+async def async_test_hass(config_dir: str):
+    """A started Home Assistant with registries and config entries, nothing else."""
+    hass = HomeAssistant(config_dir)
+    hass.config.skip_pip = True
+    loader.async_setup(hass)
+    await ar.async_load(hass)
+    await dr.async_load(hass)
+    await er.async_load(hass)
+    hass.config_entries = ConfigEntries(hass, {})
+    await hass.config_entries.async_initialize()
+    await hass.async_start()
+    try:
+        yield hass
+    finally:
+        await hass.async_stop(force=True)
+
+
+def make_coordinator(hass, api, ssh, **config) -> PVEDataUpdateCoordinator:
+    """A coordinator of a config entry that is not set up, polling the stand-ins."""
+    config = {CONF_HOST: HOST, CONF_USERNAME: "root@pam", CONF_PASSWORD: "secret", **config}
+    entry = ConfigEntry(
+        version=1,
+        minor_version=1,
+        domain=DOMAIN,
+        title=HOST,
+        data=config,
+        source=config_entries.SOURCE_USER,
+    )
+    config_entries.current_entry.set(entry)
+    coordinator = PVEDataUpdateCoordinator(hass, config)
+    collector = coordinator._collector
+    collector.api, collector.ssh = api, ssh
+    coordinator._api = api
+    return coordinator
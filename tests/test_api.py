@@ -0,0 +1,76 @@
+"""Tests for the API client's circuit breaker handling."""
+from __future__ import annotations
+
+import asyncio
+
+import aiohttp
+import pytest
+
+from custom_components.proxmoxve.api import PVEApiClient, PVEApiError
+from custom_components.proxmoxve.breaker import CircuitBreaker
+
+from .conftest import HOST
+
+
+def make_client(send):
+    client = PVEApiClient(session=None, host=HOST, token_secret="secret", username="root@pam!t")
+    # 不等待退避时间，失败后下一次调用就是半开状态的探测
+    client._breaker = CircuitBreaker(HOST, base=0, maximum=0)
+
+    async def _async_send(method, path, params, data, priority):
+        return send()
+
+    client._async_send = _async_send
+    return client
+
+
+def test_unparsable_response_resolves_a_probe():
+    responses = [
+        aiohttp.ClientConnectionError("connection refused"),
+        aiohttp.ContentTypeError(None, (), message="text/html"),
+        ValueError("Expecting value"),
+        [{"type": "node"}],
+    ]
+
+    def send():
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    async def run():
+        client = make_client(send)
+        errors = []
+        for _ in range(3):
+            with pytest.raises(PVEApiError) as info:
+                await client.async_get("cluster/resources")
+            errors.append(info.value)
+        return client, errors, await client.async_get("cluster/resources")
+
+    client, errors, data = asyncio.run(run())
+    # 每次都是真正的请求，没有被 PVEUnavailableError 挡住
+    assert "ContentTypeError" in str(errors[1])
+    assert isinstance(errors[2].__cause__, ValueError)
+    assert data == [{"type": "node"}]
+    assert client.available
+
+
+def test_cancelled_probe_allows_a_new_one():
+    async def run():
+        started = asyncio.Event()
+
+        async def hang(method, path, params, data, priority):
+            started.set()
+            await asyncio.Event().wait()
+
+        client = make_client(lambda: None)
+        client._breaker.failure()
+        client._async_send = hang
+        task = asyncio.ensure_future(client.async_get("cluster/resources"))
+        await started.wait()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return client._breaker.allow()
+
+    assert asyncio.run(run())
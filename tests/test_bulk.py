@@ -0,0 +1,26 @@
+"""Tests for guest selection and startup ordering."""
+from __future__ import annotations
+
+from custom_components.proxmoxve.bulk import order_groups, parse_startup
+
+
+def guest(vmid, startup):
+    return ("qemu", vmid, {}, parse_startup(startup))
+
+
+def test_parse_startup():
+    assert parse_startup("order=2,up=30,down=60") == {"order": 2, "up": 30, "down": 60}
+    assert parse_startup("3") == {"order": 3}
+    assert parse_startup(None) == {}
+
+
+def test_order_groups_starts_in_order_and_unordered_last():
+    guests = [guest(100, None), guest(101, "order=2"), guest(102, "order=1"), guest(103, "2")]
+    groups = order_groups(guests)
+    assert [[vmid for _, vmid, *_ in group] for group in groups] == [[102], [101, 103], [100]]
+
+
+def test_order_groups_reverse_stops_unordered_first():
+    guests = [guest(100, None), guest(101, "order=2"), guest(102, "order=1")]
+    groups = order_groups(guests, reverse=True)
+    assert [[vmid for _, vmid, *_ in group] for group in groups] == [[100], [101], [102]]
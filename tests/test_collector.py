@@ -0,0 +1,218 @@
+"""Collector cycles against stand-in transports."""
+from __future__ import annotations
+
+import asyncio
+import json
+
+from custom_components.proxmoxve.collector import TIER_RETRY_DELAY, PVECollector
+from custom_components.proxmoxve.const import (
+    DEFAULT_SENSORS_INTERVAL,
+    DEFAULT_SMART_INTERVAL,
+    DEFAULT_SMART_TTL,
+)
+from custom_components.proxmoxve.ssh import PVESSHError
+
+from .conftest import HOST, SENSORS, FakeApi, FakeSSH, smart_output
+
+
+def make_collector(api, ssh, **kwargs) -> PVECollector:
+    kwargs.setdefault("sensors_interval", 0)
+    kwargs.setdefault("smart_interval", 0)
+    kwargs.setdefault("smart_ttl", 0)
+    return PVECollector(api, ssh, HOST, **kwargs)
+
+
+def test_collect_builds_snapshot(api, ssh):
+    async def run():
+        collector = make_collector(api, ssh)
+        try:
+            return await collector.async_collect()
+        finally:
+            await collector.async_close()
+
+    data = asyncio.run(run())
+    assert set(data.nodes) == {"pve"}
+    assert set(data.qemus) == {100}
+    assert set(data.lxcs) == {200}
+    assert set(data.storages) == {"pve/local"}
+    assert data.nodes["pve"]["cpu_usage"] == 25.0
+    assert data.disks["pve"]["/dev/sda"]["temperature"] == 35
+    assert data.readings["pve"]["coretemp_isa_0000_package_id_0"] == 51.0
+
+
+def test_streaming_cycle_merges_stream_records():
+    record = {
+        "ts": 0,
+        "sensors": {
+            "coretemp-isa-0000": {"Package id 0": {"temp1_input": 62.0}},
+        },
+        "disks": {"/dev/sda": 41.0},
+        "cpu": {"iowait": 1.5},
+    }
+    api = FakeApi()
+    ssh = FakeSSH(stream_lines=[json.dumps(record) + "\n"])
+
+    async def run():
+        collector = make_collector(api, ssh, streaming=True, stream_interval=1.0)
+        try:
+            await collector.async_collect()
+            ssh.stream_ready.set()
+            # 让数据流任务读取第一条记录
+            for _ in range(5):
+                await asyncio.sleep(0)
+            return await collector.async_collect()
+        finally:
+            await collector.async_close()
+
+    data = asyncio.run(run())
+    assert ssh.opened and ssh.opened[0][0] == HOST
+    assert data.readings["pve"]["coretemp_isa_0000_package_id_0"] == 62.0
+    # 数据流没有的芯片保留 sensors -j 的读数，映射不会重建
+    assert data.readings["pve"]["nvme_pci_0100_composite"] == 38.9
+    assert set(data.readings["pve"]) == {
+        "coretemp_isa_0000_package_id_0",
+        "coretemp_isa_0000_core_0",
+        "nvme_pci_0100_composite",
+    }
+    assert data.nodes["pve"]["cpu_iowait"] == 1.5
+    assert data.disks["pve"]["/dev/sda"]["temperature"] == 41.0
+    assert ssh.closed
+
+
+
+def test_stream_records_are_pushed_between_polls():
+    record = {
+        "ts": 0,
+        "sensors": {
+            "coretemp-isa-0000": {
+                "Package id 0": {"temp1_input": 70.0},
+                "Core 0": {"temp2_input": 49.0},
+            },
+        },
+        "disks": {},
+        "cpu": {"iowait": 2.0},
+    }
+    api = FakeApi()
+    ssh = FakeSSH(stream_lines=[json.dumps(record) + "\n"])
+    pushed = []
+
+    async def run():
+        collector = make_collector(
+            api,
+            ssh,
+            streaming=True,
+            stream_interval=1.0,
+            on_stream_record=lambda: pushed.append(True),
+        )
+        try:
+            data = await collector.async_collect()
+            ssh.stream_ready.set()
+            for _ in range(5):
+                await asyncio.sleep(0)
+            updated = collector.apply_streams(data)
+            return data, updated, collector.apply_streams(updated)
+        finally:
+            await collector.async_close()
+
+    data, updated, again = asyncio.run(run())
+    assert pushed == [True]
+    assert len(api.calls) == 2  # cluster/resources 和 cluster/status，推送不访问 API
+    assert updated.readings["pve"]["coretemp_isa_0000_package_id_0"] == 70.0
+    assert updated.nodes["pve"]["cpu_iowait"] == 2.0
+    assert updated.qemus is data.qemus
+    assert updated.changes[("reading", "pve")] == {"coretemp_isa_0000_package_id_0"}
+    assert "cpu_iowait" in updated.changes[("node", "pve")]
+    assert not updated.added and not updated.removed
+    # 原快照没有被修改
+    assert data.readings["pve"]["coretemp_isa_0000_package_id_0"] == 51.0
+    # 同一条记录不会重复推送
+    assert again is None
+
+
+def test_missing_reading_keeps_its_key(api):
+    sensors = {
+        "coretemp-isa-0000": {
+            "Package id 0": {"temp1_input": 51.0},
+            "Core 0": {"temp2_input": 49.0},
+        },
+    }
+    ssh = FakeSSH({"sensors -j": json.dumps(sensors)})
+
+    async def run():
+        collector = make_collector(api, ssh)
+        try:
+            first = await collector.async_collect()
+            # 同一芯片上的一个读数暂时读不到
+            del sensors["coretemp-isa-0000"]["Core 0"]["temp2_input"]
+            ssh.outputs["sensors -j"] = json.dumps(sensors)
+            return first, await collector.async_collect()
+        finally:
+            await collector.async_close()
+
+    first, second = asyncio.run(run())
+    assert set(first.readings["pve"]) == set(second.readings["pve"])
+    assert second.readings["pve"]["coretemp_isa_0000_core_0"] is None
+
+
+def test_failed_tier_is_retried_before_its_interval(api):
+    now = [0.0]
+    ssh = FakeSSH({"sensors -j": PVESSHError("connection refused")})
+
+    async def run():
+        collector = make_collector(
+            api, ssh, sensors_interval=300, smart_interval=3600, clock=lambda: now[0]
+        )
+        try:
+            await collector.async_collect()
+            ssh.outputs["sensors -j"] = json.dumps(SENSORS)
+            now[0] = TIER_RETRY_DELAY - 1
+            await collector.async_collect()
+            assert ssh.commands.count("sensors -j") == 1
+            now[0] = TIER_RETRY_DELAY
+            data = await collector.async_collect()
+            assert ssh.commands.count("sensors -j") == 2
+            # 成功之后按完整周期等待
+            now[0] = TIER_RETRY_DELAY + 299
+            await collector.async_collect()
+            assert ssh.commands.count("sensors -j") == 2
+            return data
+        finally:
+            await collector.async_close()
+
+    data = asyncio.run(run())
+    assert data.readings["pve"]["coretemp_isa_0000_package_id_0"] == 51.0
+    # SMART 层第一次就成功了，一个小时内不再探测
+    assert sum("smartctl" in command for command in ssh.commands) == 1
+
+
+def test_disk_temperature_refreshes_every_smart_cycle_by_default(api):
+    now = [0.0]
+    ssh = FakeSSH()
+
+    async def run():
+        collector = PVECollector(
+            api,
+            ssh,
+            HOST,
+            sensors_interval=DEFAULT_SENSORS_INTERVAL,
+            smart_interval=DEFAULT_SMART_INTERVAL,
+            smart_ttl=DEFAULT_SMART_TTL,
+            clock=lambda: now[0],
+        )
+        try:
+            first = await collector.async_collect()
+            ssh.outputs["smartctl"] = smart_output(
+                ["/dev/sda"], {"smartctl": {"exit_status": 0}, "temperature": {"current": 39}}
+            )
+            now[0] = DEFAULT_SMART_INTERVAL
+            return first, await collector.async_collect()
+        finally:
+            await collector.async_close()
+
+    first, second = asyncio.run(run())
+    assert first.disks["pve"]["/dev/sda"]["temperature"] == 35
+    assert second.disks["pve"]["/dev/sda"]["temperature"] == 39
+    assert second.disks["pve"]["/dev/sda"]["power_on_hours"] == 1234
+    smart = [command for command in ssh.commands if "smartctl" in command]
+    assert len(smart) == 2
+    assert " -a " in smart[0] and " -A " in smart[1] and " -a " not in smart[1]
@@ -0,0 +1,49 @@
+"""Tests for the coordinator's membership bookkeeping."""
+from __future__ import annotations
+
+import asyncio
+
+from homeassistant.config_entries import ConfigEntryDisabler
+from homeassistant.helpers import device_registry as dr
+
+from custom_components.proxmoxve.const import DOMAIN
+
+from .conftest import FakeApi, FakeSSH, async_test_hass, make_coordinator, make_resources
+
+
+def test_missing_guest_keeps_its_device_for_one_poll(tmp_path):
+    present = [True, False, True, False, False]
+
+    def resources():
+        listed = present.pop(0)
+        return [r for r in make_resources() if listed or r["id"] != "qemu/100"]
+
+    async def run():
+        async with async_test_hass(str(tmp_path)) as hass:
+            coordinator = make_coordinator(hass, FakeApi({"cluster/resources": resources}), FakeSSH())
+            entry = coordinator.config_entry
+            # 设备需要注册过的条目，禁用的条目不会被设置，只有这里的协调器在轮询
+            entry.disabled_by = ConfigEntryDisabler.USER
+            await hass.config_entries.async_add(entry)
+            identifier = (DOMAIN, entry.entry_id, "vm", 100)
+            membership = []
+            coordinator.async_add_membership_listener(
+                lambda added, removed: membership.append((set(added), set(removed)))
+            )
+            devices = []
+            for _ in range(5):
+                await coordinator.async_refresh()
+                if coordinator.data.qemus:
+                    coordinator.async_get_device(vm=coordinator.data.qemus[100])
+                devices.append(
+                    dr.async_get(hass).async_get_device(identifiers={identifier}) is not None
+                )
+            await coordinator.async_close()
+            return devices, membership
+
+    devices, membership = asyncio.run(run())
+    # 只缺席一次的虚拟机保留设备，也不会被重复添加；连续两次缺席才删除
+    assert devices == [True, True, True, True, False]
+    assert ("qemu", 100) in membership[0][0]
+    assert all(("qemu", 100) not in added for added, _ in membership[1:])
+    assert [("qemu", 100) in removed for _, removed in membership[1:]] == [True]
@@ -0,0 +1,87 @@
+"""Tests for the disk inventory and the SMART cache."""
+from __future__ import annotations
+
+from custom_components.proxmoxve.disks import (
+    SMART_FIELDS,
+    SmartCache,
+    parse_smart_batch,
+    smart_command,
+)
+
+from .conftest import smart_output
+
+DEVICES = {
+    "/dev/sda": {"path": "/dev/sda", "serial": "S1", "model": "HDD ", "rota": True},
+    "/dev/sdb": {"path": "/dev/sdb", "serial": "S2", "model": "USB BRIDGE", "rota": "0"},
+}
+
+STANDBY = {
+    "smartctl": {
+        "exit_status": 2,
+        "messages": [{"string": "Device is in STANDBY mode, exit(2)", "severity": "information"}],
+    }
+}
+
+
+def test_cache_reuses_results_until_ttl():
+    cache = SmartCache(ttl=600)
+    assert cache.due(DEVICES, 0) == ["/dev/sda", "/dev/sdb"]
+    info = cache.update(DEVICES, parse_smart_batch(smart_output(["/dev/sda", "/dev/sdb"])), 0)
+    assert info["/dev/sda"]["temperature"] == 35
+    assert cache.due(DEVICES, 599) == []
+    assert cache.due(DEVICES, 600) == ["/dev/sda", "/dev/sdb"]
+
+
+def test_disk_without_smart_keeps_inventory_record():
+    cache = SmartCache(ttl=600)
+    info = cache.update(DEVICES, parse_smart_batch(smart_output(["/dev/sda"])), 0)
+    assert set(info) == {"/dev/sda", "/dev/sdb"}
+    sdb = info["/dev/sdb"]
+    assert sdb["model"] == "USB BRIDGE"
+    assert sdb["serial"] == "S2"
+    assert sdb["rotational"] is False
+    assert sdb["standby"] is False
+    for field in SMART_FIELDS:
+        if field not in ("model", "serial"):
+            assert sdb[field] is None
+    # 没有结果的磁盘在下个 SMART 周期重新查询
+    assert cache.due(DEVICES, 1) == ["/dev/sdb"]
+
+
+def test_standby_disk_keeps_previous_result():
+    cache = SmartCache(ttl=600)
+    cache.update(DEVICES, parse_smart_batch(smart_output(["/dev/sda", "/dev/sdb"])), 0)
+    info = cache.update(DEVICES, {"/dev/sda": STANDBY}, 700)
+    assert info["/dev/sda"]["standby"] is True
+    assert info["/dev/sda"]["temperature"] == 35
+    assert cache.due(DEVICES, 701) == ["/dev/sda", "/dev/sdb"]
+
+
+def test_removed_disk_is_dropped():
+    cache = SmartCache(ttl=600)
+    cache.update(DEVICES, parse_smart_batch(smart_output(["/dev/sda", "/dev/sdb"])), 0)
+    info = cache.update({"/dev/sda": DEVICES["/dev/sda"]}, {}, 1)
+    assert set(info) == {"/dev/sda"}
+    assert cache.due(DEVICES, 2) == ["/dev/sdb"]
+
+
+def test_cached_disk_refreshes_temperature_only():
+    cache = SmartCache(ttl=1800)
+    cache.update(DEVICES, parse_smart_batch(smart_output(["/dev/sda", "/dev/sdb"])), 0)
+    attributes = {"smartctl": {"exit_status": 0}, "temperature": {"current": 44}}
+    info = cache.update(
+        DEVICES, parse_smart_batch(smart_output(["/dev/sda"], attributes)), 300, ["/dev/sda"]
+    )
+    assert info["/dev/sda"]["temperature"] == 44
+    # 其他字段保留完整查询的结果，TTL 不变
+    assert info["/dev/sda"]["smart_status"] == "passed"
+    assert info["/dev/sda"]["power_on_hours"] == 1234
+    assert cache.due(DEVICES, 1799) == []
+    assert cache.due(DEVICES, 1800) == ["/dev/sda", "/dev/sdb"]
+
+
+def test_smart_command_splits_full_and_temperature_probes():
+    command = smart_command(["/dev/sda"], ["/dev/sdb"])
+    assert 'for d in /dev/sda; do' in command and "smartctl -n standby -j -a" in command
+    assert 'for d in /dev/sdb; do' in command and "smartctl -n standby -j -A" in command
+    assert "-A" not in smart_command(["/dev/sda"])
@@ -0,0 +1,42 @@
+"""Tests for the lm-sensors reading map."""
+from __future__ import annotations
+
+from custom_components.proxmoxve.lmsensors import SensorMap
+
+from .conftest import SENSORS
+
+
+def test_discover_and_extract():
+    sensor_map = SensorMap.discover(SENSORS)
+    assert {reading.key: reading.role for reading in sensor_map.readings} == {
+        "coretemp_isa_0000_package_id_0": "cpu_package",
+        "coretemp_isa_0000_core_0": "cpu_core",
+        "nvme_pci_0100_composite": "nvme",
+    }
+    values = sensor_map.extract(SENSORS)
+    assert values == {
+        "coretemp_isa_0000_package_id_0": 51.0,
+        "coretemp_isa_0000_core_0": 49.0,
+        "nvme_pci_0100_composite": 38.9,
+    }
+    summary = sensor_map.summarize(values)
+    assert summary["cpu_temperature"] == 51.0
+    assert summary["nvme_temperature"] == 38.9
+
+
+def test_extract_keeps_missing_readings_as_none():
+    sensor_map = SensorMap.discover(SENSORS)
+    values = sensor_map.extract({"coretemp-isa-0000": {"Package id 0": {"temp1_input": 55.0}}})
+    assert values == {
+        "coretemp_isa_0000_package_id_0": 55.0,
+        "coretemp_isa_0000_core_0": None,
+        "nvme_pci_0100_composite": None,
+    }
+    assert "nvme_temperature" not in sensor_map.summarize(values)
+
+
+def test_map_survives_a_round_trip():
+    sensor_map = SensorMap.discover(SENSORS)
+    restored = SensorMap.from_dict(sensor_map.as_dict())
+    assert restored.readings == sensor_map.readings
+    assert restored.signature == sensor_map.signature
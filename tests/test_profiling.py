@@ -0,0 +1,83 @@
+"""Tests for the cycle profiler."""
+import asyncio
+import cProfile
+import pstats
+import sys
+
+import pytest
+
+from custom_components.proxmoxve.api import PVEApiError
+from custom_components.proxmoxve.profiling import CycleProfiler, ProfilerBusyError
+
+from .conftest import FakeApi, FakeSSH, async_test_hass, make_coordinator
+
+
+def test_profiler_counts_cycles():
+    async def run():
+        profiler = CycleProfiler(2, 5)
+        profiler.start()
+        for cycle in range(2):
+            profiler.enable()
+            done = profiler.disable()
+        profile, summary = profiler.finish()
+        return done, profiler.done, summary
+
+    done, cycles, summary = asyncio.run(run())
+    assert done
+    assert cycles == 2
+    assert summary.startswith("2 cycles")
+
+
+@pytest.mark.skipif(sys.version_info < (3, 12), reason="one profiler per thread since 3.12")
+def test_profiler_busy():
+    async def run():
+        profiler = CycleProfiler(1, 5)
+        other = cProfile.Profile()
+        other.enable()
+        try:
+            with pytest.raises(ProfilerBusyError):
+                profiler.start()
+        finally:
+            other.disable()
+
+    asyncio.run(run())
+
+
+def test_single_cycle_profile_includes_dispatch(tmp_path):
+    def entity_dispatch_marker():
+        pass
+
+    async def run():
+        async with async_test_hass(str(tmp_path)) as hass:
+            coordinator = make_coordinator(hass, FakeApi(), FakeSSH())
+            unsub = coordinator.async_add_listener(entity_dispatch_marker)
+            profile_task = hass.async_create_task(coordinator.async_profile(1, 5))
+            await asyncio.sleep(0)
+            await coordinator.async_refresh()
+            profile, summary = await profile_task
+            unsub()
+            await coordinator.async_close()
+            return profile, summary
+
+    profile, summary = asyncio.run(run())
+    functions = {name for _, _, name in pstats.Stats(profile).stats}
+    assert "async_collect" in functions
+    assert "entity_dispatch_marker" in functions
+    assert summary.startswith("1 cycles")
+
+
+def test_failed_cycle_ends_the_profile(tmp_path):
+    async def run():
+        async with async_test_hass(str(tmp_path)) as hass:
+            api = FakeApi({"cluster/resources": PVEApiError("GET cluster/resources: 500")})
+            coordinator = make_coordinator(hass, api, FakeSSH())
+            profile_task = hass.async_create_task(coordinator.async_profile(1, 5))
+            await asyncio.sleep(0)
+            await coordinator.async_refresh()
+            result = await profile_task
+            await coordinator.async_close()
+            return coordinator, result
+
+    coordinator, (profile, summary) = asyncio.run(run())
+    assert not coordinator.last_update_success
+    assert not coordinator.profiling
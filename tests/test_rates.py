@@ -0,0 +1,52 @@
+"""Tests for the counter rate tracker."""
+from __future__ import annotations
+
+from custom_components.proxmoxve.rates import HOLD_WINDOW_SEC, RateTracker
+
+
+def test_rate_from_two_samples():
+    tracker = RateTracker(counters=("netin",))
+    first = {"netin": 1000}
+    tracker.update({"vm": first}, 0.0)
+    assert first["netin_rate"] is None
+    second = {"netin": 6000}
+    tracker.update({"vm": second}, 10.0)
+    assert second["netin_rate"] == 500
+
+
+def test_counter_reset_yields_no_rate():
+    tracker = RateTracker(counters=("netin",))
+    tracker.update({"vm": {"netin": 5000}}, 0.0)
+    record = {"netin": 100}
+    tracker.update({"vm": record}, 10.0)
+    assert record["netin_rate"] is None
+    record = {"netin": 1100}
+    tracker.update({"vm": record}, 20.0)
+    assert record["netin_rate"] == 100
+
+
+def test_unchanged_counter_holds_the_rate():
+    tracker = RateTracker(counters=("netin",))
+    tracker.update({"vm": {"netin": 0}}, 0.0)
+    tracker.update({"vm": {"netin": 1000}}, 10.0)
+    # pvestatd 还没有更新计数器
+    record = {"netin": 1000}
+    tracker.update({"vm": record}, 10.0 + HOLD_WINDOW_SEC - 1)
+    assert record["netin_rate"] == 100
+    record = {"netin": 1000}
+    tracker.update({"vm": record}, 10.0 + HOLD_WINDOW_SEC + 1)
+    assert record["netin_rate"] == 0
+
+
+def test_smoothing_and_forgotten_keys():
+    tracker = RateTracker(counters=("netin",), smoothing=0.5)
+    tracker.update({"vm": {"netin": 0}}, 0.0)
+    tracker.update({"vm": {"netin": 1000}}, 10.0)
+    record = {"netin": 4000}
+    tracker.update({"vm": record}, 20.0)
+    assert record["netin_rate"] == 200
+    # 消失的虚拟机重新出现时从头开始
+    tracker.update({}, 30.0)
+    record = {"netin": 9000}
+    tracker.update({"vm": record}, 40.0)
+    assert record["netin_rate"] is None
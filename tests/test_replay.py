@@ -0,0 +1,113 @@
+"""Replay a recorded fixture bundle through the collector.
+
+fixtures/fake_cluster.json was recorded with FixtureRecorder from three
+polls, one second apart, of the bench stand-ins (bench/fake_pve.py) with
+6 guests and 2 disks.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+
+from custom_components.proxmoxve.collector import PVECollector, diff_snapshots, snapshot_members
+from custom_components.proxmoxve.const import CONF_API_INTERVAL
+from custom_components.proxmoxve.fixtures import load_bundle, replay_settings, replay_transports
+
+from .conftest import FakeApi, FakeSSH, async_test_hass, make_coordinator
+
+BUNDLE = os.path.join(os.path.dirname(__file__), "fixtures", "fake_cluster.json")
+
+
+def replay(polls: int, bundle=None):
+    bundle = bundle or load_bundle(BUNDLE)
+    api, ssh, clock = replay_transports(bundle)
+
+    async def run():
+        collector = PVECollector(api, ssh, bundle["host"], clock=clock, **replay_settings(bundle))
+        snapshots = []
+        try:
+            for _ in range(polls):
+                snapshots.append(await collector.async_collect())
+        finally:
+            await collector.async_close()
+        return snapshots
+
+    return asyncio.run(run())
+
+
+def test_replay_parses_recorded_cluster():
+    data = replay(1)[0]
+    assert set(data.nodes) == {"pve0"}
+    assert set(data.qemus) == {101, 102, 104, 105}
+    assert set(data.lxcs) == {100, 103}
+    assert set(data.storages) == {"pve0/local", "ceph"}
+    assert data.storages["ceph"]["storage_type"] == "shared"
+
+    node = data.nodes["pve0"]
+    assert node["cpu_usage"] == 12.0
+    assert node["mem_usage"] == 37.5
+    assert node["cpu_temperature"] == 48.0
+    assert node["motherboard_temperature"] == 27.8
+    assert node["nvme_temperature"] == 38.9
+
+    readings = data.readings["pve0"]
+    assert readings["coretemp_isa_0000_core_3"] == 47.0
+    assert readings["nct6798_isa_0290_fan1"] == 812.0
+
+    disks = data.disks["pve0"]
+    assert set(disks) == {"/dev/sda", "/dev/sdb"}
+    assert disks["/dev/sda"]["temperature"] == 33
+    assert disks["/dev/sda"]["smart_status"] == "passed"
+    assert disks["/dev/sdb"]["power_on_hours"] == 12001
+    # 序列号在录制时已替换为占位符
+    assert disks["/dev/sda"]["serial"] == "SERIAL0001"
+    # 第一次轮询没有速率
+    assert data.qemus[101]["netin_rate"] is None
+
+
+def test_replay_follows_recorded_time():
+    first, second, third = replay(3)
+    # 计数器每秒增长 125000，时间取自录制时的时间戳
+    assert third.qemus[101]["netin_rate"] == 124626.0
+    assert second.qemus[101]["netin_rate"] is not None
+    assert third.qemus[105]["netin_rate"] is None
+
+    changes = diff_snapshots(second, third)
+    assert "uptime" in changes[("qemu", 101)]
+    assert ("qemu", 105) not in changes
+    assert snapshot_members(first) == snapshot_members(third)
+
+
+def test_recorded_fixture_round_trips(tmp_path):
+    api = FakeApi()
+
+    async def run():
+        async with async_test_hass(str(tmp_path)) as hass:
+            coordinator = make_coordinator(hass, api, FakeSSH(), **{CONF_API_INTERVAL: 0.05})
+            # 有监听者时协调器会按 update_interval 自行刷新
+            unsub = coordinator.async_add_listener(lambda: None)
+            try:
+                bundle = await coordinator.async_record_fixture(3)
+                ticks = api.tick
+                # 录制结束后恢复定时刷新
+                assert coordinator._unsub_refresh is not None
+                return bundle, coordinator.data, ticks
+            finally:
+                unsub()
+                await coordinator.async_close()
+
+    bundle, recorded, ticks = asyncio.run(run())
+    assert len(bundle["api"]["GET cluster/resources"]) == 3
+    # 录制期间没有穿插定时刷新
+    assert ticks == 3
+    assert bundle["coordinator"] == {CONF_API_INTERVAL: 0.05}
+    assert CONF_API_INTERVAL not in bundle["settings"]
+
+    replayed = replay(3, json.loads(json.dumps(bundle)))[-1]
+    assert replayed.readings == recorded.readings
+    # 序列号和 WWN 被替换为占位符，其余字段相同
+    disk = recorded.disks["pve"]["/dev/sda"]
+    assert replayed.disks["pve"]["/dev/sda"] == {**disk, "serial": "SERIAL0001", "wwn": "WWN0001"}
+    assert replayed.nodes["pve"]["cpu_usage"] == recorded.nodes["pve"]["cpu_usage"]
+    assert set(replayed.qemus) == set(recorded.qemus)
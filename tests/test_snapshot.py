@@ -0,0 +1,49 @@
+"""Tests for snapshots and their change sets."""
+from __future__ import annotations
+
+from custom_components.proxmoxve.collector import PVEData, diff_snapshots, snapshot_members
+
+
+def snapshot(qemus=None, readings=None):
+    data = PVEData()
+    data.nodes = {"pve": {"node": "pve", "status": "online"}}
+    data.qemus = qemus or {}
+    data.readings = readings or {}
+    return data
+
+
+def test_first_snapshot_updates_everything():
+    assert diff_snapshots(None, snapshot()) is None
+
+
+def test_diff_reports_changed_added_and_removed_fields():
+    old = snapshot({100: {"status": "running", "cpu": 0.1}, 101: {"status": "stopped"}})
+    new = snapshot({100: {"status": "running", "cpu": 0.2, "lock": "backup"}, 102: {"status": "running"}})
+    changes = diff_snapshots(old, new)
+    assert changes == {
+        ("qemu", 100): {"cpu", "lock"},
+        ("qemu", 102): {"status"},
+        # 消失的记录也通知，实体刷新为未知
+        ("qemu", 101): {"status"},
+    }
+
+
+def test_diff_of_equal_snapshots_is_empty():
+    old = snapshot({100: {"status": "running"}}, {"pve": {"a": 1.0}})
+    new = snapshot({100: {"status": "running"}}, {"pve": {"a": 1.0}})
+    assert diff_snapshots(old, new) == {}
+
+
+def test_members_and_round_trip():
+    data = snapshot({100: {"status": "running"}}, {"pve": {"a": 1.0}})
+    data.disks = {"pve": {"/dev/sda": {"temperature": 30}}}
+    assert snapshot_members(data) == {
+        ("node", "pve"),
+        ("qemu", 100),
+        ("disk", ("pve", "/dev/sda")),
+        ("reading", ("pve", "a")),
+    }
+    restored = PVEData.from_dict(data.as_dict())
+    assert restored.qemus == data.qemus
+    assert restored.time == data.time
+    assert diff_snapshots(data, restored) == {}
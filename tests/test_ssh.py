@@ -0,0 +1,59 @@
+"""Tests for the pooled SSH transport's error reporting."""
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from custom_components.proxmoxve import ssh
+from custom_components.proxmoxve.ssh import PVESSHError, PVESSHPool
+
+from .conftest import HOST
+
+
+class FakeConnection:
+    def __init__(self, run):
+        self._run = run
+
+    async def run(self, command, check=False, timeout=None):
+        return await self._run(command, timeout)
+
+    def close(self):
+        pass
+
+
+def patch_connect(monkeypatch, connect):
+    async def _create_connection(client_factory, host, **kwargs):
+        return await connect(client_factory)
+
+    monkeypatch.setattr(ssh.asyncssh, "create_connection", _create_connection)
+
+
+def test_connect_timeout_is_not_reported_as_command_timeout(monkeypatch):
+    monkeypatch.setattr(ssh, "CONNECT_TIMEOUT", 0.01)
+
+    async def connect(client_factory):
+        await asyncio.sleep(1)
+
+    patch_connect(monkeypatch, connect)
+    pool = PVESSHPool("root", "secret")
+
+    with pytest.raises(PVESSHError, match="connection timed out after 0.01s"):
+        asyncio.run(pool.async_run(HOST, "sensors -j"))
+    assert not pool.available(HOST)
+
+
+def test_command_timeout_keeps_the_connection(monkeypatch):
+    async def run(command, timeout):
+        raise asyncio.TimeoutError
+
+    async def connect(client_factory):
+        return FakeConnection(run), client_factory()
+
+    patch_connect(monkeypatch, connect)
+    pool = PVESSHPool("root", "secret")
+
+    with pytest.raises(PVESSHError, match="'sensors -j' timed out after 30s"):
+        asyncio.run(pool.async_run(HOST, "sensors -j", timeout=30))
+    assert pool.available(HOST)
+    assert HOST in pool._conns
@@ -0,0 +1,26 @@
+"""Tests for the phase timing statistics."""
+from __future__ import annotations
+
+from custom_components.proxmoxve.timing import PhaseTimer, _percentile
+
+
+def test_percentile_uses_nearest_rank():
+    assert _percentile([1, 2, 3], 0.50) == 2
+    assert _percentile([1, 2, 3, 4], 0.50) == 2
+    assert _percentile([1, 2, 3, 4, 5], 0.50) == 3
+    assert _percentile(list(range(1, 21)), 0.95) == 19
+    assert _percentile(list(range(1, 101)), 0.95) == 95
+    assert _percentile([7], 0.95) == 7
+    assert _percentile([1, 2], 0.0) == 1
+
+
+def test_summary_reports_milliseconds():
+    timer = PhaseTimer(samples=3)
+    for seconds in (0.004, 0.001, 0.002, 0.003):
+        timer.record("poll", seconds)
+    summary = timer.summary()["poll"]
+    # 只保留最近 3 个样本
+    assert summary["count"] == 3
+    assert summary["last"] == 3.0
+    assert summary["p50"] == 2.0
+    assert summary["max"] == 3.0